@@ -0,0 +1,20 @@
+"""
+Admin token check shared by the /admin routes and request profiling.
+
+Admin features are off unless ADMIN_TOKEN is set; callers send the same
+value in the X-Admin-Token header.
+"""
+import os
+import secrets
+from typing import Optional
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def admin_enabled() -> bool:
+    return bool(os.environ.get("ADMIN_TOKEN"))
+
+
+def admin_token_matches(value: Optional[str]) -> bool:
+    token = os.environ.get("ADMIN_TOKEN")
+    return bool(token) and value is not None and secrets.compare_digest(value, token)
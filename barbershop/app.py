@@ -1,13 +1,64 @@
 import loguru
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from .database import create_connection
-from .routes import haircuts_router
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover - optional "compression" extra
+    BrotliMiddleware = None
+
+from .conditional import add_etag_header
+from .database import (
+    NotificationListener,
+    close_async_pool,
+    close_pool,
+    get_async_pool,
+    get_pool,
+    init_async_pool,
+    init_pool,
+)
+from .metrics import METRICS_ENABLED, PROMETHEUS_CONTENT_TYPE, metrics, record_request_metrics
+from .profiling import PROFILING_ENABLED, profile_request
+from .repositories import SERVICE_PRICES_CHANNEL, price_catalogue
+from .routes import admin_router, async_haircuts_router, haircuts_router
 
 logger = loguru.logger
-app = FastAPI()
+
+# Responses smaller than this are not worth compressing.
+COMPRESSION_MINIMUM_SIZE = 1024
+
+# "async" serves the haircut JSON endpoints with psycopg 3 on the event loop.
+DB_DRIVER = os.environ.get("DB_DRIVER", "sync")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        init_pool()
+        price_catalogue.load()
+        if DB_DRIVER == "async":
+            await init_async_pool()
+    except Exception as e:
+        logger.error(f"Could not initialise the database at startup: {e}")
+    listener = None
+    if os.environ.get("DATABASE_URL"):
+        listener = NotificationListener(
+            os.environ["DATABASE_URL"],
+            {SERVICE_PRICES_CHANNEL: price_catalogue.invalidate},
+        )
+        listener.start()
+    yield
+    if listener is not None:
+        listener.stop()
+    await close_async_pool()
+    close_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,8 +66,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
+
 
 @app.middleware("http")
 async def add_cors_headers(request: Request, call_next):
@@ -27,11 +84,34 @@ async def add_cors_headers(request: Request, call_next):
     return response
 
 
-app.include_router(haircuts_router)
+app.middleware("http")(add_etag_header)
+
+if PROFILING_ENABLED:
+    app.middleware("http")(profile_request)
+
+if METRICS_ENABLED:
+    # Added last so it is the outermost middleware and times the whole request.
+    app.middleware("http")(record_request_metrics)
+
+app.include_router(async_haircuts_router if DB_DRIVER == "async" else haircuts_router)
+app.include_router(admin_router)
 
 
 @app.get("/")
 def read_root():
-    db_path = os.environ.get("DB_PATH", "/tmp/testing.db")
-    create_connection(db_path)
     return {"Barbershop API": "OK"}
+
+
+@app.get("/health/db")
+def read_pool_stats():
+    stats = get_pool().stats()
+    if DB_DRIVER == "async":
+        stats["async"] = get_async_pool().get_stats()
+    return stats
+
+
+if METRICS_ENABLED:
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def read_metrics():
+        return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
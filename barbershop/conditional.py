@@ -0,0 +1,73 @@
+"""
+Conditional GET support for the read endpoints.
+
+An ETag names a version of the data behind an endpoint (e.g. the haircuts
+change counter) plus the request path and query, so it can be computed and
+compared against `If-None-Match` before any of the endpoint's own queries
+run. The version is read before the data: a write committing in between
+can only make the tag older than the body, which costs the client one extra
+full response, never a missed change.
+
+The tags are weak: the compression middleware runs inside
+`add_etag_header`, so the same tag covers the identity, gzip and brotli
+bodies of a response, which are equivalent but not byte-identical.
+Responses also carry `Vary: Accept-Encoding` so shared caches keep the
+encodings apart.
+
+Endpoints that read the per-process day totals cache (`/history/today` and
+`/dashboard`) send no ETag: another worker's cache can still hold totals
+from before the version the tag would name.
+"""
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, Request
+
+CACHE_CONTROL = "no-cache"
+VARY = "Accept-Encoding"
+
+
+def make_etag(version: str, request: Request) -> str:
+    target = f"{request.url.path}?{request.url.query}"
+    digest = hashlib.blake2b(target.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def _opaque_tag(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as RFC 9110 requires for If-None-Match."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or _opaque_tag(tag) == _opaque_tag(etag):
+            return True
+    return False
+
+
+def check_not_modified(request: Request, etag: str) -> None:
+    """
+    Raise 304 when the client already holds `etag`; otherwise keep it on
+    `request.state` for `add_etag_header` to put on the response, including
+    responses returned as pre-serialized bytes.
+    """
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": VARY})
+    request.state.etag = etag
+
+
+async def add_etag_header(request: Request, call_next):
+    response = await call_next(request)
+    etag = getattr(request.state, "etag", None)
+    if etag and response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        vary = response.headers.get("Vary")
+        if not vary:
+            response.headers["Vary"] = VARY
+        elif VARY.lower() not in vary.lower():
+            response.headers["Vary"] = f"{vary}, {VARY}"
+    return response
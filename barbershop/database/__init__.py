@@ -1,3 +1,20 @@
-from .create_connection import create_connection
-
-__all__ = ["create_connection"]
+from .async_pool import AsyncPoolTimeout, close_async_pool, get_async_pool, init_async_pool
+from .create_connection import create_connection
+from .migrations import run_migrations
+from .notifications import NotificationListener
+from .pool import ConnectionPool, PoolTimeoutError, close_pool, get_pool, init_pool
+
+__all__ = [
+    "create_connection",
+    "run_migrations",
+    "NotificationListener",
+    "ConnectionPool",
+    "PoolTimeoutError",
+    "close_pool",
+    "get_pool",
+    "init_pool",
+    "AsyncPoolTimeout",
+    "close_async_pool",
+    "get_async_pool",
+    "init_async_pool",
+]
@@ -0,0 +1,119 @@
+"""
+Async PostgreSQL pool for the async haircuts routes (DB_DRIVER=async).
+
+Backed by psycopg 3 and psycopg_pool, installed with the optional "async"
+extra (`pip install barbershop[async]`). Uses the same DB_POOL_* settings
+as the sync pool; migrations are still applied by `init_pool` at startup.
+"""
+import os
+import time
+from typing import Optional
+
+import loguru
+
+from barbershop.metrics import METRICS_ENABLED, metrics, query_caller
+from barbershop.slow_queries import SLOW_QUERY_EXPLAIN, SLOW_QUERY_SECONDS, explain_statement, is_slow, slow_query_log
+from .pool import DEFAULT_MAX_SIZE, DEFAULT_MIN_SIZE, DEFAULT_TIMEOUT
+from .timed_cursor import EXPLAIN_SAVEPOINT
+
+try:
+    import psycopg
+    from psycopg import AsyncCursor
+    from psycopg.rows import dict_row, tuple_row
+    from psycopg_pool import AsyncConnectionPool
+    from psycopg_pool import PoolTimeout as AsyncPoolTimeout
+except ImportError:  # pragma: no cover - optional "async" extra
+    AsyncConnectionPool = None
+
+    class AsyncPoolTimeout(Exception):
+        """Stand-in so callers can catch pool timeouts without the extra."""
+else:
+
+    class TimedAsyncCursor(AsyncCursor):
+        """Async counterpart of `TimedCursor`."""
+
+        async def execute(self, query, params=None, **kwargs):
+            return await self._timed(super().execute, query, params, kwargs, explain=True)
+
+        async def executemany(self, query, params_seq, **kwargs):
+            return await self._timed(super().executemany, query, params_seq, kwargs)
+
+        async def _timed(self, run, query, params, kwargs, explain: bool = False):
+            caller = query_caller() if METRICS_ENABLED else None
+            started = time.perf_counter()
+            succeeded = False
+            try:
+                result = await run(query, params, **kwargs)
+                succeeded = True
+                return result
+            finally:
+                seconds = time.perf_counter() - started
+                if METRICS_ENABLED:
+                    metrics.observe_query(caller, seconds, self.rowcount)
+                if is_slow(seconds):
+                    caller = caller or query_caller()
+                    plan = None
+                    if explain and succeeded and SLOW_QUERY_EXPLAIN:
+                        plan = await self._explain(query, params, caller)
+                    slow_query_log.record(caller, query, params, seconds, self.rowcount, plan)
+
+        async def _explain(self, query, params, caller):
+            # A plain cursor, so the EXPLAIN is not timed itself, with tuple
+            # rows: the pool's connections default to dict rows.
+            cursor = AsyncCursor(self.connection, row_factory=tuple_row)
+            try:
+                await cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                await cursor.execute(explain_statement(query, caller), params)
+                plan = "\n".join(row[0] for row in await cursor.fetchall())
+                await cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                return plan
+            except Exception as e:
+                logger.warning(f"Could not explain slow query: {e}")
+                try:
+                    await cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                except psycopg.Error:
+                    pass
+                return None
+            finally:
+                await cursor.close()
+
+logger = loguru.logger
+
+_async_pool: Optional["AsyncConnectionPool"] = None
+
+
+def _cursor_factory():
+    return TimedAsyncCursor if METRICS_ENABLED or SLOW_QUERY_SECONDS else AsyncCursor
+
+
+async def init_async_pool(db_url: Optional[str] = None) -> "AsyncConnectionPool":
+    """Open the process-wide async pool and wait for its first connections."""
+    global _async_pool
+    if AsyncConnectionPool is None:
+        raise RuntimeError("DB_DRIVER=async needs the 'async' extra: pip install barbershop[async]")
+    if _async_pool is None:
+        pool = AsyncConnectionPool(
+            db_url or os.environ.get("DATABASE_URL"),
+            min_size=int(os.environ.get("DB_POOL_MIN_SIZE", DEFAULT_MIN_SIZE)),
+            max_size=int(os.environ.get("DB_POOL_MAX_SIZE", DEFAULT_MAX_SIZE)),
+            timeout=float(os.environ.get("DB_POOL_TIMEOUT", DEFAULT_TIMEOUT)),
+            kwargs={"row_factory": dict_row, "cursor_factory": _cursor_factory()},
+            open=False,
+        )
+        await pool.open(wait=True)
+        _async_pool = pool
+        logger.info(f"Async PostgreSQL connection pool ready ({pool.min_size}-{pool.max_size} connections).")
+    return _async_pool
+
+
+def get_async_pool() -> "AsyncConnectionPool":
+    if _async_pool is None:
+        raise RuntimeError("The async connection pool is not initialised")
+    return _async_pool
+
+
+async def close_async_pool() -> None:
+    global _async_pool
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
@@ -1,5 +1,5 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, register_uuid
 
 from dotenv import load_dotenv
 import os
@@ -10,85 +10,21 @@ import loguru
 
 logger = loguru.logger
 
-DEFAULT_SERVICE_PRICES = [
-    ("Degradado", 9000),
-    ("Corte", 7000),
-    ("Barba", 3000),
-    ("Corte+Barba", 10000),
-    ("Claritos", 5000),
-    ("Otros", 8000),
-]
+# Adapt uuid.UUID parameters and parse uuid columns back into uuid.UUID.
+register_uuid()
 
 
 def create_connection(db_url=None):
-    """Create a database connection to PostgreSQL."""
-    conn = None
+    """Create a database connection to PostgreSQL.
+
+    Schema changes are applied once at startup by `run_migrations`, so this
+    only opens the connection.
+    """
     try:
-        import os
         if db_url is None:
             db_url = os.environ.get("DATABASE_URL")
-        
-        conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS haircuts (
-                id TEXT PRIMARY KEY,
-                client_name TEXT NOT NULL,
-                service_name TEXT NOT NULL,
-                price REAL NOT NULL,
-                date TEXT DEFAULT CURRENT_DATE,
-                time TEXT,
-                count INTEGER DEFAULT 0,
-                tip REAL DEFAULT 0
-            )
-        """)
-        
-        cursor.execute("""
-            SELECT column_name FROM information_schema.columns 
-            WHERE table_name = 'haircuts'
-        """)
-        columns = [row["column_name"] for row in cursor.fetchall()]
-        
-        if "name" in columns and "client_name" not in columns:
-            cursor.execute("ALTER TABLE haircuts RENAME COLUMN name TO service_name")
-            cursor.execute("ALTER TABLE haircuts ADD COLUMN client_name TEXT DEFAULT 'Cliente'")
-        
-        if "date" not in columns:
-            cursor.execute("ALTER TABLE haircuts ADD COLUMN date TEXT DEFAULT CURRENT_DATE")
-            
-        if "time" not in columns:
-            cursor.execute("ALTER TABLE haircuts ADD COLUMN time TEXT")
 
-        if "count" not in columns:
-            cursor.execute("ALTER TABLE haircuts ADD COLUMN count INTEGER DEFAULT 0")
-        
-        if "tip" not in columns:
-            cursor.execute("ALTER TABLE haircuts ADD COLUMN tip REAL DEFAULT 0")
-        
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_date ON haircuts(date)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_client_name ON haircuts(client_name)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_service_name ON haircuts(service_name)")
-
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS service_prices (
-                id TEXT PRIMARY KEY,
-                service_name TEXT UNIQUE NOT NULL,
-                base_price INTEGER NOT NULL
-            )
-        """)
-        
-        cursor.execute("SELECT COUNT(*) FROM service_prices")
-        result = cursor.fetchone()
-        if result is None or result["count"] == 0:
-            from uuid import uuid4
-            for service_name, base_price in DEFAULT_SERVICE_PRICES:
-                cursor.execute(
-                    "INSERT INTO service_prices (id, service_name, base_price) VALUES (%s, %s, %s)",
-                    (str(uuid4()), service_name, base_price)
-                )
-        
-        conn.commit()
+        conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
         logger.info("Connection to PostgreSQL established.")
         return conn
     except psycopg2.Error as e:
@@ -0,0 +1,524 @@
+import time
+from typing import Callable
+from uuid import uuid4
+
+import loguru
+
+from .rollups import install_daily_totals, rebuild_daily_totals
+
+logger = loguru.logger
+
+# Arbitrary application-wide key for pg_advisory_lock, so only one worker
+# applies migrations while the others wait and then find nothing to do.
+MIGRATION_LOCK_KEY = 727_001
+MIGRATION_LOCK_POLL_SECONDS = 0.5
+
+DEFAULT_SERVICE_PRICES = [
+    ("Degradado", 9000),
+    ("Corte", 7000),
+    ("Barba", 3000),
+    ("Corte+Barba", 10000),
+    ("Claritos", 5000),
+    ("Otros", 8000),
+]
+
+MIGRATIONS: list[tuple[int, str, Callable]] = []
+
+
+def migration(version: int, description: str):
+    """Register a schema migration. Versions are applied in ascending order."""
+    def register(func: Callable) -> Callable:
+        if any(existing == version for existing, _, _ in MIGRATIONS):
+            raise ValueError(f"Duplicate migration version {version}")
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda entry: entry[0])
+        return func
+    return register
+
+
+@migration(1, "Baseline haircuts and service_prices schema")
+def _baseline(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS haircuts (
+            id TEXT PRIMARY KEY,
+            client_name TEXT NOT NULL,
+            service_name TEXT NOT NULL,
+            price REAL NOT NULL,
+            date TEXT DEFAULT CURRENT_DATE,
+            time TEXT,
+            count INTEGER DEFAULT 0,
+            tip REAL DEFAULT 0
+        )
+    """)
+
+    cursor.execute("""
+        SELECT column_name FROM information_schema.columns
+        WHERE table_name = 'haircuts'
+    """)
+    columns = [row["column_name"] for row in cursor.fetchall()]
+
+    if "name" in columns and "client_name" not in columns:
+        cursor.execute("ALTER TABLE haircuts RENAME COLUMN name TO service_name")
+        cursor.execute("ALTER TABLE haircuts ADD COLUMN client_name TEXT DEFAULT 'Cliente'")
+
+    if "date" not in columns:
+        cursor.execute("ALTER TABLE haircuts ADD COLUMN date TEXT DEFAULT CURRENT_DATE")
+
+    if "time" not in columns:
+        cursor.execute("ALTER TABLE haircuts ADD COLUMN time TEXT")
+
+    if "count" not in columns:
+        cursor.execute("ALTER TABLE haircuts ADD COLUMN count INTEGER DEFAULT 0")
+
+    if "tip" not in columns:
+        cursor.execute("ALTER TABLE haircuts ADD COLUMN tip REAL DEFAULT 0")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_date ON haircuts(date)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_client_name ON haircuts(client_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_service_name ON haircuts(service_name)")
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS service_prices (
+            id TEXT PRIMARY KEY,
+            service_name TEXT UNIQUE NOT NULL,
+            base_price INTEGER NOT NULL
+        )
+    """)
+
+    cursor.execute("SELECT COUNT(*) FROM service_prices")
+    result = cursor.fetchone()
+    if result is None or result["count"] == 0:
+        for service_name, base_price in DEFAULT_SERVICE_PRICES:
+            cursor.execute(
+                "INSERT INTO service_prices (id, service_name, base_price) VALUES (%s, %s, %s)",
+                (str(uuid4()), service_name, base_price)
+            )
+
+
+@migration(2, "Composite keyset indexes for haircut listing")
+def _keyset_indexes(conn) -> None:
+    cursor = conn.cursor()
+    # Each index matches the listing ORDER BY (date DESC, id DESC), optionally
+    # behind an equality filter. The single-column indexes they replace are
+    # covered by their leading columns.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_date_id ON haircuts (date DESC, id DESC)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_haircuts_client_date_id ON haircuts (client_name, date DESC, id DESC)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_haircuts_service_date_id ON haircuts (service_name, date DESC, id DESC)"
+    )
+    cursor.execute("DROP INDEX IF EXISTS idx_haircuts_date")
+    cursor.execute("DROP INDEX IF EXISTS idx_haircuts_client_name")
+    cursor.execute("DROP INDEX IF EXISTS idx_haircuts_service_name")
+
+
+NATIVE_TYPES_BATCH_SIZE = 5000
+
+_UUID_PATTERN = r"^[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}$"
+_ISO_DATE_PATTERN = r"^\d{4}-\d{2}-\d{2}"
+_LOCAL_DATE_PATTERN = r"^\d{1,2}/\d{1,2}/\d{4}$"
+
+# Casts fail loudly on anything the check below lets through, rather than
+# storing NULL or a new id.
+_NATIVE_ID = "id::uuid"
+
+
+
+def _native_date(column: str) -> str:
+    return f"""CASE
+    WHEN {column} ~ '{_LOCAL_DATE_PATTERN}' THEN to_date({column}, 'DD/MM/YYYY')
+    ELSE substr({column}, 1, 10)::date
+END"""
+
+
+_NATIVE_DATE = _native_date("date")
+
+# Keeps the shadow columns in step with writes made while the migration
+# runs, so rows edited after their batch was copied are not swapped in
+# stale. A row that cannot be converted is left pending (id_native NULL)
+# for the check under the lock to refuse.
+_SYNC_NATIVE_TYPES = f"""
+    CREATE OR REPLACE FUNCTION haircuts_sync_native_types() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.id ~* '{_UUID_PATTERN}'
+            AND (NEW.date IS NULL OR NEW.date ~ '{_ISO_DATE_PATTERN}' OR NEW.date ~ '{_LOCAL_DATE_PATTERN}') THEN
+            NEW.id_native := NEW.id::uuid;
+            NEW.date_native := {_native_date("NEW.date")};
+        ELSE
+            NEW.id_native := NULL;
+            NEW.date_native := NULL;
+        END IF;
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+_UNCONVERTIBLE_HAIRCUTS = f"""
+    SELECT count(*) OVER () AS total, id, date FROM haircuts
+    WHERE (id IS NULL OR id !~* '{_UUID_PATTERN}'
+        OR (date IS NOT NULL AND date !~ '{_ISO_DATE_PATTERN}' AND date !~ '{_LOCAL_DATE_PATTERN}'))
+"""
+
+
+def _check_convertible(cursor, pending_only: bool = False) -> None:
+    """
+    Refuse to convert when an id is not a UUID or a date is in an unknown
+    format: existing clients reference the ids, and the dates are the
+    history. The offending rows are logged so they can be fixed by hand.
+    """
+    query = _UNCONVERTIBLE_HAIRCUTS + (" AND id_native IS NULL" if pending_only else "") + " LIMIT 10"
+    cursor.execute(query)
+    rows = cursor.fetchall()
+    if not rows:
+        return
+    for row in rows:
+        logger.error(f"Haircut cannot be converted to native types: id={row['id']!r} date={row['date']!r}")
+    raise RuntimeError(
+        f"{rows[0]['total']} haircuts have an id that is not a UUID or a date that is not YYYY-MM-DD "
+        "or DD/MM/YYYY; fix them and restart to finish migration 3."
+    )
+
+
+def _create_index_concurrently(cursor, name: str, definition: str, unique: bool = False) -> None:
+    """
+    CREATE INDEX CONCURRENTLY that first drops an INVALID leftover of a
+    failed earlier build, which IF NOT EXISTS would otherwise keep. Needs an
+    autocommit connection.
+    """
+    cursor.execute(
+        "SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+        "WHERE c.relname = %s AND pg_table_is_visible(c.oid)",
+        (name,)
+    )
+    row = cursor.fetchone()
+    if row is not None and not row["indisvalid"]:
+        logger.warning(f"Dropping invalid index {name} left by an interrupted build.")
+        cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    cursor.execute(f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+@migration(3, "Native uuid and date columns for haircuts")
+def _native_types(conn) -> None:
+    """
+    Convert haircuts.id and haircuts.date from TEXT to uuid and date.
+
+    Rows are copied into shadow columns in committed batches, so the table
+    stays writable and an interrupted run resumes where it stopped; a
+    trigger keeps the shadow columns current for rows written meanwhile.
+    The replacement indexes are built concurrently. Only the final swap
+    holds an exclusive lock; it backfills any row still pending and renames
+    the columns. Rows whose id or date cannot be converted stop the
+    migration before anything is changed.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'haircuts' AND column_name = 'id'"
+    )
+    if cursor.fetchone()["data_type"] == "uuid":
+        return
+    cursor.execute(
+        "SELECT 1 FROM information_schema.columns WHERE table_name = 'haircuts' AND column_name = 'id_native'"
+    )
+    _check_convertible(cursor, pending_only=cursor.fetchone() is not None)
+
+    cursor.execute("ALTER TABLE haircuts ADD COLUMN IF NOT EXISTS id_native uuid, ADD COLUMN IF NOT EXISTS date_native date")
+    cursor.execute(_SYNC_NATIVE_TYPES)
+    cursor.execute("DROP TRIGGER IF EXISTS haircuts_sync_native_types ON haircuts")
+    cursor.execute(
+        "CREATE TRIGGER haircuts_sync_native_types BEFORE INSERT OR UPDATE ON haircuts "
+        "FOR EACH ROW EXECUTE FUNCTION haircuts_sync_native_types()"
+    )
+    conn.commit()
+
+    backfill = f"""
+        UPDATE haircuts SET id_native = {_NATIVE_ID}, date_native = {_NATIVE_DATE}
+        WHERE ctid = ANY(ARRAY(
+            SELECT ctid FROM haircuts WHERE id_native IS NULL LIMIT %s FOR UPDATE SKIP LOCKED
+        ))
+    """
+    migrated = 0
+    while True:
+        cursor.execute(backfill, (NATIVE_TYPES_BATCH_SIZE,))
+        conn.commit()
+        if cursor.rowcount == 0:
+            break
+        migrated += cursor.rowcount
+        logger.info(f"Converted {migrated} haircuts to native column types.")
+
+    conn.autocommit = True
+    try:
+        _create_index_concurrently(cursor, "haircuts_id_native_key", "haircuts (id_native)", unique=True)
+        _create_index_concurrently(cursor, "idx_haircuts_native_date_id", "haircuts (date_native DESC, id_native DESC)")
+        _create_index_concurrently(
+            cursor, "idx_haircuts_native_client_date_id", "haircuts (client_name, date_native DESC, id_native DESC)"
+        )
+        _create_index_concurrently(
+            cursor, "idx_haircuts_native_service_date_id", "haircuts (service_name, date_native DESC, id_native DESC)"
+        )
+    finally:
+        conn.autocommit = False
+
+    cursor.execute("LOCK TABLE haircuts IN ACCESS EXCLUSIVE MODE")
+    _check_convertible(cursor, pending_only=True)
+    cursor.execute(
+        f"UPDATE haircuts SET id_native = {_NATIVE_ID}, date_native = {_NATIVE_DATE} WHERE id_native IS NULL"
+    )
+    cursor.execute("DROP TRIGGER haircuts_sync_native_types ON haircuts")
+    cursor.execute("DROP FUNCTION haircuts_sync_native_types()")
+    cursor.execute("ALTER TABLE haircuts DROP COLUMN id")
+    cursor.execute("ALTER TABLE haircuts DROP COLUMN date")
+    cursor.execute("ALTER TABLE haircuts RENAME COLUMN id_native TO id")
+    cursor.execute("ALTER TABLE haircuts RENAME COLUMN date_native TO date")
+    cursor.execute("ALTER TABLE haircuts ALTER COLUMN id SET NOT NULL")
+    cursor.execute("ALTER TABLE haircuts ALTER COLUMN date SET DEFAULT CURRENT_DATE")
+    cursor.execute("ALTER TABLE haircuts ADD CONSTRAINT haircuts_pkey PRIMARY KEY USING INDEX haircuts_id_native_key")
+    cursor.execute("ALTER INDEX idx_haircuts_native_date_id RENAME TO idx_haircuts_date_id")
+    cursor.execute("ALTER INDEX idx_haircuts_native_client_date_id RENAME TO idx_haircuts_client_date_id")
+    cursor.execute("ALTER INDEX idx_haircuts_native_service_date_id RENAME TO idx_haircuts_service_date_id")
+
+
+@migration(4, "daily_totals rollup maintained by triggers")
+def _daily_totals(conn) -> None:
+    install_daily_totals(conn)
+    rebuild_daily_totals(conn)
+
+
+@migration(5, "Notify service_prices changes for cache invalidation")
+def _service_prices_notify(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION notify_service_prices_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('service_prices_changed', TG_OP);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS service_prices_changed ON service_prices")
+    cursor.execute("""
+        CREATE TRIGGER service_prices_changed
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON service_prices
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_service_prices_changed()
+    """)
+
+
+@migration(6, "Per-table change counters for conditional GETs")
+def _table_versions(conn) -> None:
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("INSERT INTO table_versions (table_name) VALUES ('haircuts') ON CONFLICT DO NOTHING")
+    # Bumped inside the writing transaction, so readers never see a new
+    # version before the rows it stands for.
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute("DROP TRIGGER IF EXISTS haircuts_version ON haircuts")
+    cursor.execute("""
+        CREATE TRIGGER haircuts_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON haircuts
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+    """)
+
+
+@migration(7, "Change tracking and tombstones for incremental sync")
+def _change_tracking(conn) -> None:
+    """
+    Stamp every inserted or updated haircut with `updated_at` and the id of
+    the writing transaction (`changed_xid`), and record deleted ids in
+    haircut_tombstones. An id is either live or tombstoned: inserting it
+    again removes its tombstone. Rows written before this migration keep a
+    NULL `changed_xid` and are only returned by a full sync.
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        "ALTER TABLE haircuts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now(), "
+        "ADD COLUMN IF NOT EXISTS changed_xid xid8"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircuts_changed_xid ON haircuts (changed_xid)")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS haircut_tombstones (
+            id uuid PRIMARY KEY,
+            deleted_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            changed_xid xid8 NOT NULL DEFAULT pg_current_xact_id()
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_haircut_tombstones_changed_xid ON haircut_tombstones (changed_xid)")
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION haircuts_stamp_change() RETURNS trigger AS $$
+        BEGIN
+            NEW.updated_at := now();
+            NEW.changed_xid := pg_current_xact_id();
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    cursor.execute("""
+        CREATE OR REPLACE FUNCTION haircuts_track_tombstones() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                INSERT INTO haircut_tombstones (id)
+                SELECT id FROM old_rows
+                ON CONFLICT (id) DO UPDATE
+                SET deleted_at = now(), changed_xid = pg_current_xact_id();
+            ELSE
+                DELETE FROM haircut_tombstones t USING new_rows n WHERE t.id = n.id;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    for trigger in ("haircuts_stamp_change", "haircuts_tombstones_insert", "haircuts_tombstones_delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger} ON haircuts")
+    cursor.execute("""
+        CREATE TRIGGER haircuts_stamp_change
+        BEFORE INSERT OR UPDATE ON haircuts
+        FOR EACH ROW EXECUTE FUNCTION haircuts_stamp_change()
+    """)
+    cursor.execute("""
+        CREATE TRIGGER haircuts_tombstones_insert
+        AFTER INSERT ON haircuts REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION haircuts_track_tombstones()
+    """)
+    cursor.execute("""
+        CREATE TRIGGER haircuts_tombstones_delete
+        AFTER DELETE ON haircuts REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION haircuts_track_tombstones()
+    """)
+
+
+@migration(8, "Sync horizon for pruned tombstones")
+def _sync_horizons(conn) -> None:
+    """
+    The newest `changed_xid` removed by `prune_tombstones`; change tokens at
+    or before it may have missed a delete.
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sync_horizons (
+            table_name TEXT PRIMARY KEY,
+            pruned_xid xid8 NOT NULL DEFAULT '0'
+        )
+    """)
+    cursor.execute("INSERT INTO sync_horizons (table_name) VALUES ('haircuts') ON CONFLICT DO NOTHING")
+
+
+@migration(9, "Require a date on every haircut")
+def _date_not_null(conn) -> None:
+    """
+    Keyset pagination orders and compares by (date, id), which cannot place
+    a NULL date, so haircuts.date becomes NOT NULL. Haircuts without a date
+    stop the migration and are logged for fixing by hand. The column is
+    checked through a NOT VALID constraint validated without blocking
+    writes, which lets SET NOT NULL skip its own scan under the exclusive
+    lock.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) OVER () AS total, id FROM haircuts WHERE date IS NULL LIMIT 10")
+    rows = cursor.fetchall()
+    if rows:
+        for row in rows:
+            logger.error(f"Haircut has no date: id={row['id']}")
+        raise RuntimeError(f"{rows[0]['total']} haircuts have no date; set one and restart to finish migration 9.")
+    cursor.execute("ALTER TABLE haircuts DROP CONSTRAINT IF EXISTS haircuts_date_not_null")
+    cursor.execute("ALTER TABLE haircuts ADD CONSTRAINT haircuts_date_not_null CHECK (date IS NOT NULL) NOT VALID")
+    conn.commit()
+    cursor.execute("ALTER TABLE haircuts VALIDATE CONSTRAINT haircuts_date_not_null")
+    cursor.execute("ALTER TABLE haircuts ALTER COLUMN date SET NOT NULL")
+    cursor.execute("ALTER TABLE haircuts DROP CONSTRAINT haircuts_date_not_null")
+
+
+def get_schema_version(conn) -> int:
+    cursor = conn.cursor()
+    cursor.execute("SELECT COALESCE(MAX(version), 0) AS version FROM schema_version")
+    return cursor.fetchone()["version"]
+
+
+def _acquire_migration_lock(conn) -> None:
+    """
+    Wait for the migration lock in autocommit, polling with
+    pg_try_advisory_lock. A waiter blocked in pg_advisory_lock inside a
+    transaction would hold a snapshot, and CREATE INDEX CONCURRENTLY in the
+    lock holder waits for every older snapshot: the two would deadlock.
+    """
+    conn.autocommit = True
+    try:
+        cursor = conn.cursor()
+        while True:
+            cursor.execute("SELECT pg_try_advisory_lock(%s) AS locked", (MIGRATION_LOCK_KEY,))
+            if cursor.fetchone()["locked"]:
+                return
+            time.sleep(MIGRATION_LOCK_POLL_SECONDS)
+    finally:
+        conn.autocommit = False
+
+
+def run_migrations(conn) -> int:
+    """
+    Apply pending migrations in order and return how many were applied.
+
+    Each migration commits together with its `schema_version` row, so a
+    failure leaves the database at the last successfully applied version.
+    """
+    _acquire_migration_lock(conn)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+        """)
+        conn.commit()
+
+        current = get_schema_version(conn)
+        applied = 0
+        for version, description, func in MIGRATIONS:
+            if version <= current:
+                continue
+            logger.info(f"Applying migration {version}: {description}")
+            try:
+                func(conn)
+                conn.cursor().execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                logger.error(f"Migration {version} failed; schema left at version {current}.")
+                raise
+            current = version
+            applied += 1
+        if applied:
+            logger.info(f"Database schema migrated to version {current}.")
+        return applied
+    finally:
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+
+
+if __name__ == "__main__":
+    from .create_connection import create_connection
+
+    connection = create_connection()
+    if connection is None:
+        raise SystemExit("Could not connect to the database")
+    try:
+        run_migrations(connection)
+    finally:
+        connection.close()
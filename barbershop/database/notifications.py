@@ -0,0 +1,73 @@
+import select
+import threading
+from typing import Callable, Optional
+
+import loguru
+import psycopg2
+from psycopg2 import extensions
+
+logger = loguru.logger
+
+
+class NotificationListener(threading.Thread):
+    """
+    Background thread that LISTENs on Postgres channels and calls the
+    matching handler with each notification payload.
+
+    Every handler is also called after (re)connecting, because
+    notifications sent while the listener was disconnected are lost.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        handlers: dict[str, Callable[[Optional[str]], None]],
+        poll_interval: float = 5.0,
+        reconnect_delay: float = 5.0,
+    ):
+        super().__init__(name="pg-notification-listener", daemon=True)
+        self.dsn = dsn
+        self.handlers = handlers
+        self.poll_interval = poll_interval
+        self.reconnect_delay = reconnect_delay
+        self._stopped = threading.Event()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        while not self._stopped.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                for channel in self.handlers:
+                    cursor.execute(f'LISTEN "{channel}"')
+                self._dispatch_all()
+                while not self._stopped.is_set():
+                    if select.select([conn], [], [], self.poll_interval) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._dispatch(notify.channel, notify.payload)
+            except psycopg2.Error as e:
+                logger.warning(f"Notification listener disconnected: {e}")
+                self._stopped.wait(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _dispatch_all(self) -> None:
+        for channel in self.handlers:
+            self._dispatch(channel, None)
+
+    def _dispatch(self, channel: str, payload: Optional[str]) -> None:
+        handler = self.handlers.get(channel)
+        if handler is None:
+            return
+        try:
+            handler(payload)
+        except Exception as e:
+            logger.error(f"Error handling notification on {channel}: {e}")
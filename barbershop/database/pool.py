@@ -0,0 +1,237 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Generator, Optional
+
+import loguru
+import psycopg2
+from psycopg2 import extensions
+
+from .migrations import run_migrations
+from .timed_cursor import CURSOR_FACTORY
+
+logger = loguru.logger
+
+DEFAULT_MIN_SIZE = 1
+DEFAULT_MAX_SIZE = 10
+DEFAULT_TIMEOUT = 5.0
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the acquire timeout."""
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of PostgreSQL connections.
+
+    A semaphore with `max_size` slots bounds the open connections, so
+    callers wait up to `timeout` seconds for a free slot. Returned
+    connections stay open in an idle list, up to `max_size` of them, so a
+    burst of concurrent requests reuses its connections afterwards instead
+    of reconnecting. `min_size` connections are opened up front.
+    Connections are checked with a cheap `SELECT 1` before being handed out
+    and broken ones are replaced transparently.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = DEFAULT_MIN_SIZE,
+        max_size: int = DEFAULT_MAX_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        health_check: bool = True,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min={min_size}, max={max_size}")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check = health_check
+        self._dsn = dsn
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle: list = []
+        self._closed = False
+        self._in_use = 0
+        self._acquired = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_time = 0.0
+        try:
+            for _ in range(min_size):
+                self._idle.append(self._connect())
+        except Exception:
+            self.closeall()
+            raise
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Check a connection out of the pool, waiting up to `timeout` seconds."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise PoolTimeoutError(f"No database connection available after {timeout}s")
+        return self._checkout_slot(started)
+
+    def try_getconn(self):
+        """Check a connection out only if a slot is free right now, else return None."""
+        started = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            return None
+        return self._checkout_slot(started)
+
+    def putconn(self, conn, close: bool = False) -> None:
+        """Return a connection to the pool, discarding it if it is unusable."""
+        try:
+            if not conn.closed and conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    close = True
+            discard = close or bool(conn.closed)
+            with self._lock:
+                keep = not discard and not self._closed
+                if keep:
+                    self._idle.append(conn)
+                elif discard:
+                    self._discarded += 1
+            if not keep:
+                self._close(conn)
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Generator:
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "minSize": self.min_size,
+                "maxSize": self.max_size,
+                "inUse": self._in_use,
+                "idle": len(self._idle),
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "avgWaitMs": round(self._wait_time / self._acquired * 1000, 3) if self._acquired else 0.0,
+            }
+
+    def closeall(self) -> None:
+        """Close the idle connections; checked-out ones are closed when returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            self._close(conn)
+
+    def _checkout_slot(self, started: float):
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+            self._wait_time += time.monotonic() - started
+        return conn
+
+    def _checkout(self):
+        # Every idle connection may be dead after a server restart, so each
+        # replacement is checked too, up to one attempt per pool slot.
+        for _ in range(self.max_size + 1):
+            conn = self._getconn()
+            if not self.health_check or self._is_healthy(conn):
+                return conn
+            logger.warning("Discarding broken pooled connection.")
+            self._close(conn)
+            with self._lock:
+                self._discarded += 1
+        raise psycopg2.OperationalError("Could not get a healthy database connection")
+
+    def _getconn(self):
+        # Most recently returned first: it is the least likely to have been
+        # dropped by the server or a proxy for being idle.
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def _connect(self):
+        return psycopg2.connect(self._dsn, cursor_factory=CURSOR_FACTORY)
+
+    @staticmethod
+    def _close(conn) -> None:
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    @staticmethod
+    def _is_healthy(conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def init_pool(db_url: Optional[str] = None) -> ConnectionPool:
+    """
+    Create the process-wide pool from DATABASE_URL and the DB_POOL_* settings
+    and bring the schema up to date before any request uses it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if db_url is None:
+                db_url = os.environ.get("DATABASE_URL")
+            pool = ConnectionPool(
+                db_url,
+                min_size=int(os.environ.get("DB_POOL_MIN_SIZE", DEFAULT_MIN_SIZE)),
+                max_size=int(os.environ.get("DB_POOL_MAX_SIZE", DEFAULT_MAX_SIZE)),
+                timeout=float(os.environ.get("DB_POOL_TIMEOUT", DEFAULT_TIMEOUT)),
+            )
+            try:
+                with pool.connection() as conn:
+                    run_migrations(conn)
+            except Exception:
+                pool.closeall()
+                raise
+            _pool = pool
+            logger.info(f"PostgreSQL connection pool ready ({pool.min_size}-{pool.max_size} connections).")
+        return _pool
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide pool, creating it on first use."""
+    if _pool is None:
+        return init_pool()
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
@@ -0,0 +1,130 @@
+import argparse
+from datetime import date
+from typing import Optional
+
+import loguru
+
+logger = loguru.logger
+
+DAILY_TOTALS_TABLE = """
+    CREATE TABLE IF NOT EXISTS daily_totals (
+        date DATE PRIMARY KEY,
+        total DOUBLE PRECISION NOT NULL DEFAULT 0,
+        count BIGINT NOT NULL DEFAULT 0,
+        tip DOUBLE PRECISION NOT NULL DEFAULT 0,
+        cut_count BIGINT NOT NULL DEFAULT 0
+    )
+"""
+
+_OLD_DELTAS = """SELECT date, -price AS price, -COALESCE(count, 0) AS count, -COALESCE(tip, 0) AS tip, -1 AS cuts
+                FROM old_rows"""
+_NEW_DELTAS = """SELECT date, price, COALESCE(count, 0) AS count, COALESCE(tip, 0) AS tip, 1 AS cuts
+                FROM new_rows"""
+
+
+def _apply_deltas(source: str) -> str:
+    return f"""
+            INSERT INTO daily_totals AS d (date, total, count, tip, cut_count)
+            SELECT date, SUM(price), SUM(count), SUM(tip), SUM(cuts)
+            FROM ({source}) AS deltas
+            WHERE date IS NOT NULL
+            GROUP BY date
+            ON CONFLICT (date) DO UPDATE SET
+                total = d.total + EXCLUDED.total,
+                count = d.count + EXCLUDED.count,
+                tip = d.tip + EXCLUDED.tip,
+                cut_count = d.cut_count + EXCLUDED.cut_count;
+            DELETE FROM daily_totals
+            WHERE cut_count <= 0 AND date IN (SELECT date FROM ({source}) AS deltas);"""
+
+
+# Statement-level trigger: a bulk DELETE by date folds into one upsert per
+# affected day instead of one per deleted row. Transition tables only exist
+# for the event that fired, hence one branch per operation.
+DAILY_TOTALS_FUNCTION = f"""
+    CREATE OR REPLACE FUNCTION haircuts_apply_daily_totals() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN{_apply_deltas(_NEW_DELTAS)}
+        ELSIF TG_OP = 'DELETE' THEN{_apply_deltas(_OLD_DELTAS)}
+        ELSE{_apply_deltas(_OLD_DELTAS + " UNION ALL " + _NEW_DELTAS)}
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+DAILY_TOTALS_TRIGGERS = [
+    """CREATE TRIGGER haircuts_daily_totals_insert AFTER INSERT ON haircuts
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION haircuts_apply_daily_totals()""",
+    """CREATE TRIGGER haircuts_daily_totals_update AFTER UPDATE ON haircuts
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION haircuts_apply_daily_totals()""",
+    """CREATE TRIGGER haircuts_daily_totals_delete AFTER DELETE ON haircuts
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION haircuts_apply_daily_totals()""",
+]
+
+
+def install_daily_totals(conn) -> None:
+    """Create the daily_totals rollup and the triggers that keep it current."""
+    cursor = conn.cursor()
+    cursor.execute(DAILY_TOTALS_TABLE)
+    cursor.execute(DAILY_TOTALS_FUNCTION)
+    for trigger in ("insert", "update", "delete"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS haircuts_daily_totals_{trigger} ON haircuts")
+    for statement in DAILY_TOTALS_TRIGGERS:
+        cursor.execute(statement)
+
+
+def rebuild_daily_totals(conn, date_from: Optional[date] = None, date_to: Optional[date] = None) -> int:
+    """
+    Recompute daily_totals from haircuts, optionally only for a date range,
+    and return the number of days written. Writes to haircuts are blocked
+    until the caller commits so the rollup cannot miss concurrent changes.
+    """
+    conditions = ["date IS NOT NULL"]
+    params: list = []
+    if date_from is not None:
+        conditions.append("date >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        conditions.append("date <= %s")
+        params.append(date_to)
+    where = " AND ".join(conditions)
+
+    cursor = conn.cursor()
+    cursor.execute("LOCK TABLE haircuts IN SHARE MODE")
+    cursor.execute(f"DELETE FROM daily_totals WHERE {where}", params)
+    cursor.execute(
+        f"""INSERT INTO daily_totals (date, total, count, tip, cut_count)
+        SELECT date, SUM(price), SUM(COALESCE(count, 0)), SUM(COALESCE(tip, 0)), COUNT(*)
+        FROM haircuts
+        WHERE {where}
+        GROUP BY date""",
+        params
+    )
+    return cursor.rowcount
+
+
+def main() -> None:
+    from .create_connection import create_connection
+
+    parser = argparse.ArgumentParser(description="Rebuild the daily_totals rollup from haircuts.")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="First day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Last day (YYYY-MM-DD)")
+    args = parser.parse_args()
+
+    connection = create_connection()
+    if connection is None:
+        raise SystemExit("Could not connect to the database")
+    try:
+        days = rebuild_daily_totals(connection, args.date_from, args.date_to)
+        connection.commit()
+        logger.info(f"Rebuilt daily totals for {days} days.")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
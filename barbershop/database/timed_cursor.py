@@ -0,0 +1,72 @@
+"""
+Cursor that records each statement's latency and row count in
+`barbershop.metrics`, labelled with the repository method that ran it, and
+hands slow statements to `barbershop.slow_queries`.
+"""
+import time
+
+import loguru
+import psycopg2
+from psycopg2.extensions import cursor as plain_cursor
+from psycopg2.extras import RealDictCursor
+
+from barbershop.metrics import METRICS_ENABLED, metrics, query_caller
+from barbershop.slow_queries import SLOW_QUERY_EXPLAIN, SLOW_QUERY_SECONDS, explain_statement, is_slow, slow_query_log
+
+logger = loguru.logger
+
+# Plans are captured inside a savepoint so a failing EXPLAIN cannot abort
+# the caller's transaction.
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+
+class TimedCursor(RealDictCursor):
+    def execute(self, query, vars=None):
+        return self._timed(super().execute, query, vars, explain=True)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super().executemany, query, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        return self._timed(lambda query, _: super(TimedCursor, self).copy_expert(query, file, size), sql, None)
+
+    def _timed(self, run, query, params, explain: bool = False):
+        caller = query_caller() if METRICS_ENABLED else None
+        started = time.perf_counter()
+        succeeded = False
+        try:
+            result = run(query, params)
+            succeeded = True
+            return result
+        finally:
+            seconds = time.perf_counter() - started
+            if METRICS_ENABLED:
+                metrics.observe_query(caller, seconds, self.rowcount)
+            if is_slow(seconds):
+                caller = caller or query_caller()
+                plan = None
+                if explain and succeeded and SLOW_QUERY_EXPLAIN and self.name is None:
+                    plan = self._explain(query, params, caller)
+                slow_query_log.record(caller, query, params, seconds, self.rowcount, plan)
+
+    def _explain(self, query, params, caller):
+        cursor = self.connection.cursor(cursor_factory=plain_cursor)
+        try:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            cursor.execute(explain_statement(query, caller), params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            return plan
+        except Exception as e:
+            logger.warning(f"Could not explain slow query: {e}")
+            try:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            except psycopg2.Error:
+                pass
+            return None
+        finally:
+            cursor.close()
+
+
+# Cursor class for the pooled connections.
+CURSOR_FACTORY = TimedCursor if METRICS_ENABLED or SLOW_QUERY_SECONDS else RealDictCursor
@@ -0,0 +1,64 @@
+"""
+Retention for haircut_tombstones.
+
+Tombstones only matter to clients holding a change token older than the
+delete, so they can be dropped once every client has synced past them.
+`prune_tombstones` deletes those older than a retention period and moves
+the `sync_horizons` row for haircuts past them; change tokens from before
+that horizon are then rejected and the client has to run a full sync.
+Run it periodically, e.g. from cron:
+
+    python -m barbershop.database.tombstones --days 90
+"""
+import argparse
+import os
+from datetime import timedelta
+
+import loguru
+
+logger = loguru.logger
+
+TOMBSTONE_RETENTION_DAYS = int(os.environ.get("TOMBSTONE_RETENTION_DAYS", 90))
+
+_PRUNE_TOMBSTONES = """
+    WITH pruned AS (
+        DELETE FROM haircut_tombstones WHERE deleted_at < now() - %s RETURNING changed_xid
+    ), horizon AS (
+        UPDATE sync_horizons SET pruned_xid = (SELECT MAX(changed_xid) FROM pruned)
+        WHERE table_name = 'haircuts'
+          AND (SELECT MAX(changed_xid) FROM pruned) > pruned_xid
+    )
+    SELECT COUNT(*) AS pruned FROM pruned
+"""
+
+
+def prune_tombstones(conn, older_than: timedelta = timedelta(days=TOMBSTONE_RETENTION_DAYS)) -> int:
+    """
+    Delete tombstones older than `older_than`, raise the haircuts sync
+    horizon past them and return how many were deleted. The caller commits.
+    """
+    cursor = conn.cursor()
+    cursor.execute(_PRUNE_TOMBSTONES, (older_than,))
+    return cursor.fetchone()["pruned"]
+
+
+def main() -> None:
+    from .create_connection import create_connection
+
+    parser = argparse.ArgumentParser(description="Delete haircut tombstones older than the retention period.")
+    parser.add_argument("--days", type=int, default=TOMBSTONE_RETENTION_DAYS, help="Days to keep tombstones")
+    args = parser.parse_args()
+
+    connection = create_connection()
+    if connection is None:
+        raise SystemExit("Could not connect to the database")
+    try:
+        pruned = prune_tombstones(connection, timedelta(days=args.days))
+        connection.commit()
+        logger.info(f"Pruned {pruned} haircut tombstones.")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
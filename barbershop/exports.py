@@ -0,0 +1,148 @@
+"""
+Serializers that turn batches of raw haircut rows into export chunks.
+
+The Arrow and Parquet writers need the optional `pyarrow` dependency
+(`pip install barbershop[analytics]`).
+"""
+import csv
+import io
+import json
+from typing import Iterable, Iterator
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional "analytics" extra
+    pyarrow = None
+
+EXPORT_COLUMNS = ("id", "clientName", "serviceName", "price", "date", "time", "count", "tip")
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+COLUMNAR_FORMATS = ("arrow", "parquet")
+COLUMNAR_BATCH_SIZE = 50_000
+
+
+def _export_values(row: dict) -> tuple:
+    return (
+        str(row["id"]),
+        row["client_name"],
+        row["service_name"],
+        row["price"],
+        row["date"].isoformat() if row["date"] else None,
+        row["time"],
+        row["count"] or 0,
+        row["tip"] or 0,
+    )
+
+
+def csv_chunks(batches: Iterable[list[dict]]) -> Iterator[str]:
+    """Yield a header line and then one CSV chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+    for rows in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_export_values(row) for row in rows)
+        yield buffer.getvalue()
+
+
+def ndjson_chunks(batches: Iterable[list[dict]]) -> Iterator[str]:
+    """Yield one chunk of newline-delimited JSON objects per batch."""
+    for rows in batches:
+        yield "".join(
+            json.dumps(dict(zip(EXPORT_COLUMNS, _export_values(row))), ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def arrow_schema():
+    uuid_metadata = {b"ARROW:extension:name": b"arrow.uuid", b"ARROW:extension:metadata": b""}
+    return pyarrow.schema([
+        pyarrow.field("id", pyarrow.binary(16), nullable=False, metadata=uuid_metadata),
+        pyarrow.field("clientName", pyarrow.string()),
+        pyarrow.field("serviceName", pyarrow.string()),
+        pyarrow.field("price", pyarrow.float64()),
+        pyarrow.field("date", pyarrow.date32()),
+        pyarrow.field("time", pyarrow.string()),
+        pyarrow.field("count", pyarrow.int32()),
+        pyarrow.field("tip", pyarrow.float64()),
+    ])
+
+
+def _record_batch(rows: list[dict], schema):
+    return pyarrow.record_batch(
+        [
+            [row["id"].bytes for row in rows],
+            [row["client_name"] for row in rows],
+            [row["service_name"] for row in rows],
+            [row["price"] for row in rows],
+            [row["date"] for row in rows],
+            [row["time"] for row in rows],
+            [row["count"] or 0 for row in rows],
+            [row["tip"] or 0 for row in rows],
+        ],
+        schema=schema,
+    )
+
+
+def arrow_chunks(batches: Iterable[list[dict]]) -> Iterator[bytes]:
+    """Yield an Arrow IPC stream (zstd-compressed) one record batch at a time."""
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    options = pyarrow.ipc.IpcWriteOptions(compression="zstd")
+    with pyarrow.ipc.new_stream(sink, schema, options=options) as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_chunks(batches: Iterable[list[dict]]) -> Iterator[bytes]:
+    """Yield a zstd-compressed Parquet file, one row group per batch."""
+    schema = arrow_schema()
+    sink = _ChunkSink()
+    with pyarrow.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for rows in batches:
+            writer.write_batch(_record_batch(rows, schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+EXPORT_WRITERS = {
+    "csv": csv_chunks,
+    "ndjson": ndjson_chunks,
+    "arrow": arrow_chunks,
+    "parquet": parquet_chunks,
+}
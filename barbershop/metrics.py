@@ -0,0 +1,185 @@
+"""
+Request and query metrics in the Prometheus text format.
+
+`record_request_metrics` counts requests by method, route template and
+status and keeps a latency histogram per route. The pooled connections use
+a cursor that reports each statement's latency and row count under the
+repository method that ran it (see `query_caller`). Everything lives in
+process memory behind one lock, so each worker exposes its own numbers on
+`/metrics`; set METRICS_ENABLED=0 to turn the recording and the endpoint
+off.
+"""
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from fastapi import Request
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Frames from these modules are skipped when naming the caller of a query.
+_DRIVER_MODULES = ("psycopg", "barbershop.database.timed_cursor", "barbershop.database.async_pool")
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in sorted(self._series.items()):
+            base = _format_labels(self.labels, labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{base}{"," if base else ""}le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{base}}} {total}"
+            yield f"{self.name}_count{{{base}}} {cumulative}"
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, amount: float = 1) -> None:
+        self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self._series.items()):
+            yield f"{self.name}{{{_format_labels(self.labels, labels)}}} {value}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter(
+            "barbershop_http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status")
+        )
+        self.request_duration = Histogram(
+            "barbershop_http_request_duration_seconds",
+            "HTTP request latency by method and route.",
+            ("method", "route"),
+            REQUEST_BUCKETS,
+        )
+        self.query_duration = Histogram(
+            "barbershop_db_query_duration_seconds",
+            "Database statement latency by repository method.",
+            ("caller",),
+            QUERY_BUCKETS,
+        )
+        self.query_rows = Counter(
+            "barbershop_db_query_rows_total", "Rows returned or affected by repository method.", ("caller",)
+        )
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        with self._lock:
+            self.requests.inc((method, route, str(status)))
+            self.request_duration.observe((method, route), seconds)
+
+    def observe_query(self, caller: str, seconds: float, rows: int) -> None:
+        with self._lock:
+            self.query_duration.observe((caller,), seconds)
+            self.query_rows.inc((caller,), max(rows, 0))
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [line for metric in self._metrics() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in self._metrics():
+                metric._series.clear()
+
+    def _metrics(self) -> tuple:
+        return (self.requests, self.request_duration, self.query_duration, self.query_rows)
+
+
+metrics = MetricsRegistry()
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Label per code object, or None for frames query_caller skips. Runs for
+# every statement, so each function is classified once.
+_caller_labels: dict = {}
+
+
+def _caller_label(frame) -> Optional[str]:
+    code = frame.f_code
+    try:
+        return _caller_labels[code]
+    except KeyError:
+        pass
+    label = None
+    if not code.co_name.startswith("_") and not frame.f_globals.get("__name__", "").startswith(_DRIVER_MODULES):
+        label = getattr(code, "co_qualname", code.co_name)
+    _caller_labels[code] = label
+    return label
+
+
+def query_caller() -> str:
+    """
+    Name of the function that ran a statement, e.g. `HaircutRepository.get_by_id`.
+    Driver frames (psycopg, psycopg2.extras, the timed cursors) and private
+    helpers such as `_fetchall` are skipped.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        label = _caller_label(frame)
+        if label is not None:
+            return label
+        frame = frame.f_back
+    return "unknown"
+
+
+def route_template(request: Request) -> str:
+    """Path template of the matched route, so ids do not create new series."""
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+async def record_request_metrics(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.observe_request(request.method, route_template(request), status, time.perf_counter() - started)
+
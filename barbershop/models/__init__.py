@@ -1,3 +1,27 @@
-from .haircut import Haircut, HaircutCreate, ServicePrice, ServicePriceCreate, ClientStats, ClientHistory
+from .haircut import (
+    Haircut,
+    HaircutCreate,
+    HaircutFilters,
+    BulkItemResult,
+    BulkCreateResult,
+    ServicePrice,
+    ServicePriceCreate,
+    DailyTotal,
+    ClientStats,
+    ClientHistory,
+    HaircutChanges,
+)
 
-__all__ = ["Haircut", "HaircutCreate", "ServicePrice", "ServicePriceCreate", "ClientStats", "ClientHistory"]
+__all__ = [
+    "Haircut",
+    "HaircutCreate",
+    "HaircutFilters",
+    "BulkItemResult",
+    "BulkCreateResult",
+    "ServicePrice",
+    "ServicePriceCreate",
+    "DailyTotal",
+    "ClientStats",
+    "ClientHistory",
+    "HaircutChanges",
+]
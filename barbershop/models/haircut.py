@@ -39,6 +39,35 @@ class Haircut(BaseModel):
         from_attributes = True
 
 
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class BulkCreateResult(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkItemResult]
+
+
+class HaircutFilters(BaseModel):
+    dateFrom: Optional[date_type] = None
+    dateTo: Optional[date_type] = None
+    serviceName: Optional[str] = None
+    clientName: Optional[str] = None
+    minPrice: Optional[float] = None
+    maxPrice: Optional[float] = None
+
+
+class DailyTotal(BaseModel):
+    date: date_type
+    total: float = 0
+    count: int = 0
+    tip: float = 0
+    cuts: int = 0
+
+
 class ClientStats(BaseModel):
     clientName: str
     totalCuts: int
@@ -51,3 +80,9 @@ class ClientStats(BaseModel):
 class ClientHistory(BaseModel):
     clientName: str
     haircuts: list[Haircut]
+
+
+class HaircutChanges(BaseModel):
+    token: str
+    upserted: list[Haircut]
+    deleted: list[UUID]
@@ -0,0 +1,172 @@
+"""
+On-demand sampling profiles of single requests.
+
+A request sent with `X-Profile: 1` and a valid `X-Admin-Token` runs while a
+background thread samples the Python stacks of every thread each
+PROFILE_INTERVAL_MS. Only stacks that pass through barbershop, FastAPI or
+Starlette code, or busy threadpool workers, are kept, which leaves out idle
+workers and the event loop waiting on its selector. Sync endpoints run on threadpool threads
+and their dependencies may run on other threads, so sampling every thread
+is what captures the whole path: get_db, the pool, the repository and
+serialization. Other requests running at the same time on this worker can
+show up in the profile too.
+
+The result is stored in collapsed-stack format (`frame;frame;frame count`,
+root first), which flamegraph.pl and speedscope read directly, and its id
+is returned in the `X-Profile-Id` header. Sampling stops once the response
+body has been sent, so streamed responses such as `/haircuts/export` are
+profiled to the end. Only one request per worker is profiled at a time.
+
+The middleware is only installed with PROFILING_ENABLED=1, so requests
+pay nothing for it otherwise.
+"""
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import Request
+
+from barbershop.admin_auth import ADMIN_TOKEN_HEADER, admin_token_matches
+
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "0") == "1"
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_INTERVAL_SECONDS = float(os.environ.get("PROFILE_INTERVAL_MS", 1)) / 1000
+PROFILE_STORE_SIZE = int(os.environ.get("PROFILE_STORE_SIZE", 20))
+
+# Stacks passing through these packages are request work.
+_APP_MODULES = ("barbershop", "fastapi", "starlette")
+# Threadpool threads run sync endpoints and response validation; they are
+# idle when their innermost frame is waiting for the next job.
+_WORKER_MODULE = "anyio"
+_IDLE_MODULES = ("threading", "queue")
+# Long-lived threads of the app that never handle requests.
+_BACKGROUND_THREADS = ("profiler", "pg-notification-listener")
+
+
+def collapse_stack(frame) -> Optional[str]:
+    """`module:function` frames from root to leaf, or None for idle stacks."""
+    leaf_module = frame.f_globals.get("__name__", "?")
+    names = []
+    in_app = in_worker = False
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "?")
+        in_app = in_app or module.startswith(_APP_MODULES)
+        in_worker = in_worker or module.startswith(_WORKER_MODULE)
+        names.append(f"{module}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    if not (in_app or (in_worker and not leaf_module.startswith(_IDLE_MODULES))):
+        return None
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples every thread's stack from a background thread until stopped."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            background = {thread.ident for thread in threading.enumerate() if thread.name in _BACKGROUND_THREADS}
+            for ident, frame in sys._current_frames().items():
+                if ident in background:
+                    continue
+                stack = collapse_stack(frame)
+                if stack is not None:
+                    self.stacks[stack] += 1
+            self.samples += 1
+
+
+class ProfileStore:
+    """The last PROFILE_STORE_SIZE profiles of this worker."""
+
+    def __init__(self, size: int = PROFILE_STORE_SIZE):
+        self._profiles: deque = deque(maxlen=size)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def add(self, profile_id: int, method: str, path: str, status: int, seconds: float, profiler: SamplingProfiler) -> None:
+        with self._lock:
+            self._profiles.append({
+                "id": profile_id,
+                "at": datetime.now(timezone.utc).isoformat(),
+                "method": method,
+                "path": path,
+                "status": status,
+                "durationMs": round(seconds * 1000, 3),
+                "samples": profiler.samples,
+                "intervalMs": profiler.interval * 1000,
+                "stacks": dict(profiler.stacks),
+            })
+
+    def summaries(self) -> list[dict]:
+        """Stored profiles without their stacks, newest first."""
+        with self._lock:
+            return [{key: value for key, value in profile.items() if key != "stacks"} for profile in reversed(self._profiles)]
+
+    def collapsed(self, profile_id: int) -> Optional[str]:
+        with self._lock:
+            for profile in self._profiles:
+                if profile["id"] == profile_id:
+                    return "".join(f"{stack} {count}\n" for stack, count in sorted(profile["stacks"].items()))
+        return None
+
+
+profile_store = ProfileStore()
+_profiling = threading.Lock()
+
+
+async def profile_request(request: Request, call_next):
+    if request.headers.get(PROFILE_HEADER) != "1" or not admin_token_matches(request.headers.get(ADMIN_TOKEN_HEADER)):
+        return await call_next(request)
+    if not _profiling.acquire(blocking=False):
+        return await call_next(request)
+    profiler = SamplingProfiler()
+    profile_id = profile_store.new_id()
+    started = time.perf_counter()
+
+    def finish(status: int) -> None:
+        profiler.stop()
+        profile_store.add(profile_id, request.method, request.url.path, status, time.perf_counter() - started, profiler)
+        _profiling.release()
+
+    profiler.start()
+    try:
+        response = await call_next(request)
+    except BaseException:
+        finish(500)
+        raise
+    body = response.body_iterator
+
+    async def profiled_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish(response.status_code)
+
+    response.body_iterator = profiled_body()
+    response.headers[PROFILE_ID_HEADER] = str(profile_id)
+    return response
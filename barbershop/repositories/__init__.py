@@ -1,5 +1,24 @@
-from .base import BaseRepository
-from .haircuts import HaircutRepository
-from .handler_errors import NotFoundResponse
-
-__all__ = ["BaseRepository", "HaircutRepository", "NotFoundResponse"]
+from .base import BaseRepository
+from .cursors import ExpiredChangeToken, InvalidCursor
+from .haircut_sql import parse_haircut_date
+from .haircuts import HaircutRepository
+from .haircuts_async import AsyncHaircutRepository
+from .handler_errors import NotFoundResponse
+from .service_prices import SERVICE_PRICES_CHANNEL, PriceCatalogue, ServicePriceRepository, price_catalogue
+from .table_versions import AsyncTableVersionRepository, TableVersionRepository
+
+__all__ = [
+    "BaseRepository",
+    "HaircutRepository",
+    "AsyncHaircutRepository",
+    "ExpiredChangeToken",
+    "InvalidCursor",
+    "NotFoundResponse",
+    "parse_haircut_date",
+    "SERVICE_PRICES_CHANNEL",
+    "PriceCatalogue",
+    "ServicePriceRepository",
+    "price_catalogue",
+    "TableVersionRepository",
+    "AsyncTableVersionRepository",
+]
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import date
+from uuid import UUID
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class ExpiredChangeToken(InvalidCursor):
+    """Raised when the tombstones a change token needs have been pruned."""
+
+
+def _encode(payload: dict) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def _decode(token: str) -> dict:
+    padded = token + "=" * (-len(token) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(cursor_date: date, cursor_id: UUID) -> str:
+    """Encode the (date, id) keyset position of the last row of a page."""
+    return _encode({"d": cursor_date.isoformat(), "i": str(cursor_id)})
+
+
+def decode_cursor(token: str) -> tuple[date, UUID]:
+    try:
+        payload = _decode(token)
+        return date.fromisoformat(payload["d"]), UUID(payload["i"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
+
+
+def encode_change_token(xmin: int) -> str:
+    """Encode the transaction horizon a changes request was answered at."""
+    return _encode({"x": xmin})
+
+
+def decode_change_token(token: str) -> int:
+    try:
+        xmin = _decode(token)["x"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(f"Invalid change token: {token}") from e
+    if not isinstance(xmin, int) or xmin < 0:
+        raise InvalidCursor(f"Invalid change token: {token}")
+    return xmin
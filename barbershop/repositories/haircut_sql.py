@@ -0,0 +1,281 @@
+"""
+SQL and row helpers shared by the sync and async haircut repositories.
+
+Both repositories run the same statements and map rows the same way; only
+the driver calls differ, so everything that is not a driver call lives here.
+"""
+from datetime import date
+from typing import Optional, Sequence
+from uuid import uuid4
+
+from barbershop.models import ClientStats, DailyTotal, Haircut, HaircutCreate, HaircutFilters
+from .cursors import ExpiredChangeToken, decode_cursor, encode_cursor
+from .mappers import HAIRCUT_FIELD_COLUMNS, haircuts_from_rows, partial_haircuts_from_rows
+
+HAIRCUT_COLUMNS = "id, client_name, service_name, price, date, time, count, tip"
+_RETURNING_COLUMNS = "h.id, h.client_name, h.service_name, h.price, h.date, h.time, h.count, h.tip"
+
+SELECT_HAIRCUTS = f"SELECT {HAIRCUT_COLUMNS} FROM haircuts"
+INSERT_HAIRCUT = f"INSERT INTO haircuts ({HAIRCUT_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"
+UPDATE_HAIRCUT = f"""WITH previous AS (SELECT id, date FROM haircuts WHERE id = %s FOR UPDATE)
+            UPDATE haircuts h
+            SET client_name = %s, service_name = %s, price = %s, date = %s, time = %s, count = %s, tip = %s
+            FROM previous WHERE h.id = previous.id
+            RETURNING {_RETURNING_COLUMNS}, previous.date AS previous_date"""
+UPDATE_PRICE = f"UPDATE haircuts h SET price = %s WHERE id = %s RETURNING {_RETURNING_COLUMNS}"
+DELETE_HAIRCUT = "DELETE FROM haircuts WHERE id = %s RETURNING date"
+DELETE_BY_DATE = "DELETE FROM haircuts WHERE date = %s"
+CHANGE_HORIZON = "SELECT pg_snapshot_xmin(pg_current_snapshot())::text AS xmin"
+CHANGED_HAIRCUTS = f"{SELECT_HAIRCUTS} WHERE changed_xid >= %s::xid8"
+DELETED_HAIRCUTS = "SELECT id FROM haircut_tombstones WHERE changed_xid >= %s::xid8"
+PRUNED_HORIZON = "SELECT pruned_xid::text AS xid FROM sync_horizons WHERE table_name = 'haircuts'"
+DAILY_SUMMARY = "SELECT date, total FROM daily_totals ORDER BY date DESC"
+DAY_TOTALS = "SELECT date, total, count, tip, cut_count FROM daily_totals WHERE date = %s"
+GLOBAL_STATS = """
+            SELECT
+                COALESCE(SUM(cut_count), 0) AS total_cuts,
+                COALESCE(SUM(total), 0) AS total_revenue,
+                MIN(date) AS first_cut_date
+            FROM daily_totals
+        """
+UNIQUE_CLIENTS = "SELECT DISTINCT client_name FROM haircuts ORDER BY client_name"
+
+_CLIENT_STATS_SELECT = """SELECT
+                client_name,
+                COUNT(*) as total_cuts,
+                SUM(price) as total_spent,
+                COALESCE(SUM(tip), 0) as total_tip,
+                MAX(date) as last_visit,
+                array_agg(DISTINCT service_name ORDER BY service_name) as services
+            FROM haircuts"""
+CLIENT_STATS = f"""{_CLIENT_STATS_SELECT}
+            WHERE client_name = %s
+            GROUP BY client_name"""
+TOP_CLIENTS = f"""{_CLIENT_STATS_SELECT}
+            GROUP BY client_name
+            ORDER BY total_cuts DESC
+            LIMIT %s"""
+CLIENTS_BY_SPENT = f"""{_CLIENT_STATS_SELECT}
+            GROUP BY client_name
+            ORDER BY total_spent DESC
+            LIMIT %s"""
+
+
+def to_client_stats(row) -> ClientStats:
+    return ClientStats(
+        clientName=row["client_name"],
+        totalCuts=row["total_cuts"],
+        totalSpent=float(row["total_spent"]) if row["total_spent"] else 0,
+        totalTip=float(row["total_tip"]) if row["total_tip"] else 0,
+        lastVisit=str(row["last_visit"]) if row["last_visit"] else "",
+        services=row["services"] or []
+    )
+
+
+def parse_haircut_date(value) -> date:
+    """Parse a DD/MM/YYYY or ISO date; raises ValueError when it is neither."""
+    if isinstance(value, date):
+        return value
+    parts = value.split('/')
+    if len(parts) == 3:
+        return date(int(parts[2]), int(parts[1]), int(parts[0]))
+    return date.fromisoformat(value)
+
+
+def new_haircut(item: HaircutCreate) -> Haircut:
+    return Haircut(
+        id=uuid4(),
+        clientName=item.clientName,
+        serviceName=item.serviceName,
+        price=item.price,
+        date=parse_haircut_date(item.date),
+        time=item.time,
+        count=item.count,
+        tip=getattr(item, 'tip', 0)
+    )
+
+
+def check_change_horizon(xmin: int, horizon) -> None:
+    if horizon is not None and xmin <= int(horizon["xid"]):
+        raise ExpiredChangeToken("Change token is older than the pruned tombstones; sync again without since")
+
+
+def to_daily_total(row) -> DailyTotal:
+    return DailyTotal(
+        date=row["date"],
+        total=row["total"],
+        count=row["count"],
+        tip=row["tip"],
+        cuts=row["cut_count"]
+    )
+
+
+def haircut_values(haircut: Haircut) -> tuple:
+    return (
+        haircut.id, haircut.clientName, haircut.serviceName, haircut.price,
+        haircut.date, haircut.time, haircut.count, haircut.tip,
+    )
+
+
+def to_global_stats(row) -> dict:
+    total_cuts = int(row["total_cuts"])
+    return {
+        "totalCuts": total_cuts,
+        "totalRevenue": row["total_revenue"],
+        "averageTicket": row["total_revenue"] / total_cuts if total_cuts else 0,
+        "firstCutDate": row["first_cut_date"].isoformat() if row["first_cut_date"] else None,
+    }
+
+
+def _select_columns(fields: Optional[Sequence[str]], *required: str) -> str:
+    """SQL projection for `fields` (every column when None) plus the `required` columns."""
+    if fields is None:
+        return HAIRCUT_COLUMNS
+    columns = [HAIRCUT_FIELD_COLUMNS[field] for field in fields]
+    columns += [column for column in required if column not in columns]
+    return ", ".join(columns)
+
+
+def map_rows(rows, fields: Optional[Sequence[str]]) -> list:
+    if fields is None:
+        return haircuts_from_rows(rows)
+    return partial_haircuts_from_rows(rows, fields)
+
+
+def _filter_conditions(filters: Optional[HaircutFilters]) -> tuple[list[str], list]:
+    conditions: list[str] = []
+    params: list = []
+    if filters is None:
+        return conditions, params
+    if filters.dateFrom is not None:
+        conditions.append("date >= %s")
+        params.append(filters.dateFrom)
+    if filters.dateTo is not None:
+        conditions.append("date <= %s")
+        params.append(filters.dateTo)
+    if filters.serviceName is not None:
+        conditions.append("service_name = %s")
+        params.append(filters.serviceName)
+    if filters.clientName is not None:
+        conditions.append("client_name = %s")
+        params.append(filters.clientName)
+    if filters.minPrice is not None:
+        conditions.append("price >= %s")
+        params.append(filters.minPrice)
+    if filters.maxPrice is not None:
+        conditions.append("price <= %s")
+        params.append(filters.maxPrice)
+    return conditions, params
+
+
+def list_query(
+    limit: Optional[int],
+    after: Optional[str],
+    filters: Optional[HaircutFilters],
+    fields: Optional[Sequence[str]],
+) -> tuple[str, list]:
+    conditions, params = _filter_conditions(filters)
+    if after is not None:
+        after_date, after_id = decode_cursor(after)
+        conditions.append("(date, id) < (%s, %s)")
+        params.extend([after_date, after_id])
+    required = ("date", "id") if limit is not None else ()
+    query = f"SELECT {_select_columns(fields, *required)} FROM haircuts"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY date DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, params
+
+
+def list_page(rows: list, limit: Optional[int], fields: Optional[Sequence[str]]) -> tuple[list, Optional[str]]:
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["date"], rows[-1]["id"])
+    return map_rows(rows, fields), next_cursor
+
+
+def export_query(filters: Optional[HaircutFilters]) -> tuple[str, list]:
+    conditions, params = _filter_conditions(filters)
+    query = SELECT_HAIRCUTS
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY date DESC, id DESC"
+    return query, params
+
+
+def by_date_query(fields: Optional[Sequence[str]]) -> str:
+    return f"SELECT {_select_columns(fields)} FROM haircuts WHERE date = %s ORDER BY id DESC;"
+
+
+def client_haircuts_query(fields: Optional[Sequence[str]]) -> str:
+    return f"""SELECT {_select_columns(fields)}
+            FROM haircuts WHERE client_name = %s ORDER BY date DESC, id DESC"""
+
+
+def daily_history_query(
+    limit: Optional[int],
+    after: Optional[date],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    with_clients: bool,
+) -> tuple[str, list]:
+    columns = ["d.date", "d.total", "d.count", "d.tip"]
+    join = ""
+    if with_clients:
+        columns += ["c.clients", "c.client_count"]
+        join = """
+            CROSS JOIN LATERAL (
+                SELECT array_agg(client_name) AS clients, COUNT(DISTINCT client_name) AS client_count
+                FROM haircuts h WHERE h.date = d.date
+            ) c"""
+    conditions: list[str] = []
+    params: list = []
+    if after is not None:
+        conditions.append("d.date < %s")
+        params.append(after)
+    if date_from is not None:
+        conditions.append("d.date >= %s")
+        params.append(date_from)
+    if date_to is not None:
+        conditions.append("d.date <= %s")
+        params.append(date_to)
+
+    query = f"SELECT {', '.join(columns)} FROM daily_totals d{join}"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY d.date DESC"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, params
+
+
+def daily_history_page(
+    rows: list,
+    limit: Optional[int],
+    include_clients: bool,
+    distinct_clients: bool,
+) -> tuple[list[dict], Optional[date]]:
+    next_after = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_after = rows[-1]["date"]
+
+    history = []
+    for row in rows:
+        day = {
+            "date": row["date"].isoformat(),
+            "total": row["total"],
+            "count": row["count"],
+            "tip": row["tip"],
+        }
+        if include_clients:
+            day["clients"] = row["clients"] or []
+        if distinct_clients:
+            day["clientCount"] = row["client_count"]
+        history.append(day)
+    return history, next_after
@@ -1,8 +1,55 @@
+import os
 from datetime import date
+from typing import Iterator, Optional, Sequence
 from uuid import UUID, uuid4
 
-from barbershop.models import Haircut, HaircutCreate, ClientStats
+from psycopg2.extras import execute_values
+
+from barbershop.cache import TTLCache
+from barbershop.models import Haircut, HaircutChanges, HaircutCreate, HaircutFilters, ClientStats, DailyTotal
+from .cursors import decode_change_token, encode_change_token
+from .haircut_sql import (
+    CHANGED_HAIRCUTS,
+    CHANGE_HORIZON,
+    CLIENTS_BY_SPENT,
+    CLIENT_STATS,
+    DAILY_SUMMARY,
+    DAY_TOTALS,
+    DELETED_HAIRCUTS,
+    DELETE_BY_DATE,
+    DELETE_HAIRCUT,
+    GLOBAL_STATS,
+    HAIRCUT_COLUMNS,
+    INSERT_HAIRCUT,
+    PRUNED_HORIZON,
+    SELECT_HAIRCUTS,
+    TOP_CLIENTS,
+    UNIQUE_CLIENTS,
+    UPDATE_HAIRCUT,
+    UPDATE_PRICE,
+    by_date_query,
+    check_change_horizon,
+    client_haircuts_query,
+    daily_history_page,
+    daily_history_query,
+    export_query,
+    haircut_values,
+    list_page,
+    list_query,
+    map_rows,
+    new_haircut,
+    to_client_stats,
+    to_daily_total,
+    to_global_stats,
+)
 from .handler_errors import NotFoundResponse
+from .mappers import haircut_from_row, haircuts_from_rows
+
+
+BULK_PAGE_SIZE = 500
+EXPORT_BATCH_SIZE = 2000
+
+day_totals_cache = TTLCache(ttl=float(os.environ.get("DAY_TOTALS_CACHE_TTL", 5)))
 
 
 class HaircutRepository:
@@ -10,248 +57,228 @@ class HaircutRepository:
         self.connection = connection
 
     def get_all(self) -> list[Haircut]:
+        haircuts, _ = self.list_haircuts()
+        return haircuts
+
+    def list_haircuts(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        filters: Optional[HaircutFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> tuple[list, Optional[str]]:
+        """
+        Return one page of haircuts ordered by date and id (newest first) and
+        the cursor for the next page, or None when this is the last one.
+        `after` is a cursor returned by a previous call. With `fields` only
+        those columns are read and items are dicts with just those fields.
+        """
+        query, params = list_query(limit, after, filters, fields)
         cursor = self.connection.cursor()
-        cursor.execute("SELECT id, client_name, service_name, price, date, time, count, tip FROM haircuts ORDER BY date DESC, id DESC")
-        cuts = cursor.fetchall()
-        return [
-            Haircut(
-                id=UUID(cut["id"]),
-                clientName=cut["client_name"],
-                serviceName=cut["service_name"],
-                price=cut["price"],
-                date=date.fromisoformat(cut["date"]) if cut["date"] else date.today(),
-                time=cut["time"],
-                count=cut["count"] if cut["count"] else 0,
-                tip=cut["tip"] if cut["tip"] else 0
-            )
-            for cut in cuts
-        ]
+        cursor.execute(query, params)
+        return list_page(cursor.fetchall(), limit, fields)
+
+    def iter_batches(
+        self,
+        filters: Optional[HaircutFilters] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> Iterator[list[dict]]:
+        """
+        Stream raw haircut rows in `batch_size` lists through a server-side
+        cursor, so memory use does not depend on the size of the table.
+        """
+        query, params = export_query(filters)
+        cursor = self.connection.cursor(name=f"haircuts_export_{uuid4().hex}")
+        cursor.itersize = batch_size
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+            self.connection.rollback()
+
+    def get_changes(self, since: Optional[str] = None) -> HaircutChanges:
+        """
+        Haircuts inserted or updated and ids deleted since the `since` token,
+        plus the token for the next call; without `since`, every haircut.
+
+        The token is the oldest transaction still running when the request
+        was answered: every write not visible to this read belongs to that
+        transaction or a later one, so it is returned next time. Rows may be
+        returned twice but never missed. Apply `upserted`, then `deleted`.
+        Raises ExpiredChangeToken when tombstones the token needs were pruned.
+        """
+        cursor = self.connection.cursor()
+        cursor.execute(CHANGE_HORIZON)
+        token = encode_change_token(int(cursor.fetchone()["xmin"]))
+        if since is None:
+            cursor.execute(SELECT_HAIRCUTS)
+            return HaircutChanges(token=token, upserted=haircuts_from_rows(cursor.fetchall()), deleted=[])
+
+        xmin = decode_change_token(since)
+        cursor.execute(PRUNED_HORIZON)
+        check_change_horizon(xmin, cursor.fetchone())
+        xmin = str(xmin)
+        cursor.execute(CHANGED_HAIRCUTS, (xmin,))
+        upserted = haircuts_from_rows(cursor.fetchall())
+        cursor.execute(DELETED_HAIRCUTS, (xmin,))
+        deleted = [row["id"] for row in cursor.fetchall()]
+        return HaircutChanges(token=token, upserted=upserted, deleted=deleted)
 
     def get_by_id(self, id: UUID) -> Haircut:
         cursor = self.connection.cursor()
-        cursor.execute(
-            "SELECT id, client_name, service_name, price, date, time, count, tip FROM haircuts WHERE id = %s;", (str(id),)
-        )
+        cursor.execute(f"{SELECT_HAIRCUTS} WHERE id = %s;", (id,))
         cut = cursor.fetchone()
         if cut:
-            return Haircut(
-                id=UUID(cut["id"]),
-                clientName=cut["client_name"],
-                serviceName=cut["service_name"],
-                price=cut["price"],
-                date=date.fromisoformat(cut["date"]) if cut["date"] else date.today(),
-                time=cut["time"],
-                count=cut["count"] if cut["count"] else 0,
-                tip=cut["tip"] if cut["tip"] else 0
-            )
+            return haircut_from_row(cut)
         raise NotFoundResponse(status_code=404, detail="Haircut not found")
 
-    def get_by_date(self, cutoff_date: date) -> list[Haircut]:
+    def get_by_date(self, cutoff_date: date, fields: Optional[Sequence[str]] = None) -> list:
         cursor = self.connection.cursor()
-        cursor.execute(
-            "SELECT id, client_name, service_name, price, date, time, count, tip FROM haircuts WHERE date = %s ORDER BY id DESC;", (cutoff_date.isoformat(),)
-        )
-        cuts = cursor.fetchall()
-        return [
-            Haircut(
-                id=UUID(cut["id"]),
-                clientName=cut["client_name"],
-                serviceName=cut["service_name"],
-                price=cut["price"],
-                date=date.fromisoformat(cut["date"]) if cut["date"] else date.today(),
-                time=cut["time"],
-                count=cut["count"] if cut["count"] else 0,
-                tip=cut["tip"] if cut["tip"] else 0
-            )
-            for cut in cuts
-        ]
+        cursor.execute(by_date_query(fields), (cutoff_date,))
+        return map_rows(cursor.fetchall(), fields)
 
     def get_daily_summary(self) -> dict[date, float]:
         cursor = self.connection.cursor()
-        cursor.execute(
-            "SELECT date, SUM(price) FROM haircuts GROUP BY date ORDER BY date DESC"
+        cursor.execute(DAILY_SUMMARY)
+        return {row["date"]: row["total"] for row in cursor.fetchall()}
+
+    def get_day_totals(self, day: date) -> DailyTotal:
+        """
+        Totals for one day, served from a short-lived per-process cache that
+        this repository's writes invalidate.
+        """
+        cached = day_totals_cache.get(day)
+        if cached is not None:
+            return cached
+        cursor = self.connection.cursor()
+        cursor.execute(DAY_TOTALS, (day,))
+        row = cursor.fetchone()
+        totals = DailyTotal(date=day) if row is None else to_daily_total(row)
+        day_totals_cache.set(day, totals)
+        return totals
+
+    def get_daily_history(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[date] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        include_clients: bool = False,
+        distinct_clients: bool = False,
+    ) -> tuple[list[dict], Optional[date]]:
+        """
+        Return per-day totals, newest first, and the date to pass as `after`
+        for the next page (None on the last page). Totals come from the
+        daily_totals rollup; haircuts are only read for the days in the page
+        when clients or their distinct count are requested.
+        """
+        query, params = daily_history_query(
+            limit, after, date_from, date_to, include_clients or distinct_clients
         )
-        results = cursor.fetchall()
-        return {date.fromisoformat(row["date"]): row["sum"] for row in results if row["date"]}
+        cursor = self.connection.cursor()
+        cursor.execute(query, params)
+        return daily_history_page(cursor.fetchall(), limit, include_clients, distinct_clients)
+
+    def get_global_stats(self) -> dict:
+        cursor = self.connection.cursor()
+        cursor.execute(GLOBAL_STATS)
+        return to_global_stats(cursor.fetchone())
 
     def create(self, item: HaircutCreate) -> Haircut:
-        item_date = item.date
-        if isinstance(item_date, str):
-            parts = item_date.split('/')
-            if len(parts) == 3:
-                item_date = date(int(parts[2]), int(parts[1]), int(parts[0]))
-            else:
-                item_date = date.fromisoformat(item_date)
-        
-        haircut = Haircut(
-            id=uuid4(),
-            clientName=item.clientName,
-            serviceName=item.serviceName,
-            price=item.price,
-            date=item_date,
-            time=item.time,
-            count=item.count,
-            tip=getattr(item, 'tip', 0)
-        )
+        haircut = new_haircut(item)
         cursor = self.connection.cursor()
-        cursor.execute(
-            "INSERT INTO haircuts (id, client_name, service_name, price, date, time, count, tip) VALUES (%s, %s, %s, %s, %s, %s, %s, %s);",
-            (str(haircut.id), haircut.clientName, haircut.serviceName, haircut.price, haircut.date.isoformat(), haircut.time, haircut.count, haircut.tip),
-        )
+        cursor.execute(INSERT_HAIRCUT, haircut_values(haircut))
         self.connection.commit()
+        day_totals_cache.invalidate(haircut.date)
         return haircut
 
+    def create_many(self, items: list[HaircutCreate]) -> list[Haircut]:
+        """Insert all items with multi-row INSERTs in a single transaction."""
+        haircuts = [new_haircut(item) for item in items]
+        if not haircuts:
+            return []
+        cursor = self.connection.cursor()
+        try:
+            execute_values(
+                cursor,
+                f"INSERT INTO haircuts ({HAIRCUT_COLUMNS}) VALUES %s",
+                [haircut_values(h) for h in haircuts],
+                page_size=BULK_PAGE_SIZE,
+            )
+            self.connection.commit()
+        except Exception:
+            self.connection.rollback()
+            raise
+        for day in {h.date for h in haircuts}:
+            day_totals_cache.invalidate(day)
+        return haircuts
+
     def update(self, item: Haircut) -> Haircut:
         cursor = self.connection.cursor()
-        cursor.execute(
-            "UPDATE haircuts SET client_name = %s, service_name = %s, price = %s, date = %s, time = %s, count = %s, tip = %s WHERE id = %s",
-            (item.clientName, item.serviceName, item.price, item.date.isoformat(), item.time, item.count, item.tip, str(item.id)),
-        )
+        cursor.execute(UPDATE_HAIRCUT, haircut_values(item))
+        row = cursor.fetchone()
         self.connection.commit()
-        return item
+        if row is None:
+            raise NotFoundResponse(status_code=404, detail="Haircut not found")
+        day_totals_cache.invalidate(row["previous_date"])
+        day_totals_cache.invalidate(row["date"])
+        return haircut_from_row(row)
 
     def update_price(self, id: UUID, new_price: float) -> Haircut:
         cursor = self.connection.cursor()
-        cursor.execute(
-            "UPDATE haircuts SET price = %s WHERE id = %s",
-            (new_price, str(id)),
-        )
+        cursor.execute(UPDATE_PRICE, (new_price, id))
+        row = cursor.fetchone()
         self.connection.commit()
-        return self.get_by_id(id)
+        if row is None:
+            raise NotFoundResponse(status_code=404, detail="Haircut not found")
+        day_totals_cache.invalidate(row["date"])
+        return haircut_from_row(row)
 
     def delete(self, id: UUID) -> None:
         cursor = self.connection.cursor()
-        cursor.execute("DELETE FROM haircuts WHERE id = %s", (str(id),))
+        cursor.execute(DELETE_HAIRCUT, (id,))
+        row = cursor.fetchone()
         self.connection.commit()
+        if row is None:
+            raise NotFoundResponse(status_code=404, detail="Haircut not found")
+        day_totals_cache.invalidate(row["date"])
 
     def delete_by_date(self, cutoff_date: date) -> int:
         cursor = self.connection.cursor()
-        cursor.execute(
-            "DELETE FROM haircuts WHERE date = %s", (cutoff_date.isoformat(),)
-        )
+        cursor.execute(DELETE_BY_DATE, (cutoff_date,))
         self.connection.commit()
+        day_totals_cache.invalidate(cutoff_date)
         return cursor.rowcount
 
     def get_unique_clients(self) -> list[str]:
         cursor = self.connection.cursor()
-        cursor.execute("SELECT DISTINCT client_name FROM haircuts ORDER BY client_name")
+        cursor.execute(UNIQUE_CLIENTS)
         return [row["client_name"] for row in cursor.fetchall()]
 
     def get_client_stats(self, client_name: str) -> ClientStats:
         cursor = self.connection.cursor()
-        cursor.execute(
-            """SELECT
-                client_name,
-                COUNT(*) as total_cuts,
-                SUM(price) as total_spent,
-                COALESCE(SUM(tip), 0) as total_tip,
-                MAX(date) as last_visit
-            FROM haircuts
-            WHERE client_name = %s
-            GROUP BY client_name""",
-            (client_name,)
-        )
+        cursor.execute(CLIENT_STATS, (client_name,))
         row = cursor.fetchone()
         if not row:
             raise NotFoundResponse(status_code=404, detail="Client not found")
-
-        cursor.execute(
-            """SELECT DISTINCT service_name FROM haircuts WHERE client_name = %s ORDER BY service_name""",
-            (client_name,)
-        )
-        services = [r["service_name"] for r in cursor.fetchall()]
-
-        return ClientStats(
-            clientName=row["client_name"],
-            totalCuts=row["total_cuts"],
-            totalSpent=float(row["total_spent"]) if row["total_spent"] else 0,
-            totalTip=float(row["total_tip"]) if row["total_tip"] else 0,
-            lastVisit=row["last_visit"] if row["last_visit"] else "",
-            services=services
-        )
+        return to_client_stats(row)
 
     def get_top_clients(self, limit: int = 10) -> list[ClientStats]:
         cursor = self.connection.cursor()
-        cursor.execute(
-            """SELECT
-                client_name,
-                COUNT(*) as total_cuts,
-                SUM(price) as total_spent,
-                COALESCE(SUM(tip), 0) as total_tip,
-                MAX(date) as last_visit
-            FROM haircuts
-            GROUP BY client_name
-            ORDER BY total_cuts DESC
-            LIMIT %s""",
-            (limit,)
-        )
-        clients = []
-        for row in cursor.fetchall():
-            cursor.execute(
-                """SELECT DISTINCT service_name FROM haircuts WHERE client_name = %s""",
-                (row["client_name"],)
-            )
-            services = [r["service_name"] for r in cursor.fetchall()]
-            clients.append(ClientStats(
-                clientName=row["client_name"],
-                totalCuts=row["total_cuts"],
-                totalSpent=float(row["total_spent"]) if row["total_spent"] else 0,
-                totalTip=float(row["total_tip"]) if row["total_tip"] else 0,
-                lastVisit=row["last_visit"] if row["last_visit"] else "",
-                services=services
-            ))
-        return clients
+        cursor.execute(TOP_CLIENTS, (limit,))
+        return [to_client_stats(row) for row in cursor.fetchall()]
 
-    def get_client_haircuts(self, client_name: str) -> list[Haircut]:
+    def get_client_haircuts(self, client_name: str, fields: Optional[Sequence[str]] = None) -> list:
         cursor = self.connection.cursor()
-        cursor.execute(
-            """SELECT id, client_name, service_name, price, date, time, count, tip
-            FROM haircuts WHERE client_name = %s ORDER BY date DESC, id DESC""",
-            (client_name,)
-        )
-        cuts = cursor.fetchall()
-        return [
-            Haircut(
-                id=UUID(cut["id"]),
-                clientName=cut["client_name"],
-                serviceName=cut["service_name"],
-                price=cut["price"],
-                date=date.fromisoformat(cut["date"]) if cut["date"] else date.today(),
-                time=cut["time"],
-                count=cut["count"] if cut["count"] else 0,
-                tip=cut["tip"] if cut["tip"] else 0
-            )
-            for cut in cuts
-        ]
+        cursor.execute(client_haircuts_query(fields), (client_name,))
+        return map_rows(cursor.fetchall(), fields)
 
     def get_clients_by_spent(self, limit: int = 10) -> list[ClientStats]:
         cursor = self.connection.cursor()
-        cursor.execute(
-            """SELECT
-                client_name,
-                COUNT(*) as total_cuts,
-                SUM(price) as total_spent,
-                COALESCE(SUM(tip), 0) as total_tip,
-                MAX(date) as last_visit
-            FROM haircuts
-            GROUP BY client_name
-            ORDER BY total_spent DESC
-            LIMIT %s""",
-            (limit,)
-        )
-        clients = []
-        for row in cursor.fetchall():
-            cursor.execute(
-                """SELECT DISTINCT service_name FROM haircuts WHERE client_name = %s""",
-                (row["client_name"],)
-            )
-            services = [r["service_name"] for r in cursor.fetchall()]
-            clients.append(ClientStats(
-                clientName=row["client_name"],
-                totalCuts=row["total_cuts"],
-                totalSpent=float(row["total_spent"]) if row["total_spent"] else 0,
-                totalTip=float(row["total_tip"]) if row["total_tip"] else 0,
-                lastVisit=row["last_visit"] if row["last_visit"] else "",
-                services=services
-            ))
-        return clients
+        cursor.execute(CLIENTS_BY_SPENT, (limit,))
+        return [to_client_stats(row) for row in cursor.fetchall()]
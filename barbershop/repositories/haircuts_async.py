@@ -0,0 +1,219 @@
+"""
+Async variant of HaircutRepository for psycopg 3 connections.
+
+Same methods, queries and row mapping as the sync repository (they share
+the SQL and helpers in `haircut_sql`); only the driver calls are awaited.
+Connections come from the async pool with dict rows, like RealDictCursor.
+"""
+from datetime import date
+from typing import AsyncIterator, Optional, Sequence
+from uuid import UUID, uuid4
+
+from barbershop.models import Haircut, HaircutChanges, HaircutCreate, HaircutFilters, ClientStats, DailyTotal
+from .cursors import decode_change_token, encode_change_token
+from .handler_errors import NotFoundResponse
+from .haircut_sql import (
+    CHANGE_HORIZON,
+    CHANGED_HAIRCUTS,
+    CLIENT_STATS,
+    CLIENTS_BY_SPENT,
+    DAILY_SUMMARY,
+    DAY_TOTALS,
+    DELETE_BY_DATE,
+    DELETE_HAIRCUT,
+    DELETED_HAIRCUTS,
+    GLOBAL_STATS,
+    INSERT_HAIRCUT,
+    PRUNED_HORIZON,
+    SELECT_HAIRCUTS,
+    TOP_CLIENTS,
+    UNIQUE_CLIENTS,
+    UPDATE_HAIRCUT,
+    UPDATE_PRICE,
+    by_date_query,
+    check_change_horizon,
+    client_haircuts_query,
+    daily_history_page,
+    daily_history_query,
+    export_query,
+    haircut_values,
+    list_page,
+    list_query,
+    map_rows,
+    new_haircut,
+    to_client_stats,
+    to_daily_total,
+    to_global_stats,
+)
+from .haircuts import EXPORT_BATCH_SIZE, day_totals_cache
+from .mappers import haircut_from_row, haircuts_from_rows
+
+
+class AsyncHaircutRepository:
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def _fetchall(self, query: str, params=None) -> list:
+        cursor = await self.connection.execute(query, params)
+        return await cursor.fetchall()
+
+    async def _fetchone(self, query: str, params=None):
+        cursor = await self.connection.execute(query, params)
+        return await cursor.fetchone()
+
+    async def get_all(self) -> list[Haircut]:
+        haircuts, _ = await self.list_haircuts()
+        return haircuts
+
+    async def list_haircuts(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[str] = None,
+        filters: Optional[HaircutFilters] = None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> tuple[list, Optional[str]]:
+        query, params = list_query(limit, after, filters, fields)
+        return list_page(await self._fetchall(query, params), limit, fields)
+
+    async def iter_batches(
+        self,
+        filters: Optional[HaircutFilters] = None,
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[list[dict]]:
+        query, params = export_query(filters)
+        cursor = self.connection.cursor(name=f"haircuts_export_{uuid4().hex}")
+        cursor.itersize = batch_size
+        try:
+            await cursor.execute(query, params)
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            await cursor.close()
+            await self.connection.rollback()
+
+    async def get_changes(self, since: Optional[str] = None) -> HaircutChanges:
+        row = await self._fetchone(CHANGE_HORIZON)
+        token = encode_change_token(int(row["xmin"]))
+        if since is None:
+            upserted = haircuts_from_rows(await self._fetchall(SELECT_HAIRCUTS))
+            return HaircutChanges(token=token, upserted=upserted, deleted=[])
+
+        xmin = decode_change_token(since)
+        check_change_horizon(xmin, await self._fetchone(PRUNED_HORIZON))
+        xmin = str(xmin)
+        upserted = haircuts_from_rows(await self._fetchall(CHANGED_HAIRCUTS, (xmin,)))
+        deleted = [row["id"] for row in await self._fetchall(DELETED_HAIRCUTS, (xmin,))]
+        return HaircutChanges(token=token, upserted=upserted, deleted=deleted)
+
+    async def get_by_id(self, id: UUID) -> Haircut:
+        cut = await self._fetchone(f"{SELECT_HAIRCUTS} WHERE id = %s;", (id,))
+        if cut:
+            return haircut_from_row(cut)
+        raise NotFoundResponse(status_code=404, detail="Haircut not found")
+
+    async def get_by_date(self, cutoff_date: date, fields: Optional[Sequence[str]] = None) -> list:
+        return map_rows(await self._fetchall(by_date_query(fields), (cutoff_date,)), fields)
+
+    async def get_daily_summary(self) -> dict[date, float]:
+        return {row["date"]: row["total"] for row in await self._fetchall(DAILY_SUMMARY)}
+
+    async def get_day_totals(self, day: date) -> DailyTotal:
+        cached = day_totals_cache.get(day)
+        if cached is not None:
+            return cached
+        row = await self._fetchone(DAY_TOTALS, (day,))
+        totals = DailyTotal(date=day) if row is None else to_daily_total(row)
+        day_totals_cache.set(day, totals)
+        return totals
+
+    async def get_daily_history(
+        self,
+        limit: Optional[int] = None,
+        after: Optional[date] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        include_clients: bool = False,
+        distinct_clients: bool = False,
+    ) -> tuple[list[dict], Optional[date]]:
+        query, params = daily_history_query(
+            limit, after, date_from, date_to, include_clients or distinct_clients
+        )
+        rows = await self._fetchall(query, params)
+        return daily_history_page(rows, limit, include_clients, distinct_clients)
+
+    async def get_global_stats(self) -> dict:
+        return to_global_stats(await self._fetchone(GLOBAL_STATS))
+
+    async def create(self, item: HaircutCreate) -> Haircut:
+        haircut = new_haircut(item)
+        await self.connection.execute(INSERT_HAIRCUT, haircut_values(haircut))
+        await self.connection.commit()
+        day_totals_cache.invalidate(haircut.date)
+        return haircut
+
+    async def create_many(self, items: list[HaircutCreate]) -> list[Haircut]:
+        """Insert all items in a single transaction with a pipelined executemany."""
+        haircuts = [new_haircut(item) for item in items]
+        if not haircuts:
+            return []
+        try:
+            async with self.connection.cursor() as cursor:
+                await cursor.executemany(INSERT_HAIRCUT, [haircut_values(h) for h in haircuts])
+            await self.connection.commit()
+        except Exception:
+            await self.connection.rollback()
+            raise
+        for day in {h.date for h in haircuts}:
+            day_totals_cache.invalidate(day)
+        return haircuts
+
+    async def update(self, item: Haircut) -> Haircut:
+        row = await self._fetchone(UPDATE_HAIRCUT, haircut_values(item))
+        await self.connection.commit()
+        if row is None:
+            raise NotFoundResponse(status_code=404, detail="Haircut not found")
+        day_totals_cache.invalidate(row["previous_date"])
+        day_totals_cache.invalidate(row["date"])
+        return haircut_from_row(row)
+
+    async def update_price(self, id: UUID, new_price: float) -> Haircut:
+        row = await self._fetchone(UPDATE_PRICE, (new_price, id))
+        await self.connection.commit()
+        if row is None:
+            raise NotFoundResponse(status_code=404, detail="Haircut not found")
+        day_totals_cache.invalidate(row["date"])
+        return haircut_from_row(row)
+
+    async def delete(self, id: UUID) -> None:
+        row = await self._fetchone(DELETE_HAIRCUT, (id,))
+        await self.connection.commit()
+        if row is None:
+            raise NotFoundResponse(status_code=404, detail="Haircut not found")
+        day_totals_cache.invalidate(row["date"])
+
+    async def delete_by_date(self, cutoff_date: date) -> int:
+        cursor = await self.connection.execute(DELETE_BY_DATE, (cutoff_date,))
+        await self.connection.commit()
+        day_totals_cache.invalidate(cutoff_date)
+        return cursor.rowcount
+
+    async def get_unique_clients(self) -> list[str]:
+        return [row["client_name"] for row in await self._fetchall(UNIQUE_CLIENTS)]
+
+    async def get_client_stats(self, client_name: str) -> ClientStats:
+        row = await self._fetchone(CLIENT_STATS, (client_name,))
+        if not row:
+            raise NotFoundResponse(status_code=404, detail="Client not found")
+        return to_client_stats(row)
+
+    async def get_top_clients(self, limit: int = 10) -> list[ClientStats]:
+        return [to_client_stats(row) for row in await self._fetchall(TOP_CLIENTS, (limit,))]
+
+    async def get_client_haircuts(self, client_name: str, fields: Optional[Sequence[str]] = None) -> list:
+        return map_rows(await self._fetchall(client_haircuts_query(fields), (client_name,)), fields)
+
+    async def get_clients_by_spent(self, limit: int = 10) -> list[ClientStats]:
+        return [to_client_stats(row) for row in await self._fetchall(CLIENTS_BY_SPENT, (limit,))]
@@ -0,0 +1,135 @@
+"""
+Bulk import of legacy register exports (see register_haircuts.csv).
+
+Legacy rows are `id, client, style, price, timestamp, category` without a
+header. Old exports reuse the same id on every row, so ids are regenerated
+deterministically from the row content: importing the same file twice, or
+overlapping archives, does not duplicate haircuts.
+"""
+import argparse
+import csv
+import io
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Optional
+from uuid import UUID, uuid5
+
+import loguru
+
+from .haircuts import day_totals_cache
+
+logger = loguru.logger
+
+IMPORT_CHUNK_SIZE = 10_000
+LEGACY_NAMESPACE = UUID("6f1c1d2e-6a4b-4d8e-9a55-3b0c9f2e7d41")
+HAIRCUT_COLUMNS = ("id", "client_name", "service_name", "price", "date", "time", "count", "tip")
+
+
+def map_legacy_row(row: list[str]) -> tuple:
+    """Map one legacy CSV row onto the haircuts columns; raises ValueError on bad rows."""
+    if len(row) < 6:
+        raise ValueError(f"Expected 6 columns, got {len(row)}")
+    legacy_id, client, style, price, timestamp, category = (value.strip() for value in row[:6])
+    moment = datetime.fromisoformat(timestamp)
+    service_name = style or category or "Otros"
+    haircut_id = uuid5(LEGACY_NAMESPACE, "|".join((legacy_id, client, service_name, price, timestamp)))
+    return (
+        haircut_id,
+        client or "Cliente",
+        service_name,
+        float(price),
+        moment.date(),
+        moment.strftime("%H:%M"),
+        0,
+        0,
+    )
+
+
+def iter_legacy_chunks(lines: Iterable[str], chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[tuple[list[tuple], int]]:
+    """Yield `(mapped_rows, skipped)` chunks of at most `chunk_size` rows."""
+    chunk: list[tuple] = []
+    skipped = 0
+    for line_number, row in enumerate(csv.reader(lines), start=1):
+        if not row:
+            continue
+        try:
+            chunk.append(map_legacy_row(row))
+        except ValueError as e:
+            if line_number == 1:
+                # Header row of exports that include one.
+                continue
+            logger.warning(f"Skipping legacy row {line_number}: {e}")
+            skipped += 1
+        if len(chunk) >= chunk_size:
+            yield chunk, skipped
+            chunk, skipped = [], 0
+    if chunk or skipped:
+        yield chunk, skipped
+
+
+def import_legacy_register(
+    connection,
+    lines: Iterable[str],
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Stream a legacy register file into haircuts with COPY, one committed
+    chunk at a time, and return the import counters. Rows whose generated
+    id already exists are counted as duplicates and left untouched.
+    """
+    stats = {"read": 0, "imported": 0, "duplicates": 0, "skipped": 0}
+    cursor = connection.cursor()
+    cursor.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS haircuts_import "
+        "(LIKE haircuts INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    columns = ", ".join(HAIRCUT_COLUMNS)
+    try:
+        for rows, skipped in iter_legacy_chunks(lines, chunk_size):
+            stats["skipped"] += skipped
+            if rows:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY haircuts_import ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+                cursor.execute(
+                    f"INSERT INTO haircuts ({columns}) SELECT {columns} FROM haircuts_import ON CONFLICT (id) DO NOTHING"
+                )
+                stats["read"] += len(rows)
+                stats["imported"] += cursor.rowcount
+                stats["duplicates"] += len(rows) - cursor.rowcount
+            connection.commit()
+            logger.info(
+                f"Legacy import: {stats['read']} rows read, {stats['imported']} imported, "
+                f"{stats['duplicates']} duplicates, {stats['skipped']} skipped."
+            )
+            if on_progress:
+                on_progress(dict(stats))
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        day_totals_cache.invalidate()
+    return stats
+
+
+def main() -> None:
+    from barbershop.database import create_connection
+
+    parser = argparse.ArgumentParser(description="Import a legacy register CSV export into haircuts.")
+    parser.add_argument("path", help="Path to the legacy CSV file")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    connection = create_connection()
+    if connection is None:
+        raise SystemExit("Could not connect to the database")
+    try:
+        with open(args.path, newline="", encoding="utf-8") as file:
+            import_legacy_register(connection, file, args.chunk_size)
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
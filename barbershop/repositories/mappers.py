@@ -0,0 +1,82 @@
+"""
+Row-to-model mapping shared by the haircut read paths.
+
+Rows are validated once over the whole list through a module-level
+TypeAdapter instead of once per model, which is where most of the cost of
+the old per-row `Haircut(...)` calls went.
+
+Sparse reads (`fields=`) select only some columns and map them to plain
+dicts holding just those fields, with the same defaults as the models.
+"""
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+from pydantic import TypeAdapter
+
+from barbershop.models import Haircut
+
+_haircut_list = TypeAdapter(list[Haircut])
+
+HAIRCUT_FIELD_COLUMNS = {
+    "id": "id",
+    "clientName": "client_name",
+    "serviceName": "service_name",
+    "price": "price",
+    "date": "date",
+    "time": "time",
+    "count": "count",
+    "tip": "tip",
+}
+
+
+def parse_fields(value: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    Parse a comma-separated `fields=` value into Haircut field names, in
+    request order and without duplicates. Returns None (every field) for an
+    empty value; raises ValueError on unknown fields.
+    """
+    if not value:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    unknown = [name for name in fields if name not in HAIRCUT_FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields or None
+
+
+def _haircut_fields(row, today: date) -> dict:
+    return {
+        "id": row["id"],
+        "clientName": row["client_name"],
+        "serviceName": row["service_name"],
+        "price": row["price"],
+        "date": row["date"] or today,
+        "time": row["time"],
+        "count": row["count"] or 0,
+        "tip": row["tip"] or 0,
+    }
+
+
+def haircuts_from_rows(rows: Iterable) -> list[Haircut]:
+    """Map haircuts rows to models, validating the whole list in one call."""
+    today = date.today()
+    return _haircut_list.validate_python([_haircut_fields(row, today) for row in rows])
+
+
+def haircut_from_row(row) -> Haircut:
+    return haircuts_from_rows((row,))[0]
+
+
+def partial_haircuts_from_rows(rows: Iterable, fields: Sequence[str]) -> list[dict]:
+    """Map rows to dicts holding only `fields`, keyed like the Haircut model."""
+    today = date.today()
+    columns = [(field, HAIRCUT_FIELD_COLUMNS[field]) for field in fields]
+    defaults = [(field, today if field == "date" else 0) for field in fields if field in ("date", "count", "tip")]
+    items = []
+    for row in rows:
+        item = {field: row[column] for field, column in columns}
+        for field, default in defaults:
+            if not item[field]:
+                item[field] = default
+        items.append(item)
+    return items
@@ -0,0 +1,134 @@
+import hashlib
+import threading
+from typing import Optional
+from uuid import uuid4
+
+from barbershop.database import get_pool
+from barbershop.models import ServicePrice, ServicePriceCreate
+from .handler_errors import NotFoundResponse
+
+# Postgres channel notified by a trigger on every change to service_prices.
+SERVICE_PRICES_CHANNEL = "service_prices_changed"
+
+
+def _to_service_price(row) -> ServicePrice:
+    return ServicePrice(serviceName=row["service_name"], basePrice=row["base_price"])
+
+
+class ServicePriceRepository:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def get_all(self) -> list[ServicePrice]:
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT service_name, base_price FROM service_prices ORDER BY service_name")
+        return [_to_service_price(row) for row in cursor.fetchall()]
+
+    def create(self, item: ServicePriceCreate) -> ServicePrice:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "INSERT INTO service_prices (id, service_name, base_price) VALUES (%s, %s, %s)",
+            (str(uuid4()), item.serviceName, item.basePrice)
+        )
+        self.connection.commit()
+        price_catalogue.invalidate()
+        return ServicePrice(serviceName=item.serviceName, basePrice=item.basePrice)
+
+    def update_price(self, service_name: str, base_price: int) -> ServicePrice:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "UPDATE service_prices SET base_price = %s WHERE service_name = %s RETURNING service_name, base_price",
+            (base_price, service_name)
+        )
+        return self._commit_returned(cursor.fetchone())
+
+    def rename(self, service_name: str, new_name: str) -> ServicePrice:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "UPDATE service_prices SET service_name = %s WHERE service_name = %s RETURNING service_name, base_price",
+            (new_name, service_name)
+        )
+        return self._commit_returned(cursor.fetchone())
+
+    def delete(self, service_name: str) -> None:
+        cursor = self.connection.cursor()
+        cursor.execute(
+            "DELETE FROM service_prices WHERE service_name = %s RETURNING service_name, base_price",
+            (service_name,)
+        )
+        self._commit_returned(cursor.fetchone())
+
+    def _commit_returned(self, row) -> ServicePrice:
+        if row is None:
+            self.connection.rollback()
+            raise NotFoundResponse(status_code=404, detail="Service not found")
+        self.connection.commit()
+        price_catalogue.invalidate()
+        return _to_service_price(row)
+
+
+class PriceCatalogue:
+    """
+    In-process copy of service_prices, loaded on first use and dropped on
+    every change. Writes through ServicePriceRepository invalidate it
+    directly; changes made by other workers arrive through LISTEN/NOTIFY on
+    SERVICE_PRICES_CHANNEL.
+
+    `version` is a digest of the loaded prices, the same in every worker, so
+    the price endpoints can answer conditional GETs without a query. It is
+    None while no load has survived the latest invalidation.
+    """
+
+    def __init__(self):
+        self._prices: Optional[dict[str, ServicePrice]] = None
+        self._version: Optional[str] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def load(self, connection=None) -> dict[str, ServicePrice]:
+        with self._lock:
+            generation = self._generation
+        if connection is None:
+            with get_pool().connection() as pooled:
+                prices = ServicePriceRepository(pooled).get_all()
+        else:
+            prices = ServicePriceRepository(connection).get_all()
+        catalogue = {price.serviceName: price for price in prices}
+        digest = hashlib.blake2b(digest_size=8)
+        for price in prices:
+            digest.update(f"{price.serviceName}\0{price.basePrice}\0".encode())
+        with self._lock:
+            # Discard the result if an invalidation raced with the query.
+            if generation == self._generation:
+                self._prices = catalogue
+                self._version = f"prices-{digest.hexdigest()}"
+        return catalogue
+
+    @property
+    def version(self) -> Optional[str]:
+        if self._version is None:
+            self.load()
+        return self._version
+
+    def get_all(self) -> list[ServicePrice]:
+        prices = self._prices
+        if prices is None:
+            prices = self.load()
+        return list(prices.values())
+
+    def get(self, service_name: str) -> ServicePrice:
+        prices = self._prices
+        if prices is None:
+            prices = self.load()
+        if service_name not in prices:
+            raise NotFoundResponse(status_code=404, detail="Service not found")
+        return prices[service_name]
+
+    def invalidate(self, payload: Optional[str] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            self._prices = None
+            self._version = None
+
+
+price_catalogue = PriceCatalogue()
@@ -0,0 +1,25 @@
+class TableVersionRepository:
+    """Read the per-table change counters kept by the `bump_table_version` trigger."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def get_version(self, table_name: str) -> int:
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT version FROM table_versions WHERE table_name = %s", (table_name,))
+        row = cursor.fetchone()
+        return row["version"] if row else 0
+
+
+class AsyncTableVersionRepository:
+    """`TableVersionRepository` for async (psycopg 3) connections."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def get_version(self, table_name: str) -> int:
+        cursor = await self.connection.execute(
+            "SELECT version FROM table_versions WHERE table_name = %s", (table_name,)
+        )
+        row = await cursor.fetchone()
+        return row["version"] if row else 0
@@ -0,0 +1,90 @@
+"""
+Pre-serialized JSON responses for the large list endpoints.
+
+Returning a model list from a route makes FastAPI validate it against the
+return annotation and then walk it again with `jsonable_encoder` before
+`json.dumps`. With FAST_JSON_RESPONSES=1 the list endpoints instead return
+the bytes pydantic-core writes in a single pass over the models. The JSON
+is the same either way.
+
+`?shape=columns` responses are always pre-serialized: they list the column
+names once and each record as a plain array, optionally replacing repeated
+strings with indexes into a per-column dictionary.
+
+`server_timing` formats per-section durations for the Server-Timing header,
+which browser dev tools show next to the request.
+"""
+import os
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+import pydantic_core
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from barbershop.models import ClientHistory, Haircut
+
+FAST_JSON_RESPONSES = os.environ.get("FAST_JSON_RESPONSES", "0") == "1"
+
+HAIRCUT_COLUMNS = tuple(Haircut.model_fields)
+DICTIONARY_COLUMNS = ("serviceName",)
+SERVER_TIMING_HEADER = "Server-Timing"
+
+_haircut_list = TypeAdapter(list[Haircut])
+_client_history = TypeAdapter(ClientHistory)
+
+
+def json_bytes_response(content: bytes, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def json_response(content: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """Serialize plain data (dicts, lists, UUIDs, dates) with pydantic-core."""
+    return json_bytes_response(pydantic_core.to_json(content), headers)
+
+
+def haircuts_response(haircuts: list[Haircut], headers: Optional[Mapping[str, str]] = None) -> Response:
+    return json_bytes_response(_haircut_list.dump_json(haircuts), headers)
+
+
+def client_history_response(history: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return json_bytes_response(_client_history.dump_json(history), headers)
+
+
+def to_columns(records: Iterable[Any], columns: Sequence[str], dictionary: Sequence[str] = ()) -> dict:
+    """
+    Turn models or mappings into `{"columns": [...], "rows": [[...], ...]}`.
+    Values of the `dictionary` columns become indexes into
+    `dictionaries[column]`, in order of first appearance.
+    """
+    columns = list(columns)
+    encoded = [(index, {}) for index, name in enumerate(columns) if name in dictionary]
+    rows = []
+    for record in records:
+        if isinstance(record, Mapping):
+            row = [record[name] for name in columns]
+        else:
+            row = [getattr(record, name) for name in columns]
+        for index, values in encoded:
+            row[index] = values.setdefault(row[index], len(values))
+        rows.append(row)
+    result: dict = {"columns": columns, "rows": rows}
+    if encoded:
+        result["dictionaries"] = {columns[index]: list(values) for index, values in encoded}
+    return result
+
+
+def columns_response(
+    records: Iterable[Any],
+    columns: Sequence[str],
+    dictionary: bool = False,
+    headers: Optional[Mapping[str, str]] = None,
+    **extra: Any,
+) -> Response:
+    """Columnar JSON response; `extra` keys are added next to columns and rows."""
+    payload = {**extra, **to_columns(records, columns, DICTIONARY_COLUMNS if dictionary else ())}
+    return json_response(payload, headers)
+
+
+def server_timing(timings: Mapping[str, float]) -> str:
+    """Server-Timing header value for `{name: milliseconds}`."""
+    return ", ".join(f"{name};dur={duration:.1f}" for name, duration in timings.items())
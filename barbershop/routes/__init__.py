@@ -1,3 +1,5 @@
-from .haircuts import router as haircuts_router
-
-__all__ = ["haircuts_router"]
\ No newline at end of file
+from .admin import router as admin_router
+from .haircuts import router as haircuts_router
+from .haircuts_async import router as async_haircuts_router
+
+__all__ = ["admin_router", "haircuts_router", "async_haircuts_router"]
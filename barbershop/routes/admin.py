@@ -0,0 +1,57 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from barbershop.admin_auth import admin_enabled, admin_token_matches
+from barbershop.profiling import profile_store
+from barbershop.slow_queries import slow_query_log
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Los endpoints de administración solo existen si ADMIN_TOKEN está
+    configurado y piden ese valor en el header `X-Admin-Token`.
+    """
+    if not admin_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not admin_token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin_token)])
+
+
+@router.get("/slow-queries")
+def get_slow_queries() -> list[dict]:
+    """
+    Consultas que superaron SLOW_QUERY_MS, de la más reciente a la más
+    antigua, con parámetros reducidos a su tipo y el plan de ejecución si
+    SLOW_QUERY_EXPLAIN=1. Cada worker tiene su propio registro.
+    """
+    return slow_query_log.entries()
+
+
+@router.delete("/slow-queries")
+def clear_slow_queries() -> dict:
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+
+@router.get("/profiles")
+def get_profiles() -> list[dict]:
+    """
+    Perfiles guardados de este worker, del más reciente al más antiguo. Para
+    perfilar un request enviarlo con `X-Profile: 1` y `X-Admin-Token`; el id
+    del perfil vuelve en el header `X-Profile-Id`.
+    """
+    return profile_store.summaries()
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: int) -> PlainTextResponse:
+    """Stacks del perfil en formato colapsado, para flamegraph.pl o speedscope."""
+    collapsed = profile_store.collapsed(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(collapsed)
@@ -1,76 +1,419 @@
+import io
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date as date_type
-from uuid import UUID, uuid4
+from uuid import UUID
 from contextlib import contextmanager
-from typing import Generator
+from typing import Generator, Literal, Optional
+
+import loguru
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+
+from barbershop.conditional import check_not_modified, make_etag
+from barbershop.database import PoolTimeoutError, get_pool
+from barbershop.exports import COLUMNAR_BATCH_SIZE, COLUMNAR_FORMATS, EXPORT_MEDIA_TYPES, EXPORT_WRITERS, pyarrow
+from barbershop.models import BulkCreateResult, BulkItemResult, Haircut, HaircutChanges, HaircutCreate, HaircutFilters, ServicePrice, ServicePriceCreate, ClientStats, ClientHistory
+from barbershop.repositories import (
+    HaircutRepository,
+    ExpiredChangeToken,
+    InvalidCursor,
+    NotFoundResponse,
+    ServicePriceRepository,
+    TableVersionRepository,
+    parse_haircut_date,
+    price_catalogue,
+)
+from barbershop.repositories.haircuts import EXPORT_BATCH_SIZE
+from barbershop.repositories.legacy_import import import_legacy_register
+from barbershop.repositories.mappers import parse_fields
+from barbershop.responses import (
+    FAST_JSON_RESPONSES,
+    HAIRCUT_COLUMNS,
+    SERVER_TIMING_HEADER,
+    client_history_response,
+    columns_response,
+    haircuts_response,
+    json_response,
+    server_timing,
+)
+
+logger = loguru.logger
+
+MAX_PAGE_SIZE = 1000
+MAX_BULK_ITEMS = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DASHBOARD_HISTORY_DAYS = 30
+# Pooled connections one dashboard request may borrow on top of its own.
+DASHBOARD_EXTRA_CONNECTIONS = int(os.environ.get("DASHBOARD_EXTRA_CONNECTIONS", 2))
+
+ResponseShape = Literal["objects", "columns"]
+FIELDS_DESCRIPTION = "Campos a devolver separados por coma, p. ej. `date,serviceName,price`"
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _parse_cutoff_date(cutoff_date: str) -> date_type:
+    try:
+        return date_type.fromisoformat(cutoff_date)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format")
+
+
+def _haircut_filters(date_from, date_to, service, client, min_price, max_price) -> HaircutFilters:
+    return HaircutFilters(
+        dateFrom=date_from,
+        dateTo=date_to,
+        serviceName=service,
+        clientName=client,
+        minPrice=min_price,
+        maxPrice=max_price,
+    )
+
+
+def _render_haircuts(
+    response: Optional[Response],
+    haircuts: list,
+    selected: Optional[tuple[str, ...]],
+    shape: str,
+    dictionary: bool,
+    next_cursor: Optional[str] = None,
+):
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    if shape == "columns":
+        return columns_response(haircuts, selected or HAIRCUT_COLUMNS, dictionary, headers)
+    if selected:
+        return json_response(haircuts, headers)
+    if FAST_JSON_RESPONSES:
+        return haircuts_response(haircuts, headers)
+    if response is not None:
+        response.headers.update(headers)
+    return haircuts
+
+
+def _render_daily_history(
+    response: Response,
+    history: list[dict],
+    next_after: Optional[date_type],
+    include_clients: bool,
+    distinct_clients: bool,
+    shape: str,
+):
+    headers = {NEXT_CURSOR_HEADER: next_after.isoformat()} if next_after else {}
+    if shape == "columns":
+        columns = ["date", "total", "count", "tip"]
+        if include_clients:
+            columns.append("clients")
+        if distinct_clients:
+            columns.append("clientCount")
+        return columns_response(history, columns, headers=headers)
+    response.headers.update(headers)
+    return history
+
+
+def _render_client_history(
+    client_name: str,
+    haircuts: list,
+    selected: Optional[tuple[str, ...]],
+    shape: str,
+    dictionary: bool,
+):
+    if shape == "columns":
+        return columns_response(haircuts, selected or HAIRCUT_COLUMNS, dictionary, clientName=client_name)
+    if selected:
+        return json_response({"clientName": client_name, "haircuts": haircuts})
+    history = ClientHistory(clientName=client_name, haircuts=haircuts)
+    if FAST_JSON_RESPONSES:
+        return client_history_response(history)
+    return history
+
+
+def _day_summary(totals) -> dict:
+    return {
+        "date": totals.date.isoformat(),
+        "count": totals.count,
+        "total": totals.total,
+        "tip": totals.tip
+    }
+
+
+def _dashboard_sections(days: int, limit: int) -> dict:
+    """
+    Secciones del dashboard: la consulta sobre el repositorio (sync o async,
+    los métodos se llaman igual) y cómo darle formato al resultado.
+    """
+    today = date_type.today()
+    return {
+        "stats": (lambda repo: repo.get_global_stats(), None),
+        "today": (lambda repo: repo.get_day_totals(today), _day_summary),
+        "history": (lambda repo: repo.get_daily_history(limit=days), lambda page: page[0]),
+        "topClients": (lambda repo: repo.get_top_clients(limit), None),
+        "topClientsBySpent": (lambda repo: repo.get_clients_by_spent(limit), None),
+    }
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
 
-from barbershop.database import create_connection
-from barbershop.models import Haircut, HaircutCreate, ServicePrice, ServicePriceCreate, ClientStats, ClientHistory
-from barbershop.repositories import HaircutRepository
+def _render_dashboard(response: Response, results: dict, started: float) -> dict:
+    """Arma la respuesta del dashboard y el header Server-Timing por sección."""
+    timings = {name: duration for name, (_, duration) in results.items()}
+    timings["total"] = (time.perf_counter() - started) * 1000
+    response.headers[SERVER_TIMING_HEADER] = server_timing(timings)
+    return {name: value for name, (value, _) in results.items()}
 
-DATABASE_URL = os.environ.get("DATABASE_URL")
+
+def haircuts_version(version: int) -> str:
+    """
+    Versión para el ETag de haircuts. La fecha forma parte de la versión
+    porque los cortes sin fecha se muestran con la fecha del día.
+    """
+    return f"haircuts-{version}-{date_type.today():%Y%m%d}"
+
+
+def _acquire_connection():
+    try:
+        return get_pool().getconn()
+    except PoolTimeoutError:
+        raise HTTPException(status_code=503, detail="Database busy, try again later")
+    except Exception as e:
+        logger.error(f"Error acquiring database connection: {e}")
+        return None
 
 
 @contextmanager
 def get_db_connection() -> Generator:
     """Context manager para obtener conexión a la base de datos."""
-    conn = create_connection(DATABASE_URL)
+    conn = _acquire_connection()
     try:
         yield conn
     finally:
         if conn:
-            conn.close()
+            get_pool().putconn(conn)
 
 
 def get_db() -> Generator:
     """Dependency para obtener conexión a la base de datos."""
-    conn = create_connection(DATABASE_URL)
+    conn = _acquire_connection()
     try:
         yield conn
     finally:
         if conn:
-            conn.close()
+            get_pool().putconn(conn)
+
+
+def haircuts_etag(request: Request, conn=Depends(get_db)) -> None:
+    """Responde 304 si el cliente ya tiene la versión actual de haircuts."""
+    if conn is None:
+        return
+    version = TableVersionRepository(conn).get_version("haircuts")
+    check_not_modified(request, make_etag(haircuts_version(version), request))
+
+
+def service_prices_etag(request: Request) -> None:
+    """Responde 304 si el cliente ya tiene el catálogo de precios actual."""
+    try:
+        version = price_catalogue.version
+    except Exception as e:
+        logger.error(f"Error loading service prices: {e}")
+        return
+    if version is None:
+        return
+    check_not_modified(request, make_etag(version, request))
+
+
+def _run_dashboard_section(conn, section) -> tuple:
+    query, present = section
+    started = time.perf_counter()
+    result = query(HaircutRepository(conn))
+    return (present(result) if present else result), (time.perf_counter() - started) * 1000
+
 
+def _run_pooled_dashboard_section(conn, section) -> tuple:
+    try:
+        return _run_dashboard_section(conn, section)
+    finally:
+        get_pool().putconn(conn)
+
+
+def _borrow_dashboard_connections(wanted: int) -> list:
+    """
+    Up to DASHBOARD_EXTRA_CONNECTIONS connections that are free right now.
+    Never waits: a request that already holds a connection and blocks on
+    more would starve the pool when several dashboards load at once.
+    """
+    pool = get_pool()
+    borrowed = []
+    for _ in range(min(wanted, DASHBOARD_EXTRA_CONNECTIONS)):
+        try:
+            conn = pool.try_getconn()
+        except Exception as e:
+            logger.warning(f"Error borrowing a dashboard connection: {e}")
+            break
+        if conn is None:
+            break
+        borrowed.append(conn)
+    return borrowed
+
+
+# Runs the dashboard sections that got a borrowed connection; they never
+# wait on the pool, so a busy executor only delays them.
+_dashboard_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dashboard")
 
 router = APIRouter(prefix="/haircuts")
 
 
-@router.get("/")
-def get_haircuts(conn=Depends(get_db)) -> list[Haircut]:
+@router.get("/", dependencies=[Depends(haircuts_etag)])
+def get_haircuts(
+    response: Response,
+    conn=Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    service: Optional[str] = None,
+    client: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    shape: ResponseShape = "objects",
+    dictionary: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+) -> list[Haircut]:
+    """
+    Lista los cortes, del más reciente al más antiguo. Con `limit` devuelve
+    una página y el cursor de la siguiente en el header `X-Next-Cursor`,
+    que se pasa como `after` para continuar.
+
+    Con `shape=columns` devuelve `{columns, rows}`: los nombres de campo una
+    sola vez y cada corte como lista de valores. Con `dictionary=true` los
+    servicios van como índices en `dictionaries.serviceName`. Con `fields`
+    solo se leen y devuelven esos campos.
+    """
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
-    return HaircutRepository(conn).get_all()
+    selected = _parse_fields(fields)
+    filters = _haircut_filters(date_from, date_to, service, client, min_price, max_price)
+    try:
+        haircuts, next_cursor = HaircutRepository(conn).list_haircuts(limit, after, filters, selected)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _render_haircuts(response, haircuts, selected, shape, dictionary, next_cursor)
 
 
-@router.get("/stats/global")
+@router.get("/stats/global", dependencies=[Depends(haircuts_etag)])
 def get_global_stats(conn=Depends(get_db)) -> dict:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT
-                COUNT(*) AS total_cuts,
-                COALESCE(SUM(price), 0) AS total_revenue,
-                COALESCE(AVG(price), 0) AS average_ticket,
-                MIN(date) AS first_cut_date
-            FROM haircuts
-        """)
-        row = cursor.fetchone()
-        return {
-            "totalCuts": row["total_cuts"],
-            "totalRevenue": row["total_revenue"],
-            "averageTicket": row["average_ticket"],
-            "firstCutDate": row["first_cut_date"].isoformat() if row["first_cut_date"] else None,
-        }
+        return HaircutRepository(conn).get_global_stats()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting global stats: {str(e)}")
 
 
-@router.get("/{haircut_id}")
+@router.get("/export")
+def export_haircuts(
+    format: Literal["csv", "ndjson", "arrow", "parquet"] = "csv",
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+) -> StreamingResponse:
+    """
+    Exporta el historial completo (o un rango de fechas) como CSV, NDJSON,
+    Arrow IPC o Parquet. La respuesta se genera a medida que se leen las
+    filas con un cursor del lado del servidor, así que no carga la tabla en
+    memoria.
+    """
+    filters = HaircutFilters(dateFrom=date_from, dateTo=date_to)
+    write_chunks = EXPORT_WRITERS[format]
+    batch_size = EXPORT_BATCH_SIZE
+    if format in COLUMNAR_FORMATS:
+        if pyarrow is None:
+            raise HTTPException(status_code=501, detail="Columnar export requires the pyarrow package")
+        batch_size = COLUMNAR_BATCH_SIZE
+
+    # Taken here rather than through get_db so a busy pool still answers 503;
+    # dependencies with yield are closed before a streaming body is sent, so
+    # the generator returns the connection once the body is done.
+    conn = _acquire_connection()
+    if conn is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+
+    def content():
+        try:
+            yield from write_chunks(HaircutRepository(conn).iter_batches(filters, batch_size))
+        finally:
+            get_pool().putconn(conn)
+
+    return StreamingResponse(
+        content(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="haircuts.{format}"'},
+    )
+
+
+@router.get("/changes", dependencies=[Depends(haircuts_etag)])
+def get_haircut_changes(since: Optional[str] = None, conn=Depends(get_db)) -> HaircutChanges:
+    """
+    Cambios desde `since`: cortes creados o modificados (`upserted`) e ids
+    eliminados (`deleted`), junto con el `token` a enviar como `since` en la
+    próxima llamada. Sin `since` devuelve todos los cortes. Un mismo corte
+    puede repetirse entre llamadas; aplicar primero `upserted` y después
+    `deleted`. Responde 410 si el token es anterior a las bajas ya depuradas:
+    el cliente debe volver a sincronizar sin `since`.
+    """
+    if conn is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    try:
+        return HaircutRepository(conn).get_changes(since)
+    except ExpiredChangeToken as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting changes: {str(e)}")
+
+
+@router.get("/dashboard")
+def get_dashboard(
+    response: Response,
+    conn=Depends(get_db),
+    days: int = Query(DASHBOARD_HISTORY_DAYS, ge=1, le=MAX_PAGE_SIZE),
+    limit: int = 10,
+) -> dict:
+    """
+    Todo lo que muestra el dashboard en una sola llamada: estadísticas
+    globales (`stats`), totales de hoy (`today`), los últimos `days` días
+    (`history`) y los mejores clientes por cantidad y por gasto. Hasta
+    DASHBOARD_EXTRA_CONNECTIONS secciones se consultan en paralelo con
+    conexiones libres del pool (sin esperar por ellas); el resto, en la
+    conexión del request. La duración de cada sección viaja en el header
+    `Server-Timing`.
+    """
+    if conn is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    started = time.perf_counter()
+    sections = _dashboard_sections(days, limit)
+    items = list(sections.items())
+    borrowed = _borrow_dashboard_connections(len(items) - 1)
+    parallel, local = items[1:len(borrowed) + 1], [items[0], *items[len(borrowed) + 1:]]
+    try:
+        pending = {
+            name: _dashboard_executor.submit(_run_pooled_dashboard_section, extra, section)
+            for (name, section), extra in zip(parallel, borrowed)
+        }
+        results = {name: _run_dashboard_section(conn, section) for name, section in local}
+        results.update((name, future.result()) for name, future in pending.items())
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting dashboard: {str(e)}")
+    return _render_dashboard(response, {name: results[name] for name in sections}, started)
+
+
+@router.get("/{haircut_id}", dependencies=[Depends(haircuts_etag)])
 def get_haircut(haircut_id: UUID, conn=Depends(get_db)) -> Haircut:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
@@ -106,6 +449,57 @@ def create_haircut(haircut: HaircutCreate, conn=Depends(get_db)) -> Haircut:
         raise HTTPException(status_code=500, detail=f"Error creating haircut: {str(e)}")
 
 
+@router.post("/bulk")
+def create_haircuts_bulk(items: list[dict] = Body(...), conn=Depends(get_db)) -> BulkCreateResult:
+    """
+    Crea varios cortes en una sola transacción. Cada item se valida por
+    separado: los inválidos se informan con su error y no impiden que se
+    guarden los demás.
+    """
+    if conn is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_ITEMS} haircuts per request")
+
+    results: list[BulkItemResult] = []
+    valid: list[tuple[int, HaircutCreate]] = []
+    for index, raw in enumerate(items):
+        try:
+            haircut = HaircutCreate.model_validate(raw)
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            results.append(BulkItemResult(index=index, error=errors))
+            continue
+        try:
+            parse_haircut_date(haircut.date)
+        except ValueError as e:
+            results.append(BulkItemResult(index=index, error=f"Formato de fecha inválido: {str(e)}. Use formato DD/MM/YYYY"))
+            continue
+        valid.append((index, haircut))
+
+    try:
+        created = HaircutRepository(conn).create_many([haircut for _, haircut in valid])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating haircuts: {str(e)}")
+    results.extend(BulkItemResult(index=index, id=haircut.id) for (index, _), haircut in zip(valid, created))
+    results.sort(key=lambda result: result.index)
+    return BulkCreateResult(created=len(created), failed=len(items) - len(created), results=results)
+
+
+@router.post("/import")
+def import_legacy_haircuts(file: UploadFile = File(...), conn=Depends(get_db)) -> dict:
+    """Importa un export del registro anterior (formato de register_haircuts.csv)."""
+    if conn is None:
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    try:
+        lines = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+        return import_legacy_register(conn, lines)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 encoded")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing haircuts: {str(e)}")
+
+
 @router.post("/debug-create")
 def debug_create_haircut(raw_body: dict, conn=Depends(get_db)) -> dict:
     """
@@ -144,6 +538,8 @@ def update_haircut(haircut: Haircut, conn=Depends(get_db)) -> Haircut:
     try:
         repo = HaircutRepository(conn)
         return repo.update(haircut)
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Haircut not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating haircut: {str(e)}")
 
@@ -158,6 +554,8 @@ def update_haircut_price(haircut_id: UUID, body: dict, conn=Depends(get_db)) ->
         raise HTTPException(status_code=400, detail="Price is required")
     try:
         return repo.update_price(haircut_id, new_price)
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Haircut not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating price: {str(e)}")
 
@@ -167,13 +565,11 @@ def delete_haircut(haircut_id: UUID, conn=Depends(get_db)) -> dict:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     repo = HaircutRepository(conn)
-    try:
-        repo.get_by_id(haircut_id)
-    except Exception:
-        raise HTTPException(status_code=404, detail="Haircut not found")
     try:
         repo.delete(haircut_id)
         return {"message": f"Haircut {haircut_id} deleted"}
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Haircut not found")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting haircut: {str(e)}")
 
@@ -182,10 +578,7 @@ def delete_haircut(haircut_id: UUID, conn=Depends(get_db)) -> dict:
 def delete_haircuts_by_date(cutoff_date: str, conn=Depends(get_db)) -> dict:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
-    try:
-        parsed_date = date_type.fromisoformat(cutoff_date)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format")
+    parsed_date = _parse_cutoff_date(cutoff_date)
     repo = HaircutRepository(conn)
     try:
         count = repo.delete_by_date(parsed_date)
@@ -194,50 +587,52 @@ def delete_haircuts_by_date(cutoff_date: str, conn=Depends(get_db)) -> dict:
         raise HTTPException(status_code=500, detail=f"Error deleting haircuts: {str(e)}")
 
 
-@router.get("/history/daily")
-def get_daily_history(conn=Depends(get_db)) -> list[dict]:
+@router.get("/history/daily", dependencies=[Depends(haircuts_etag)])
+def get_daily_history(
+    response: Response,
+    conn=Depends(get_db),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[date_type] = None,
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    include_clients: bool = False,
+    distinct_clients: bool = False,
+    shape: ResponseShape = "objects",
+) -> list[dict]:
+    """
+    Totales por día, del más reciente al más antiguo. Por defecto solo
+    devuelve totales; el detalle de clientes de un día está en
+    `/history/date/{cutoff_date}`. Con `limit` el día desde el que continuar
+    viaja en el header `X-Next-Cursor` y se pasa como `after`.
+    """
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     try:
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT
-                date,
-                SUM(price) AS total,
-                SUM(count) AS count,
-                SUM(COALESCE(tip, 0)) AS tip,
-                array_agg(client_name) AS clients
-            FROM haircuts
-            GROUP BY date
-            ORDER BY date DESC
-        """)
-        rows = cursor.fetchall()
-        return [
-            {
-                "date": row["date"].isoformat() if hasattr(row["date"], "isoformat") else row["date"],
-                "total": row["total"],
-                "count": row["count"],
-                "tip": row["tip"],
-                "clients": row["clients"],
-            }
-            for row in rows
-        ]
+        history, next_after = HaircutRepository(conn).get_daily_history(
+            limit, after, date_from, date_to, include_clients, distinct_clients
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting history: {str(e)}")
+    return _render_daily_history(response, history, next_after, include_clients, distinct_clients, shape)
 
 
-@router.get("/history/date/{cutoff_date}")
-def get_haircuts_by_date(cutoff_date: str, conn=Depends(get_db)) -> list[Haircut]:
+@router.get("/history/date/{cutoff_date}", dependencies=[Depends(haircuts_etag)])
+def get_haircuts_by_date(
+    cutoff_date: str,
+    conn=Depends(get_db),
+    shape: ResponseShape = "objects",
+    dictionary: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+) -> list[Haircut]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
+    selected = _parse_fields(fields)
+    parsed_date = _parse_cutoff_date(cutoff_date)
     try:
-        parsed_date = date_type.fromisoformat(cutoff_date)
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid date format")
-    try:
-        return HaircutRepository(conn).get_by_date(parsed_date)
+        haircuts = HaircutRepository(conn).get_by_date(parsed_date, selected)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting haircuts: {str(e)}")
+    return _render_haircuts(None, haircuts, selected, shape, dictionary)
 
 
 @router.get("/history/today")
@@ -245,29 +640,17 @@ def get_today_summary(conn=Depends(get_db)) -> dict:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
     try:
-        repo = HaircutRepository(conn)
-        today_haircuts = repo.get_by_date(date_type.today())
-        total = sum(h.price for h in today_haircuts)
-        count = sum(h.count for h in today_haircuts)
-        tip = sum(h.tip for h in today_haircuts)
-        return {
-            "date": date_type.today().isoformat(),
-            "count": count,
-            "total": total,
-            "tip": tip
-        }
+        return _day_summary(HaircutRepository(conn).get_day_totals(date_type.today()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting summary: {str(e)}")
 
 
-@router.get("/services/prices")
-def get_service_prices(conn=Depends(get_db)) -> list[ServicePrice]:
-    if conn is None:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    cursor = conn.cursor()
-    cursor.execute("SELECT service_name, base_price FROM service_prices ORDER BY service_name")
-    rows = cursor.fetchall()
-    return [ServicePrice(serviceName=row["service_name"], basePrice=row["base_price"]) for row in rows]
+@router.get("/services/prices", dependencies=[Depends(service_prices_etag)])
+def get_service_prices() -> list[ServicePrice]:
+    try:
+        return price_catalogue.get_all()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting service prices: {str(e)}")
 
 
 @router.put("/services/prices/{service_name}")
@@ -277,35 +660,17 @@ def update_service_price(service_name: str, body: dict, conn=Depends(get_db)) ->
     base_price = body.get("basePrice")
     if base_price is None:
         raise HTTPException(status_code=400, detail="basePrice is required")
-    
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE service_prices SET base_price = %s WHERE service_name = %s",
-        (base_price, service_name)
-    )
-    if cursor.rowcount == 0:
+    try:
+        return ServicePriceRepository(conn).update_price(service_name, base_price)
+    except NotFoundResponse:
         raise HTTPException(status_code=404, detail="Service not found")
-    conn.commit()
-    
-    cursor.execute(
-        "SELECT service_name, base_price FROM service_prices WHERE service_name = %s",
-        (service_name,)
-    )
-    row = cursor.fetchone()
-    return ServicePrice(serviceName=row["service_name"], basePrice=row["base_price"])
 
 
 @router.post("/services/prices")
 def create_service_price(service_price: ServicePriceCreate, conn=Depends(get_db)) -> ServicePrice:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT INTO service_prices (id, service_name, base_price) VALUES (%s, %s, %s)",
-        (str(uuid4()), service_price.serviceName, service_price.basePrice)
-    )
-    conn.commit()
-    return ServicePrice(serviceName=service_price.serviceName, basePrice=service_price.basePrice)
+    return ServicePriceRepository(conn).create(service_price)
 
 
 @router.patch("/services/prices/{service_name}/rename")
@@ -315,53 +680,34 @@ def rename_service(service_name: str, body: dict, conn=Depends(get_db)) -> Servi
     new_name = body.get("newName", "").strip()
     if not new_name:
         raise HTTPException(status_code=400, detail="newName is required")
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE service_prices SET service_name = %s WHERE service_name = %s",
-        (new_name, service_name)
-    )
-    if cursor.rowcount == 0:
+    try:
+        return ServicePriceRepository(conn).rename(service_name, new_name)
+    except NotFoundResponse:
         raise HTTPException(status_code=404, detail="Service not found")
-    conn.commit()
-    cursor.execute(
-        "SELECT service_name, base_price FROM service_prices WHERE service_name = %s",
-        (new_name,)
-    )
-    row = cursor.fetchone()
-    return ServicePrice(serviceName=row["service_name"], basePrice=row["base_price"])
 
 
 @router.delete("/services/prices/{service_name}")
 def delete_service_price(service_name: str, conn=Depends(get_db)) -> dict:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
-    cursor = conn.cursor()
-    cursor.execute(
-        "DELETE FROM service_prices WHERE service_name = %s",
-        (service_name,)
-    )
-    if cursor.rowcount == 0:
+    try:
+        ServicePriceRepository(conn).delete(service_name)
+    except NotFoundResponse:
         raise HTTPException(status_code=404, detail="Service not found")
-    conn.commit()
     return {"message": f"Service {service_name} deleted"}
 
 
-@router.get("/services/price/{service_name}")
-def get_service_price(service_name: str, conn=Depends(get_db)) -> ServicePrice:
-    if conn is None:
-        raise HTTPException(status_code=500, detail="Database connection failed")
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT service_name, base_price FROM service_prices WHERE service_name = %s",
-        (service_name,)
-    )
-    row = cursor.fetchone()
-    if row is None:
+@router.get("/services/price/{service_name}", dependencies=[Depends(service_prices_etag)])
+def get_service_price(service_name: str) -> ServicePrice:
+    try:
+        return price_catalogue.get(service_name)
+    except NotFoundResponse:
         raise HTTPException(status_code=404, detail="Service not found")
-    return ServicePrice(serviceName=row["service_name"], basePrice=row["base_price"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting service price: {str(e)}")
 
 
-@router.get("/clients")
+@router.get("/clients", dependencies=[Depends(haircuts_etag)])
 def get_clients(conn=Depends(get_db)) -> list[str]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
@@ -371,7 +717,7 @@ def get_clients(conn=Depends(get_db)) -> list[str]:
         raise HTTPException(status_code=500, detail=f"Error getting clients: {str(e)}")
 
 
-@router.get("/clients/top")
+@router.get("/clients/top", dependencies=[Depends(haircuts_etag)])
 def get_top_clients(conn=Depends(get_db), limit: int = 10) -> list[ClientStats]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
@@ -381,7 +727,7 @@ def get_top_clients(conn=Depends(get_db), limit: int = 10) -> list[ClientStats]:
         raise HTTPException(status_code=500, detail=f"Error getting top clients: {str(e)}")
 
 
-@router.get("/clients/top-by-spent")
+@router.get("/clients/top-by-spent", dependencies=[Depends(haircuts_etag)])
 def get_top_clients_by_spent(conn=Depends(get_db), limit: int = 10) -> list[ClientStats]:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
@@ -391,7 +737,7 @@ def get_top_clients_by_spent(conn=Depends(get_db), limit: int = 10) -> list[Clie
         raise HTTPException(status_code=500, detail=f"Error getting clients by spent: {str(e)}")
 
 
-@router.get("/clients/{client_name}")
+@router.get("/clients/{client_name}", dependencies=[Depends(haircuts_etag)])
 def get_client_stats(client_name: str, conn=Depends(get_db)) -> ClientStats:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
@@ -403,13 +749,20 @@ def get_client_stats(client_name: str, conn=Depends(get_db)) -> ClientStats:
         raise HTTPException(status_code=500, detail=f"Error getting client stats: {str(e)}")
 
 
-@router.get("/clients/{client_name}/history")
-def get_client_history(client_name: str, conn=Depends(get_db)) -> ClientHistory:
+@router.get("/clients/{client_name}/history", dependencies=[Depends(haircuts_etag)])
+def get_client_history(
+    client_name: str,
+    conn=Depends(get_db),
+    shape: ResponseShape = "objects",
+    dictionary: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+) -> ClientHistory:
     if conn is None:
         raise HTTPException(status_code=500, detail="Database connection failed")
+    selected = _parse_fields(fields)
     try:
         repo = HaircutRepository(conn)
-        haircuts = repo.get_client_haircuts(client_name)
-        return ClientHistory(clientName=client_name, haircuts=haircuts)
+        haircuts = repo.get_client_haircuts(client_name, selected)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting client history: {str(e)}")
+    return _render_client_history(client_name, haircuts, selected, shape, dictionary)
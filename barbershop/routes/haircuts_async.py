@@ -0,0 +1,343 @@
+"""
+Async versions of the haircuts endpoints, used when DB_DRIVER=async.
+
+The JSON read and write endpoints run as `async def` on the event loop with
+AsyncHaircutRepository, so a worker is not limited by the threadpool size
+while requests wait on PostgreSQL. Streaming export, legacy import, bulk
+create and the service-price endpoints keep their sync implementations.
+`router` is the sync router with the async endpoints swapped in place, so
+paths, parameters and route matching order are the same in both modes.
+"""
+import asyncio
+import time
+from datetime import date as date_type
+from typing import AsyncGenerator, Optional
+from uuid import UUID
+
+import loguru
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+
+from barbershop.conditional import check_not_modified, make_etag
+from barbershop.database import AsyncPoolTimeout, get_async_pool
+from barbershop.models import Haircut, HaircutChanges, HaircutCreate, ClientStats, ClientHistory
+from barbershop.repositories import (
+    AsyncHaircutRepository,
+    AsyncTableVersionRepository,
+    ExpiredChangeToken,
+    InvalidCursor,
+    NotFoundResponse,
+)
+from .haircuts import (
+    DASHBOARD_EXTRA_CONNECTIONS,
+    DASHBOARD_HISTORY_DAYS,
+    FIELDS_DESCRIPTION,
+    MAX_PAGE_SIZE,
+    ResponseShape,
+    _dashboard_sections,
+    _day_summary,
+    _haircut_filters,
+    _parse_cutoff_date,
+    _parse_fields,
+    _render_client_history,
+    _render_daily_history,
+    _render_dashboard,
+    _render_haircuts,
+    haircuts_version,
+    router as sync_router,
+)
+
+logger = loguru.logger
+
+
+async def get_async_db() -> AsyncGenerator:
+    """Dependency para obtener una conexión del pool async."""
+    try:
+        async with get_async_pool().connection() as conn:
+            yield conn
+    except AsyncPoolTimeout:
+        raise HTTPException(status_code=503, detail="Database busy, try again later")
+
+
+async def haircuts_etag(request: Request, conn=Depends(get_async_db)) -> None:
+    """Responde 304 si el cliente ya tiene la versión actual de haircuts."""
+    version = await AsyncTableVersionRepository(conn).get_version("haircuts")
+    check_not_modified(request, make_etag(haircuts_version(version), request))
+
+
+async def _run_dashboard_section(conn, section) -> tuple:
+    query, present = section
+    started = time.perf_counter()
+    result = await query(AsyncHaircutRepository(conn))
+    return (present(result) if present else result), (time.perf_counter() - started) * 1000
+
+
+async def _run_pooled_dashboard_section(conn, section) -> tuple:
+    try:
+        return await _run_dashboard_section(conn, section)
+    finally:
+        await get_async_pool().putconn(conn)
+
+
+async def _run_dashboard_sections(conn, sections: list) -> list:
+    return [await _run_dashboard_section(conn, section) for section in sections]
+
+
+async def _borrow_dashboard_connections(wanted: int) -> list:
+    """Same as the sync version: free connections only, never a wait."""
+    pool = get_async_pool()
+    borrowed = []
+    for _ in range(min(wanted, DASHBOARD_EXTRA_CONNECTIONS)):
+        try:
+            borrowed.append(await pool.getconn(timeout=0))
+        except AsyncPoolTimeout:
+            break
+        except Exception as e:
+            logger.warning(f"Error borrowing a dashboard connection: {e}")
+            break
+    return borrowed
+
+
+async_router = APIRouter(prefix="/haircuts")
+
+
+@async_router.get("/", dependencies=[Depends(haircuts_etag)])
+async def get_haircuts(
+    response: Response,
+    conn=Depends(get_async_db),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    service: Optional[str] = None,
+    client: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    shape: ResponseShape = "objects",
+    dictionary: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+) -> list[Haircut]:
+    selected = _parse_fields(fields)
+    filters = _haircut_filters(date_from, date_to, service, client, min_price, max_price)
+    try:
+        haircuts, next_cursor = await AsyncHaircutRepository(conn).list_haircuts(limit, after, filters, selected)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _render_haircuts(response, haircuts, selected, shape, dictionary, next_cursor)
+
+
+@async_router.get("/stats/global", dependencies=[Depends(haircuts_etag)])
+async def get_global_stats(conn=Depends(get_async_db)) -> dict:
+    try:
+        return await AsyncHaircutRepository(conn).get_global_stats()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting global stats: {str(e)}")
+
+
+@async_router.get("/changes", dependencies=[Depends(haircuts_etag)])
+async def get_haircut_changes(since: Optional[str] = None, conn=Depends(get_async_db)) -> HaircutChanges:
+    try:
+        return await AsyncHaircutRepository(conn).get_changes(since)
+    except ExpiredChangeToken as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting changes: {str(e)}")
+
+
+@async_router.get("/dashboard")
+async def get_dashboard(
+    response: Response,
+    conn=Depends(get_async_db),
+    days: int = Query(DASHBOARD_HISTORY_DAYS, ge=1, le=MAX_PAGE_SIZE),
+    limit: int = 10,
+) -> dict:
+    started = time.perf_counter()
+    sections = _dashboard_sections(days, limit)
+    items = list(sections.values())
+    borrowed = await _borrow_dashboard_connections(len(items) - 1)
+    parallel, local = items[1:len(borrowed) + 1], [items[0], *items[len(borrowed) + 1:]]
+    try:
+        local_values, *parallel_values = await asyncio.gather(
+            _run_dashboard_sections(conn, local),
+            *(_run_pooled_dashboard_section(extra, section) for section, extra in zip(parallel, borrowed)),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting dashboard: {str(e)}")
+    values = [local_values[0], *parallel_values, *local_values[1:]]
+    return _render_dashboard(response, dict(zip(sections, values)), started)
+
+
+@async_router.get("/{haircut_id}", dependencies=[Depends(haircuts_etag)])
+async def get_haircut(haircut_id: UUID, conn=Depends(get_async_db)) -> Haircut:
+    return await AsyncHaircutRepository(conn).get_by_id(haircut_id)
+
+
+@async_router.post("/create")
+async def create_haircut(haircut: HaircutCreate, conn=Depends(get_async_db)) -> Haircut:
+    try:
+        return await AsyncHaircutRepository(conn).create(haircut)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Formato de fecha inválido: {str(e)}. Use formato DD/MM/YYYY")
+    except Exception as e:
+        logger.error(f"Error creating haircut: {e}")
+        raise HTTPException(status_code=500, detail=f"Error creating haircut: {str(e)}")
+
+
+@async_router.put("/update")
+async def update_haircut(haircut: Haircut, conn=Depends(get_async_db)) -> Haircut:
+    try:
+        return await AsyncHaircutRepository(conn).update(haircut)
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Haircut not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating haircut: {str(e)}")
+
+
+@async_router.patch("/{haircut_id}/price")
+async def update_haircut_price(haircut_id: UUID, body: dict, conn=Depends(get_async_db)) -> Haircut:
+    new_price = body.get("price")
+    if new_price is None:
+        raise HTTPException(status_code=400, detail="Price is required")
+    try:
+        return await AsyncHaircutRepository(conn).update_price(haircut_id, new_price)
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Haircut not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error updating price: {str(e)}")
+
+
+@async_router.delete("/{haircut_id}")
+async def delete_haircut(haircut_id: UUID, conn=Depends(get_async_db)) -> dict:
+    try:
+        await AsyncHaircutRepository(conn).delete(haircut_id)
+        return {"message": f"Haircut {haircut_id} deleted"}
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Haircut not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting haircut: {str(e)}")
+
+
+@async_router.delete("/history/date/{cutoff_date}")
+async def delete_haircuts_by_date(cutoff_date: str, conn=Depends(get_async_db)) -> dict:
+    parsed_date = _parse_cutoff_date(cutoff_date)
+    try:
+        count = await AsyncHaircutRepository(conn).delete_by_date(parsed_date)
+        return {"message": f"Deleted {count} haircuts for date {cutoff_date}"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting haircuts: {str(e)}")
+
+
+@async_router.get("/history/daily", dependencies=[Depends(haircuts_etag)])
+async def get_daily_history(
+    response: Response,
+    conn=Depends(get_async_db),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[date_type] = None,
+    date_from: Optional[date_type] = None,
+    date_to: Optional[date_type] = None,
+    include_clients: bool = False,
+    distinct_clients: bool = False,
+    shape: ResponseShape = "objects",
+) -> list[dict]:
+    try:
+        history, next_after = await AsyncHaircutRepository(conn).get_daily_history(
+            limit, after, date_from, date_to, include_clients, distinct_clients
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting history: {str(e)}")
+    return _render_daily_history(response, history, next_after, include_clients, distinct_clients, shape)
+
+
+@async_router.get("/history/date/{cutoff_date}", dependencies=[Depends(haircuts_etag)])
+async def get_haircuts_by_date(
+    cutoff_date: str,
+    conn=Depends(get_async_db),
+    shape: ResponseShape = "objects",
+    dictionary: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+) -> list[Haircut]:
+    selected = _parse_fields(fields)
+    parsed_date = _parse_cutoff_date(cutoff_date)
+    try:
+        haircuts = await AsyncHaircutRepository(conn).get_by_date(parsed_date, selected)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting haircuts: {str(e)}")
+    return _render_haircuts(None, haircuts, selected, shape, dictionary)
+
+
+@async_router.get("/history/today")
+async def get_today_summary(conn=Depends(get_async_db)) -> dict:
+    try:
+        return _day_summary(await AsyncHaircutRepository(conn).get_day_totals(date_type.today()))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting summary: {str(e)}")
+
+
+@async_router.get("/clients", dependencies=[Depends(haircuts_etag)])
+async def get_clients(conn=Depends(get_async_db)) -> list[str]:
+    try:
+        return await AsyncHaircutRepository(conn).get_unique_clients()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting clients: {str(e)}")
+
+
+@async_router.get("/clients/top", dependencies=[Depends(haircuts_etag)])
+async def get_top_clients(conn=Depends(get_async_db), limit: int = 10) -> list[ClientStats]:
+    try:
+        return await AsyncHaircutRepository(conn).get_top_clients(limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting top clients: {str(e)}")
+
+
+@async_router.get("/clients/top-by-spent", dependencies=[Depends(haircuts_etag)])
+async def get_top_clients_by_spent(conn=Depends(get_async_db), limit: int = 10) -> list[ClientStats]:
+    try:
+        return await AsyncHaircutRepository(conn).get_clients_by_spent(limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting clients by spent: {str(e)}")
+
+
+@async_router.get("/clients/{client_name}", dependencies=[Depends(haircuts_etag)])
+async def get_client_stats(client_name: str, conn=Depends(get_async_db)) -> ClientStats:
+    try:
+        return await AsyncHaircutRepository(conn).get_client_stats(client_name)
+    except NotFoundResponse:
+        raise HTTPException(status_code=404, detail="Client not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting client stats: {str(e)}")
+
+
+@async_router.get("/clients/{client_name}/history", dependencies=[Depends(haircuts_etag)])
+async def get_client_history(
+    client_name: str,
+    conn=Depends(get_async_db),
+    shape: ResponseShape = "objects",
+    dictionary: bool = False,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+) -> ClientHistory:
+    selected = _parse_fields(fields)
+    try:
+        haircuts = await AsyncHaircutRepository(conn).get_client_haircuts(client_name, selected)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error getting client history: {str(e)}")
+    return _render_client_history(client_name, haircuts, selected, shape, dictionary)
+
+
+def replace_routes(base: APIRouter, replacements: APIRouter) -> APIRouter:
+    """
+    Copy of `base` where each route also defined in `replacements` (same
+    path and methods) is swapped in place, keeping the matching order.
+    """
+    by_key = {(route.path, frozenset(route.methods)): route for route in replacements.routes}
+    merged = APIRouter()
+    for route in base.routes:
+        merged.routes.append(by_key.pop((route.path, frozenset(route.methods)), route))
+    if by_key:
+        raise ValueError(f"Routes missing from the base router: {sorted(path for path, _ in by_key)}")
+    return merged
+
+
+router = replace_routes(sync_router, async_router)
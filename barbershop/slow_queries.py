@@ -0,0 +1,102 @@
+"""
+In-memory log of slow statements for the admin endpoints.
+
+The timed cursors hand every statement slower than SLOW_QUERY_MS to
+`slow_query_log`, a ring buffer of the last SLOW_QUERY_LOG_SIZE entries.
+Parameters are reduced to their types so client names never reach the log.
+With SLOW_QUERY_EXPLAIN=1 the cursor also captures the plan on the same
+connection with a plain `EXPLAIN`, which does not run the statement.
+`EXPLAIN (ANALYZE, BUFFERS)` runs it a second time, inside the request, so
+it is only used for SELECTs of the repository methods listed in
+SLOW_QUERY_ANALYZE_CALLERS (e.g. `HaircutRepository.get_daily_history`),
+and never for statements that lock rows or call functions with side
+effects such as `pg_advisory_lock` or `nextval`.
+"""
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+# 0 disables the log.
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_MS", 500)) / 1000
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "0") == "1"
+SLOW_QUERY_LOG_SIZE = int(os.environ.get("SLOW_QUERY_LOG_SIZE", 100))
+SLOW_QUERY_ANALYZE_CALLERS = frozenset(
+    caller.strip() for caller in os.environ.get("SLOW_QUERY_ANALYZE_CALLERS", "").split(",") if caller.strip()
+)
+
+# Reads that must not run twice: row locks and functions with side effects.
+_NOT_REPEATABLE = re.compile(
+    r"\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE|KEY\s+SHARE)\b"
+    r"|\b(pg_(try_)?advisory\w*|nextval|setval|set_config|pg_notify)\s*\(",
+    re.IGNORECASE,
+)
+
+
+def is_slow(seconds: float) -> bool:
+    return bool(SLOW_QUERY_SECONDS) and seconds >= SLOW_QUERY_SECONDS
+
+
+def explain_statement(query: str, caller: str) -> str:
+    """EXPLAIN for `query`; analyzed only for allowlisted callers' plain reads."""
+    if (
+        caller in SLOW_QUERY_ANALYZE_CALLERS
+        and query.lstrip().upper().startswith("SELECT")
+        and not _NOT_REPEATABLE.search(query)
+    ):
+        return f"EXPLAIN (ANALYZE, BUFFERS) {query}"
+    return f"EXPLAIN {query}"
+
+
+def redact_params(params: Any) -> Any:
+    """Replace parameter values with their type names, keeping the shape."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: redact_params(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        if params and all(isinstance(value, (list, tuple)) for value in params):
+            return f"<{len(params)} rows>"
+        return [redact_params(value) for value in params]
+    return f"<{type(params).__name__}>"
+
+
+class SlowQueryLog:
+    def __init__(self, size: int = SLOW_QUERY_LOG_SIZE):
+        self._entries: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        caller: str,
+        query: str,
+        params: Any,
+        seconds: float,
+        rows: int,
+        plan: Optional[str] = None,
+    ) -> None:
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "caller": caller,
+            "statement": " ".join(str(query).split()),
+            "params": redact_params(params),
+            "durationMs": round(seconds * 1000, 3),
+            "rows": rows,
+            "plan": plan,
+        }
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self) -> list[dict]:
+        """Logged statements, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
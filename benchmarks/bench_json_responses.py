@@ -0,0 +1,64 @@
+"""
+Latency of a 10k-haircut list response through FastAPI's default encoding
+and through the pre-serialized FAST_JSON_RESPONSES path:
+
+    python -m benchmarks.bench_json_responses --rows 10000 --requests 200
+
+Both routes return the same in-memory models, so only serialization differs.
+"""
+import argparse
+import statistics
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from barbershop.models import Haircut
+from barbershop.repositories.mappers import haircuts_from_rows
+from barbershop.responses import haircuts_response
+
+from .bench_mapper import make_rows
+
+
+def build_app(haircuts: list[Haircut]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default")
+    def default_encoding() -> list[Haircut]:
+        return haircuts
+
+    @app.get("/fast")
+    def fast_encoding() -> list[Haircut]:
+        return haircuts_response(haircuts)
+
+    return app
+
+
+def measure(client: TestClient, path: str, requests: int) -> list[float]:
+    client.get(path)
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JSON list responses.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    haircuts = haircuts_from_rows(make_rows(args.rows))
+    client = TestClient(build_app(haircuts))
+    assert client.get("/default").json() == client.get("/fast").json()
+    for path in ("/default", "/fast"):
+        timings = measure(client, path, args.requests)
+        quantiles = statistics.quantiles(timings, n=100)
+        print(f"{path:<10} p50 {quantiles[49]:8.1f} ms   p99 {quantiles[98]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for mapping haircuts rows to models.
+
+Compares the old per-row `Haircut(...)` construction with the shared mapper,
+which validates the whole list through one TypeAdapter:
+
+    python -m benchmarks.bench_mapper --rows 100000
+"""
+import argparse
+import gc
+import time
+from datetime import date, timedelta
+from uuid import uuid4
+
+from barbershop.models import Haircut
+from barbershop.repositories.mappers import haircuts_from_rows
+
+
+def make_rows(count: int) -> list[dict]:
+    start = date(2024, 1, 1)
+    return [
+        {
+            "id": uuid4(),
+            "client_name": f"Cliente {i % 500}",
+            "service_name": "Corte",
+            "price": 5000.0 + i % 7,
+            "date": start + timedelta(days=i % 365),
+            "time": "10:30",
+            "count": 1,
+            "tip": i % 3 * 100,
+        }
+        for i in range(count)
+    ]
+
+
+def per_row_models(rows: list[dict]) -> list[Haircut]:
+    return [
+        Haircut(
+            id=row["id"],
+            clientName=row["client_name"],
+            serviceName=row["service_name"],
+            price=row["price"],
+            date=row["date"] or date.today(),
+            time=row["time"],
+            count=row["count"] if row["count"] else 0,
+            tip=row["tip"] if row["tip"] else 0,
+        )
+        for row in rows
+    ]
+
+
+def measure(label: str, fn, rows: list[dict], repeat: int) -> None:
+    best = min(_timed(fn, rows) for _ in range(repeat))
+    print(f"{label:<24} {len(rows) / best:>12,.0f} rows/s  ({best * 1000:.1f} ms)")
+
+
+def _timed(fn, rows: list[dict]) -> float:
+    # Like timeit, keep the cyclic collector out of the measurement.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        fn(rows)
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark haircut row mapping.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    measure("per-row Haircut(...)", per_row_models, rows, args.repeat)
+    measure("mapper", haircuts_from_rows, rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,46 @@
+import os
 from datetime import date
 from uuid import UUID, uuid4
+import psycopg2
 import pytest
+from psycopg2.extras import RealDictCursor
 from barbershop.models import Haircut, HaircutCreate
 
+# Throwaway PostgreSQL database for the tests that need a real server. Its
+# public schema is dropped and recreated around every such test.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def _reset_schema(conn):
+    conn.rollback()
+    conn.autocommit = True
+    conn.cursor().execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+    conn.autocommit = False
+
+
+@pytest.fixture
+def pg_connection():
+    """Connection to an empty TEST_DATABASE_URL database; skips the test when unset."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    conn = psycopg2.connect(TEST_DATABASE_URL, cursor_factory=RealDictCursor)
+    _reset_schema(conn)
+    yield conn
+    _reset_schema(conn)
+    conn.close()
+
+
+@pytest.fixture
+def migrated_connection(pg_connection):
+    """`pg_connection` with every migration applied."""
+    from barbershop.database import run_migrations
+    from barbershop.repositories.haircuts import day_totals_cache
+
+    run_migrations(pg_connection)
+    day_totals_cache.invalidate()
+    yield pg_connection
+    day_totals_cache.invalidate()
+
 
 @pytest.fixture
 def haircut_id():
@@ -0,0 +1,37 @@
+import time
+
+from barbershop.cache import TTLCache
+
+
+def test_cache_returns_value_until_expired():
+    cache = TTLCache(ttl=0.05)
+    cache.set("today", 10)
+    assert cache.get("today") == 10
+    time.sleep(0.06)
+    assert cache.get("today") is None
+
+
+def test_cache_invalidate_single_key_and_all():
+    cache = TTLCache(ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    cache.invalidate()
+    assert cache.get("b") is None
+
+
+def test_cache_evicts_oldest_entry_when_full():
+    cache = TTLCache(ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    assert cache.get("a") is None
+    assert cache.get("c") == 3
+
+
+def test_cache_disabled_with_zero_ttl():
+    cache = TTLCache(ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
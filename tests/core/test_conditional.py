@@ -0,0 +1,45 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from barbershop.conditional import check_not_modified, etag_matches, make_etag
+
+
+def _request(query: str = "", if_none_match: str = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/haircuts/", "query_string": query.encode(), "headers": headers})
+
+
+def test_etag_depends_on_version_and_query():
+    assert make_etag("haircuts-1", _request("limit=10")) == make_etag("haircuts-1", _request("limit=10"))
+    assert make_etag("haircuts-1", _request("limit=10")) != make_etag("haircuts-2", _request("limit=10"))
+    assert make_etag("haircuts-1", _request("limit=10")) != make_etag("haircuts-1", _request("limit=20"))
+
+
+@pytest.mark.parametrize("header", ['"a"', '"b", "a"', 'W/"a"', "*"])
+def test_etag_matches_if_none_match_lists(header):
+    assert etag_matches(header, '"a"')
+    assert etag_matches(header, 'W/"a"')
+
+
+def test_etags_are_weak():
+    assert make_etag("haircuts-1", _request()).startswith('W/"')
+
+
+def test_etag_does_not_match_other_tags():
+    assert not etag_matches('"b"', '"a"')
+    assert not etag_matches(None, '"a"')
+
+
+def test_check_not_modified_raises_304_for_current_etag():
+    with pytest.raises(HTTPException) as raised:
+        check_not_modified(_request(if_none_match='"a"'), '"a"')
+    assert raised.value.status_code == 304
+    assert raised.value.headers["ETag"] == '"a"'
+    assert raised.value.headers["Vary"] == "Accept-Encoding"
+
+
+def test_check_not_modified_keeps_new_etag_for_the_response():
+    request = _request(if_none_match='"old"')
+    check_not_modified(request, '"a"')
+    assert request.state.etag == '"a"'
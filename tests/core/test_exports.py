@@ -0,0 +1,69 @@
+import json
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from barbershop.exports import csv_chunks, ndjson_chunks
+
+
+def make_row(**overrides):
+    row = {
+        "id": uuid4(),
+        "client_name": "Pedro",
+        "service_name": "Corte",
+        "price": 7000.0,
+        "date": date(2024, 12, 7),
+        "time": "12:30",
+        "count": None,
+        "tip": 500.0,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_csv_chunks_writes_header_then_one_chunk_per_batch():
+    batches = [[make_row(), make_row()], [make_row(client_name="Misa, la del fade")]]
+    chunks = list(csv_chunks(iter(batches)))
+    assert chunks[0] == "id,clientName,serviceName,price,date,time,count,tip\r\n"
+    assert len(chunks) == 3
+    assert chunks[1].count("\r\n") == 2
+    assert '"Misa, la del fade"' in chunks[2]
+
+
+def test_ndjson_chunks_uses_api_field_names():
+    row = make_row()
+    [chunk] = list(ndjson_chunks(iter([[row]])))
+    assert json.loads(chunk) == {
+        "id": str(row["id"]),
+        "clientName": "Pedro",
+        "serviceName": "Corte",
+        "price": 7000.0,
+        "date": "2024-12-07",
+        "time": "12:30",
+        "count": 0,
+        "tip": 500.0,
+    }
+
+
+def test_arrow_chunks_round_trip():
+    pyarrow = pytest.importorskip("pyarrow")
+    from barbershop.exports import arrow_chunks
+
+    rows = [make_row(), make_row(time=None)]
+    data = b"".join(arrow_chunks(iter([rows, rows])))
+    table = pyarrow.ipc.open_stream(data).read_all()
+    assert table.num_rows == 4
+    assert table.column("date").type == pyarrow.date32()
+    assert table.column("price").type == pyarrow.float64()
+
+
+def test_parquet_chunks_write_one_row_group_per_batch():
+    pyarrow = pytest.importorskip("pyarrow")
+    import pyarrow.parquet
+    from barbershop.exports import parquet_chunks
+
+    data = b"".join(parquet_chunks(iter([[make_row()], [make_row(), make_row()]])))
+    parquet_file = pyarrow.parquet.ParquetFile(pyarrow.BufferReader(data))
+    assert parquet_file.metadata.num_rows == 3
+    assert parquet_file.num_row_groups == 2
@@ -0,0 +1,61 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from barbershop import metrics as metrics_module
+from barbershop.app import app as barbershop_app
+from barbershop.metrics import METRICS_ENABLED, MetricsRegistry, metrics, query_caller, record_request_metrics
+
+
+class FakeRepository:
+    def get_by_id(self):
+        return self._run()
+
+    def _run(self):
+        return query_caller()
+
+
+def test_query_caller_names_the_public_repository_method():
+    assert FakeRepository().get_by_id().endswith("get_by_id")
+
+
+def test_query_caller_classifies_each_function_once():
+    repository = FakeRepository()
+    repository.get_by_id()
+    labels = metrics_module._caller_labels
+    assert labels[FakeRepository._run.__code__] is None
+    assert labels[FakeRepository.get_by_id.__code__].endswith("get_by_id")
+    assert repository.get_by_id().endswith("get_by_id")
+
+
+def test_metrics_endpoint_follows_metrics_enabled():
+    paths = {route.path for route in barbershop_app.routes}
+    assert ("/metrics" in paths) == METRICS_ENABLED
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    registry.observe_query("HaircutRepository.get_all", 0.002, 10)
+    registry.observe_query("HaircutRepository.get_all", 0.2, 5)
+    text = registry.render()
+    assert 'barbershop_db_query_duration_seconds_bucket{caller="HaircutRepository.get_all",le="0.0025"} 1' in text
+    assert 'barbershop_db_query_duration_seconds_bucket{caller="HaircutRepository.get_all",le="+Inf"} 2' in text
+    assert 'barbershop_db_query_duration_seconds_count{caller="HaircutRepository.get_all"} 2' in text
+    assert 'barbershop_db_query_rows_total{caller="HaircutRepository.get_all"} 15' in text
+
+
+def test_middleware_labels_requests_by_route_template():
+    app = FastAPI()
+    app.middleware("http")(record_request_metrics)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        return {"id": item_id}
+
+    metrics.reset()
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.get("/missing")
+    text = metrics.render()
+    assert 'barbershop_http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in text
+    assert 'barbershop_http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
@@ -0,0 +1,72 @@
+import sys
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from barbershop.main import app
+from barbershop.profiling import PROFILING_ENABLED, collapse_stack, profile_request, profile_store
+
+
+def busy_endpoint():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+    return {"ok": True}
+
+
+def busy_chunks():
+    for _ in range(3):
+        busy_endpoint()
+        yield b"chunk\n"
+
+
+def stream_endpoint():
+    return StreamingResponse(busy_chunks(), media_type="text/plain")
+
+
+def _profiled_app():
+    profiled = FastAPI()
+    profiled.middleware("http")(profile_request)
+    profiled.get("/busy")(busy_endpoint)
+    profiled.get("/stream")(stream_endpoint)
+    return profiled
+
+
+def test_profiler_is_only_installed_when_enabled():
+    installed = any(middleware.kwargs.get("dispatch") is profile_request for middleware in app.user_middleware)
+    assert installed == PROFILING_ENABLED
+
+
+def test_collapse_stack_skips_stacks_outside_the_app():
+    assert collapse_stack(sys._getframe()) is None
+
+
+def test_profiled_request_stores_collapsed_stacks(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    profiled = _profiled_app()
+    headers = {"X-Admin-Token": "secret"}
+
+    assert "X-Profile-Id" not in TestClient(profiled).get("/busy").headers
+    response = TestClient(profiled).get("/busy", headers={**headers, "X-Profile": "1"})
+    profile_id = response.headers["X-Profile-Id"]
+
+    collapsed = TestClient(app).get(f"/admin/profiles/{profile_id}", headers=headers)
+    assert collapsed.status_code == 200
+    assert "busy_endpoint" in collapsed.text
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.text.splitlines())
+    assert profile_store.summaries()[0]["path"] == "/busy"
+
+
+def test_streamed_responses_are_profiled_until_the_body_is_sent(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    headers = {"X-Admin-Token": "secret", "X-Profile": "1"}
+
+    response = TestClient(_profiled_app()).get("/stream", headers=headers)
+
+    assert response.text == "chunk\n" * 3
+    summary = profile_store.summaries()[0]
+    assert summary["id"] == int(response.headers["X-Profile-Id"])
+    assert summary["durationMs"] >= 150
+    assert "busy_chunks" in profile_store.collapsed(summary["id"])
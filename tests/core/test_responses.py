@@ -0,0 +1,68 @@
+import json
+from datetime import date
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+
+from barbershop.models import ClientHistory, Haircut
+from barbershop.responses import (
+    client_history_response,
+    columns_response,
+    haircuts_response,
+    server_timing,
+    to_columns,
+)
+
+
+def _haircut(**overrides) -> Haircut:
+    fields = {
+        "id": uuid4(),
+        "clientName": "José",
+        "serviceName": "Corte",
+        "price": 5000.0,
+        "date": date(2024, 3, 1),
+        "time": "10:30",
+        "count": 1,
+        "tip": 0,
+    }
+    fields.update(overrides)
+    return Haircut(**fields)
+
+
+def test_haircuts_response_matches_default_encoding():
+    haircuts = [_haircut(), _haircut(time=None, tip=150.5)]
+    response = haircuts_response(haircuts, {"X-Next-Cursor": "abc"})
+    assert response.media_type == "application/json"
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert json.loads(response.body) == jsonable_encoder(haircuts)
+
+
+def test_client_history_response_matches_default_encoding():
+    history = ClientHistory(clientName="José", haircuts=[_haircut()])
+    assert json.loads(client_history_response(history).body) == jsonable_encoder(history)
+
+
+def test_to_columns_lists_each_record_as_a_row():
+    haircuts = [_haircut(), _haircut(serviceName="Barba")]
+    result = to_columns(haircuts, ("id", "serviceName", "price"))
+    assert result == {
+        "columns": ["id", "serviceName", "price"],
+        "rows": [[haircuts[0].id, "Corte", 5000.0], [haircuts[1].id, "Barba", 5000.0]],
+    }
+
+
+def test_to_columns_dictionary_encodes_repeated_values():
+    records = [{"serviceName": name, "price": 1} for name in ("Corte", "Barba", "Corte")]
+    result = to_columns(records, ("serviceName", "price"), dictionary=("serviceName",))
+    assert result["rows"] == [[0, 1], [1, 1], [0, 1]]
+    assert result["dictionaries"] == {"serviceName": ["Corte", "Barba"]}
+
+
+def test_columns_response_serializes_uuids_and_dates():
+    haircut = _haircut()
+    body = json.loads(columns_response([haircut], ("id", "date"), clientName="José").body)
+    assert body == {"clientName": "José", "columns": ["id", "date"], "rows": [[str(haircut.id), "2024-03-01"]]}
+
+
+def test_server_timing_lists_each_section():
+    assert server_timing({"stats": 1.234, "total": 10}) == "stats;dur=1.2, total;dur=10.0"
@@ -0,0 +1,51 @@
+from fastapi.testclient import TestClient
+
+from barbershop import slow_queries
+from barbershop.main import app
+from barbershop.slow_queries import SlowQueryLog, explain_statement, redact_params, slow_query_log
+
+client = TestClient(app)
+
+
+def test_redact_params_keeps_only_types():
+    assert redact_params(("José", 5000.0, None)) == ["<str>", "<float>", None]
+    assert redact_params([("a", 1), ("b", 2)]) == "<2 rows>"
+
+
+def test_explain_does_not_analyze_by_default():
+    assert explain_statement("SELECT 1", "HaircutRepository.get_all") == "EXPLAIN SELECT 1"
+
+
+def test_explain_analyzes_only_plain_reads_of_allowlisted_callers(monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_ANALYZE_CALLERS", frozenset({"HaircutRepository.get_all"}))
+    assert explain_statement("SELECT 1", "HaircutRepository.get_all").startswith("EXPLAIN (ANALYZE, BUFFERS)")
+    assert explain_statement("SELECT 1", "run_migrations") == "EXPLAIN SELECT 1"
+    for query in (
+        "DELETE FROM haircuts WHERE id = %s",
+        "SELECT pg_try_advisory_lock(%s) AS locked",
+        "SELECT nextval('haircuts_seq')",
+        "SELECT id FROM haircuts WHERE id = %s FOR UPDATE",
+    ):
+        assert explain_statement(query, "HaircutRepository.get_all") == f"EXPLAIN {query}"
+
+
+def test_log_keeps_the_newest_entries():
+    log = SlowQueryLog(size=2)
+    for caller in ("first", "second", "third"):
+        log.record(caller, "SELECT  *\n FROM haircuts", ("José",), 0.75, 3)
+    entries = log.entries()
+    assert [entry["caller"] for entry in entries] == ["third", "second"]
+    assert entries[0]["statement"] == "SELECT * FROM haircuts"
+    assert entries[0]["params"] == ["<str>"]
+    assert entries[0]["durationMs"] == 750.0
+
+
+def test_admin_endpoints_need_the_token(monkeypatch):
+    assert client.get("/admin/slow-queries").status_code == 404
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+    assert client.get("/admin/slow-queries", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    slow_query_log.record("HaircutRepository.get_top_clients", "SELECT 1", None, 1.0, 1)
+    response = client.get("/admin/slow-queries", headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()[0]["caller"] == "HaircutRepository.get_top_clients"
+    slow_query_log.clear()
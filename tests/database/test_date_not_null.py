@@ -0,0 +1,45 @@
+from uuid import uuid4
+
+import psycopg2
+import pytest
+
+from barbershop.database import migrations, run_migrations
+from barbershop.repositories import HaircutRepository
+
+
+def _insert(conn, day):
+    conn.cursor().execute(
+        "INSERT INTO haircuts (id, client_name, service_name, price, date) VALUES (%s, 'Ana', 'Corte', 100, %s)",
+        (uuid4(), day),
+    )
+    conn.commit()
+
+
+def test_haircuts_without_a_date_stop_the_migration(pg_connection, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATIONS", [entry for entry in migrations.MIGRATIONS if entry[0] < 9])
+    run_migrations(pg_connection)
+    _insert(pg_connection, None)
+    monkeypatch.undo()
+
+    with pytest.raises(RuntimeError, match="1 haircuts have no date"):
+        run_migrations(pg_connection)
+    assert migrations.get_schema_version(pg_connection) == 8
+
+    pg_connection.cursor().execute("UPDATE haircuts SET date = '2024-03-01'")
+    pg_connection.commit()
+    assert run_migrations(pg_connection) == 1
+
+
+def test_every_haircut_has_a_date_to_page_by(migrated_connection):
+    with pytest.raises(psycopg2.errors.NotNullViolation):
+        _insert(migrated_connection, None)
+    migrated_connection.rollback()
+    for day in ("2024-03-01", "2024-03-02", "2024-03-03"):
+        _insert(migrated_connection, day)
+
+    repo = HaircutRepository(migrated_connection)
+    first, cursor = repo.list_haircuts(limit=2)
+    second, last = repo.list_haircuts(limit=2, after=cursor)
+
+    assert [str(cut.date) for cut in first + second] == ["2024-03-03", "2024-03-02", "2024-03-01"]
+    assert last is None
@@ -0,0 +1,16 @@
+import pytest
+
+from barbershop.database.migrations import MIGRATIONS, migration
+
+
+def test_migrations_are_ordered_and_unique():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+
+def test_duplicate_migration_version_is_rejected():
+    with pytest.raises(ValueError):
+        @migration(1, "Duplicate baseline")
+        def _duplicate(conn):
+            pass
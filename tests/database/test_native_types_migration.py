@@ -0,0 +1,174 @@
+import threading
+import time
+from uuid import uuid4
+
+import psycopg2
+import pytest
+from psycopg2.extras import RealDictCursor
+
+from barbershop.database import migrations
+from barbershop.database.migrations import MIGRATION_LOCK_KEY, _baseline, _keyset_indexes, _native_types, run_migrations
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+def legacy_connection(pg_connection):
+    """Database at schema version 2, with TEXT ids and dates."""
+    _baseline(pg_connection)
+    _keyset_indexes(pg_connection)
+    pg_connection.commit()
+    return pg_connection
+
+
+def _insert(conn, haircut_id, day):
+    conn.cursor().execute(
+        "INSERT INTO haircuts (id, client_name, service_name, price, date) VALUES (%s, 'Ana', 'Corte', 100, %s)",
+        (haircut_id, day),
+    )
+    conn.commit()
+
+
+def _column_type(conn, column):
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT data_type FROM information_schema.columns WHERE table_name = 'haircuts' AND column_name = %s",
+        (column,),
+    )
+    return cursor.fetchone()["data_type"]
+
+
+def test_invalid_index_from_an_interrupted_build_is_rebuilt(legacy_connection):
+    conn = legacy_connection
+    ids = [str(uuid4()), str(uuid4())]
+    for haircut_id in ids:
+        _insert(conn, haircut_id, "2024-03-01")
+    cursor = conn.cursor()
+    cursor.execute("ALTER TABLE haircuts ADD COLUMN id_native uuid, ADD COLUMN date_native date")
+    cursor.execute("UPDATE haircuts SET id_native = %s", (ids[0],))
+    conn.commit()
+    conn.autocommit = True
+    with pytest.raises(psycopg2.Error):
+        cursor.execute("CREATE UNIQUE INDEX CONCURRENTLY haircuts_id_native_key ON haircuts (id_native)")
+    conn.autocommit = False
+    cursor.execute("UPDATE haircuts SET id_native = NULL")
+    conn.commit()
+
+    _native_types(conn)
+    conn.commit()
+
+    assert _column_type(conn, "id") == "uuid"
+    cursor.execute("SELECT indisvalid FROM pg_index WHERE indexrelid = 'haircuts_pkey'::regclass")
+    assert cursor.fetchone()["indisvalid"]
+
+
+def test_waiting_for_the_migration_lock_holds_no_snapshot(pg_connection, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATION_LOCK_POLL_SECONDS", 0.05)
+    holder = pg_connection
+    holder.cursor().execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+    holder.commit()
+    waiter = psycopg2.connect(TEST_DATABASE_URL, cursor_factory=RealDictCursor)
+    worker = threading.Thread(target=run_migrations, args=(waiter,))
+    worker.start()
+    try:
+        time.sleep(0.3)
+        assert worker.is_alive()
+        cursor = holder.cursor()
+        cursor.execute("SELECT backend_xmin FROM pg_stat_activity WHERE pid = %s", (waiter.get_backend_pid(),))
+        assert cursor.fetchone()["backend_xmin"] is None
+        holder.rollback()
+    finally:
+        holder.cursor().execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        holder.commit()
+        worker.join(timeout=30)
+        waiter.close()
+    assert not worker.is_alive()
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _haircuts(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT id::text AS id, date FROM haircuts ORDER BY id")
+    return {row["id"]: row["date"] for row in cursor.fetchall()}
+
+
+def test_interrupted_conversion_resumes_and_swaps_the_columns(legacy_connection, monkeypatch):
+    conn = legacy_connection
+    expected = {}
+    for index in range(7):
+        haircut_id = str(uuid4())
+        day = f"0{index + 1}/03/2024" if index % 2 else f"2024-03-0{index + 1}"
+        _insert(conn, haircut_id, day)
+        expected[haircut_id] = f"2024-03-0{index + 1}"
+    monkeypatch.setattr(migrations, "NATIVE_TYPES_BATCH_SIZE", 3)
+
+    def interrupt(message):
+        raise Interrupted(message)
+
+    monkeypatch.setattr(migrations.logger, "info", interrupt)
+    with pytest.raises(Interrupted):
+        _native_types(conn)
+    conn.rollback()
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) AS converted FROM haircuts WHERE id_native IS NOT NULL")
+    assert cursor.fetchone()["converted"] == 3
+
+    monkeypatch.undo()
+    _native_types(conn)
+    conn.commit()
+
+    assert _column_type(conn, "id") == "uuid"
+    assert _column_type(conn, "date") == "date"
+    assert {haircut_id: day.isoformat() for haircut_id, day in _haircuts(conn).items()} == expected
+    cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'haircuts'")
+    assert {row["indexname"] for row in cursor.fetchall()} == {
+        "haircuts_pkey",
+        "idx_haircuts_date_id",
+        "idx_haircuts_client_date_id",
+        "idx_haircuts_service_date_id",
+    }
+
+
+def test_unconvertible_rows_stop_the_migration_before_any_change(legacy_connection):
+    conn = legacy_connection
+    _insert(conn, str(uuid4()), "2024-03-01")
+    _insert(conn, "legacy-1", "2024-03-01")
+    _insert(conn, str(uuid4()), "March 1st")
+
+    with pytest.raises(RuntimeError, match="2 haircuts"):
+        _native_types(conn)
+    conn.rollback()
+
+    assert _column_type(conn, "id") == "text"
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) AS columns FROM information_schema.columns WHERE column_name = 'id_native'")
+    assert cursor.fetchone()["columns"] == 0
+
+
+def test_rows_edited_after_their_batch_keep_the_edit(legacy_connection, monkeypatch):
+    conn = legacy_connection
+    edited, inserted = str(uuid4()), str(uuid4())
+    _insert(conn, edited, "2024-03-01")
+    build_index = migrations._create_index_concurrently
+    writer = psycopg2.connect(TEST_DATABASE_URL, cursor_factory=RealDictCursor)
+
+    def write_then_build(cursor, *args, **kwargs):
+        if not writer.closed:
+            writer.cursor().execute("UPDATE haircuts SET date = '05/03/2024' WHERE id = %s", (edited,))
+            _insert(writer, inserted, "2024-03-06")
+            writer.close()
+        build_index(cursor, *args, **kwargs)
+
+    monkeypatch.setattr(migrations, "_create_index_concurrently", write_then_build)
+    _native_types(conn)
+    conn.commit()
+
+    assert {haircut_id: day.isoformat() for haircut_id, day in _haircuts(conn).items()} == {
+        edited: "2024-03-05",
+        inserted: "2024-03-06",
+    }
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) AS triggers FROM pg_trigger WHERE tgname = 'haircuts_sync_native_types'")
+    assert cursor.fetchone()["triggers"] == 0
@@ -0,0 +1,155 @@
+import psycopg2
+import pytest
+from psycopg2 import extensions
+
+from barbershop.database.pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        if self.conn.broken:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+
+    def close(self):
+        pass
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.info = FakeInfo()
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    created = []
+
+    def fake_connect(*args, **kwargs):
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, "connect", fake_connect)
+    return created
+
+
+def test_pool_reuses_connections(connections):
+    pool = ConnectionPool("postgresql://test", min_size=1, max_size=2)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert len(connections) == 1
+    assert pool.stats()["acquired"] == 2
+    assert pool.stats()["inUse"] == 0
+
+
+def test_pool_times_out_when_exhausted(connections):
+    pool = ConnectionPool("postgresql://test", min_size=0, max_size=1, timeout=0.01)
+    conn = pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn()
+    pool.putconn(conn)
+    assert pool.stats()["timeouts"] == 1
+    pool.putconn(pool.getconn())
+
+
+def test_try_getconn_returns_none_without_waiting(connections):
+    pool = ConnectionPool("postgresql://test", min_size=0, max_size=1, timeout=5)
+    conn = pool.try_getconn()
+    assert conn is not None
+    assert pool.try_getconn() is None
+    pool.putconn(conn)
+    assert pool.stats()["timeouts"] == 0
+    pool.putconn(pool.try_getconn())
+
+
+def test_pool_replaces_broken_connections(connections):
+    pool = ConnectionPool("postgresql://test", min_size=1, max_size=2)
+    connections[0].broken = True
+    with pool.connection() as conn:
+        assert conn is not connections[0]
+    assert connections[0].closed
+    assert pool.stats()["discarded"] == 1
+
+
+def test_pool_checks_each_replacement_after_a_server_restart(connections):
+    pool = ConnectionPool("postgresql://test", min_size=3, max_size=4)
+    for conn in connections:
+        conn.broken = True
+    with pool.connection() as conn:
+        assert not conn.broken
+    assert pool.stats()["discarded"] == 3
+
+
+def test_pool_gives_up_when_no_connection_is_healthy(connections, monkeypatch):
+    pool = ConnectionPool("postgresql://test", min_size=1, max_size=2)
+
+    def broken_connect(*args, **kwargs):
+        conn = FakeConnection()
+        conn.broken = True
+        connections.append(conn)
+        return conn
+
+    monkeypatch.setattr(psycopg2, "connect", broken_connect)
+    connections[0].broken = True
+    with pytest.raises(psycopg2.OperationalError):
+        pool.getconn()
+    assert pool.stats()["inUse"] == 0
+
+
+def test_pool_stats_count_idle_connections(connections):
+    pool = ConnectionPool("postgresql://test", min_size=1, max_size=3)
+    assert pool.stats()["idle"] == 1
+    first, second = pool.getconn(), pool.getconn()
+    assert pool.stats()["idle"] == 0
+    pool.putconn(first)
+    pool.putconn(second)
+    assert pool.stats()["idle"] == 2
+
+
+def test_pool_keeps_connections_opened_by_concurrent_checkouts(connections):
+    pool = ConnectionPool("postgresql://test", min_size=1, max_size=3)
+    burst = [pool.getconn() for _ in range(3)]
+    for conn in burst:
+        pool.putconn(conn)
+
+    again = [pool.getconn() for _ in range(3)]
+
+    assert len(connections) == 3
+    assert not any(conn.closed for conn in connections)
+    assert {id(conn) for conn in again} == {id(conn) for conn in burst}
+    for conn in again:
+        pool.putconn(conn)
+
+
+def test_closed_pool_closes_returned_connections(connections):
+    pool = ConnectionPool("postgresql://test", min_size=1, max_size=2)
+    conn = pool.getconn()
+    pool.closeall()
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.stats()["idle"] == 0
+
+
+def test_pool_rejects_invalid_sizes(connections):
+    with pytest.raises(ValueError):
+        ConnectionPool("postgresql://test", min_size=3, max_size=2)
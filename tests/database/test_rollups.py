@@ -0,0 +1,67 @@
+from datetime import date
+from uuid import uuid4
+
+from barbershop.database.rollups import rebuild_daily_totals
+
+MARCH_1, MARCH_2, MARCH_3 = date(2024, 3, 1), date(2024, 3, 2), date(2024, 3, 3)
+
+
+def _daily_totals(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT date, total, count, tip, cut_count FROM daily_totals ORDER BY date")
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def _assert_matches_rebuild(conn):
+    conn.commit()
+    maintained = _daily_totals(conn)
+    rebuild_daily_totals(conn)
+    assert maintained == _daily_totals(conn)
+    conn.rollback()
+    return maintained
+
+
+def _insert_many(conn, rows):
+    ids = [uuid4() for _ in rows]
+    cursor = conn.cursor()
+    for haircut_id, (day, price, count, tip) in zip(ids, rows):
+        cursor.execute(
+            "INSERT INTO haircuts (id, client_name, service_name, price, date, count, tip) "
+            "VALUES (%s, 'Ana', 'Corte', %s, %s, %s, %s)",
+            (haircut_id, price, day, count, tip),
+        )
+    return ids
+
+
+def test_triggers_match_a_rebuild_after_mixed_writes(migrated_connection):
+    conn = migrated_connection
+    cursor = conn.cursor()
+    ids = _insert_many(conn, [
+        (MARCH_1, 100, 1, 10),
+        (MARCH_1, 200, None, None),
+        (MARCH_2, 300, 2, 0),
+        (MARCH_2, 400, 0, 5),
+        (MARCH_2, 500, 1, 1),
+    ])
+    _assert_matches_rebuild(conn)
+
+    cursor.execute("UPDATE haircuts SET price = price + 50, tip = 3 WHERE id = %s", (ids[0],))
+    cursor.execute("UPDATE haircuts SET date = %s WHERE id = %s", (MARCH_3, ids[2]))
+    cursor.execute("UPDATE haircuts SET date = %s WHERE id = %s", (MARCH_1, ids[4]))
+    cursor.execute("UPDATE haircuts SET date = %s WHERE id = %s", (MARCH_3, ids[3]))
+    _assert_matches_rebuild(conn)
+
+    cursor.execute("DELETE FROM haircuts WHERE id = %s", (ids[1],))
+    cursor.execute("UPDATE haircuts SET count = count + 1")
+    maintained = _assert_matches_rebuild(conn)
+    assert [row["date"] for row in maintained] == [MARCH_1, MARCH_3]
+
+
+def test_deleting_a_whole_day_removes_its_totals(migrated_connection):
+    conn = migrated_connection
+    _insert_many(conn, [(MARCH_1, 100, 1, 0), (MARCH_1, 200, 1, 0), (MARCH_2, 300, 1, 0)])
+    conn.cursor().execute("DELETE FROM haircuts WHERE date = %s", (MARCH_1,))
+
+    maintained = _assert_matches_rebuild(conn)
+    assert [row["date"] for row in maintained] == [MARCH_2]
+    assert maintained[0]["total"] == 300
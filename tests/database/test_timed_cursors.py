@@ -0,0 +1,70 @@
+import asyncio
+
+import psycopg2
+import pytest
+from psycopg2.extras import RealDictCursor
+
+from barbershop import slow_queries
+from barbershop.database import async_pool, timed_cursor
+from barbershop.database.timed_cursor import TimedCursor
+from barbershop.slow_queries import slow_query_log
+
+
+@pytest.fixture
+def explain_everything(monkeypatch):
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_SECONDS", 1e-9)
+    monkeypatch.setattr(timed_cursor, "SLOW_QUERY_EXPLAIN", True)
+    monkeypatch.setattr(async_pool, "SLOW_QUERY_EXPLAIN", True)
+    slow_query_log.clear()
+    yield
+    slow_query_log.clear()
+
+
+def test_slow_statements_are_logged_with_their_plan(pg_connection, explain_everything):
+    conn = psycopg2.connect(pg_connection.dsn, cursor_factory=TimedCursor)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1 AS one")
+        assert cursor.fetchone() == {"one": 1}
+    finally:
+        conn.close()
+    assert "Result" in slow_query_log.entries()[0]["plan"]
+
+
+def test_async_plans_work_on_dict_row_connections(pg_connection, explain_everything):
+    psycopg = pytest.importorskip("psycopg")
+    from psycopg.rows import dict_row
+
+    async def run():
+        conn = await psycopg.AsyncConnection.connect(
+            pg_connection.dsn, row_factory=dict_row, cursor_factory=async_pool.TimedAsyncCursor
+        )
+        try:
+            cursor = await conn.execute("SELECT 1 AS one")
+            row = await cursor.fetchone()
+            status = conn.info.transaction_status
+            return row, status
+        finally:
+            await conn.close()
+
+    row, status = asyncio.run(run())
+
+    assert row == {"one": 1}
+    assert status == psycopg.pq.TransactionStatus.INTRANS
+    assert "Result" in slow_query_log.entries()[0]["plan"]
+
+
+
+def test_explained_advisory_locks_are_taken_once(pg_connection, explain_everything, monkeypatch):
+    caller = "test_explained_advisory_locks_are_taken_once"
+    monkeypatch.setattr(slow_queries, "SLOW_QUERY_ANALYZE_CALLERS", frozenset({caller}))
+    conn = psycopg2.connect(pg_connection.dsn, cursor_factory=TimedCursor)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT pg_advisory_lock(727)")
+        conn.cursor(cursor_factory=RealDictCursor).execute("SELECT pg_advisory_unlock(727)")
+        cursor.execute("SELECT COUNT(*) AS locks FROM pg_locks WHERE locktype = 'advisory' AND pid = pg_backend_pid()")
+        assert cursor.fetchone()["locks"] == 0
+        assert slow_query_log.entries()[-1]["caller"] == caller
+    finally:
+        conn.close()
@@ -0,0 +1,56 @@
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+
+from barbershop.database.tombstones import prune_tombstones
+from barbershop.repositories import ExpiredChangeToken, HaircutRepository
+
+
+def _insert(conn):
+    haircut_id = uuid4()
+    conn.cursor().execute(
+        "INSERT INTO haircuts (id, client_name, service_name, price, date) VALUES (%s, 'Ana', 'Corte', 7000, '2024-03-01')",
+        (haircut_id,),
+    )
+    conn.commit()
+    return haircut_id
+
+
+def _delete(conn, haircut_id):
+    conn.cursor().execute("DELETE FROM haircuts WHERE id = %s", (haircut_id,))
+    conn.commit()
+
+
+def _age_tombstones(conn, days):
+    conn.cursor().execute("UPDATE haircut_tombstones SET deleted_at = deleted_at - %s", (timedelta(days=days),))
+    conn.commit()
+
+
+def test_prune_keeps_recent_tombstones(migrated_connection):
+    _delete(migrated_connection, _insert(migrated_connection))
+
+    assert prune_tombstones(migrated_connection, timedelta(days=30)) == 0
+    migrated_connection.commit()
+
+    cursor = migrated_connection.cursor()
+    cursor.execute("SELECT COUNT(*) AS count FROM haircut_tombstones")
+    assert cursor.fetchone()["count"] == 1
+
+
+def test_tokens_from_before_pruned_tombstones_expire(migrated_connection):
+    repo = HaircutRepository(migrated_connection)
+    old_token = repo.get_changes().token
+    migrated_connection.rollback()
+    _delete(migrated_connection, _insert(migrated_connection))
+    _age_tombstones(migrated_connection, 31)
+    token_after_delete = repo.get_changes().token
+    migrated_connection.rollback()
+
+    assert prune_tombstones(migrated_connection, timedelta(days=30)) == 1
+    migrated_connection.commit()
+
+    with pytest.raises(ExpiredChangeToken):
+        repo.get_changes(old_token)
+    migrated_connection.rollback()
+    assert repo.get_changes(token_after_delete).deleted == []
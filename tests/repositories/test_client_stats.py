@@ -0,0 +1,94 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from barbershop.models import ClientStats
+from barbershop.repositories import HaircutRepository, NotFoundResponse
+
+ROWS = [
+    ("Ana", "Corte", 7000, date(2024, 3, 1), 500),
+    ("Ana", "Barba", 3000, date(2024, 3, 4), None),
+    ("Ana", "Corte", 7000, date(2024, 3, 2), 0),
+    ("Luis", "Corte", 9000, date(2024, 3, 3), 1000),
+    ("Luis", "Color", 20000, date(2024, 2, 27), None),
+    ("Marta", "Barba", 3500, date(2024, 3, 5), None),
+]
+
+
+class CountingConnection:
+    """Counts the statements run through the wrapped connection."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.queries = 0
+
+    def cursor(self):
+        cursor = self.connection.cursor()
+        execute = cursor.execute
+
+        def counted(query, params=None):
+            self.queries += 1
+            return execute(query, params)
+
+        cursor.execute = counted
+        return cursor
+
+
+@pytest.fixture
+def clients(migrated_connection):
+    cursor = migrated_connection.cursor()
+    for client_name, service_name, price, day, tip in ROWS:
+        cursor.execute(
+            "INSERT INTO haircuts (id, client_name, service_name, price, date, count, tip) "
+            "VALUES (%s, %s, %s, %s, %s, 1, %s)",
+            (str(uuid4()), client_name, service_name, price, day, tip),
+        )
+    migrated_connection.commit()
+    return migrated_connection
+
+
+def _per_client_stats(conn, client_name: str) -> ClientStats:
+    """The stats as they were computed before: one aggregate plus one services query per client."""
+    cursor = conn.cursor()
+    cursor.execute(
+        """SELECT COUNT(*) as total_cuts, SUM(price) as total_spent,
+                  COALESCE(SUM(tip), 0) as total_tip, MAX(date) as last_visit
+           FROM haircuts WHERE client_name = %s""",
+        (client_name,),
+    )
+    row = cursor.fetchone()
+    cursor.execute("SELECT DISTINCT service_name FROM haircuts WHERE client_name = %s", (client_name,))
+    return ClientStats(
+        clientName=client_name,
+        totalCuts=row["total_cuts"],
+        totalSpent=float(row["total_spent"]),
+        totalTip=float(row["total_tip"]),
+        lastVisit=str(row["last_visit"]),
+        services=sorted(r["service_name"] for r in cursor.fetchall()),
+    )
+
+
+def test_client_stats_match_the_per_client_queries(clients):
+    counting = CountingConnection(clients)
+    repo = HaircutRepository(counting)
+
+    for client_name in ("Ana", "Luis", "Marta"):
+        assert repo.get_client_stats(client_name) == _per_client_stats(clients, client_name)
+    assert counting.queries == 3
+
+    with pytest.raises(NotFoundResponse):
+        repo.get_client_stats("Nadie")
+
+
+def test_client_rankings_match_the_per_client_queries(clients):
+    counting = CountingConnection(clients)
+    repo = HaircutRepository(counting)
+
+    top = repo.get_top_clients(limit=2)
+    by_spent = repo.get_clients_by_spent(limit=3)
+
+    assert counting.queries == 2
+    assert top == [_per_client_stats(clients, name) for name in ("Ana", "Luis")]
+    assert by_spent == [_per_client_stats(clients, name) for name in ("Luis", "Ana", "Marta")]
+    assert by_spent[2].totalTip == 0
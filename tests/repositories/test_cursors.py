@@ -0,0 +1,39 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from barbershop.repositories.cursors import (
+    InvalidCursor,
+    decode_change_token,
+    decode_cursor,
+    encode_change_token,
+    encode_cursor,
+)
+
+
+def test_cursor_round_trip():
+    haircut_id = uuid4()
+    token = encode_cursor(date(2024, 12, 8), haircut_id)
+    assert decode_cursor(token) == (date(2024, 12, 8), haircut_id)
+
+
+def test_cursor_is_url_safe():
+    token = encode_cursor(date(2024, 12, 8), uuid4())
+    assert "=" not in token and "+" not in token and "/" not in token
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "eyJkIjoiMjAyNCJ9"])
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
+
+
+def test_change_token_round_trip():
+    assert decode_change_token(encode_change_token(4_294_967_301)) == 4_294_967_301
+
+
+@pytest.mark.parametrize("token", ["", "not-a-token", encode_cursor(date(2024, 12, 8), uuid4())])
+def test_invalid_change_token_is_rejected(token):
+    with pytest.raises(InvalidCursor):
+        decode_change_token(token)
@@ -0,0 +1,55 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+
+from barbershop.models import Haircut, HaircutCreate
+from barbershop.repositories import HaircutRepository, NotFoundResponse
+
+MARCH_1, MARCH_2 = date(2024, 3, 1), date(2024, 3, 2)
+
+
+def _create(repo, day="01/03/2024", price=7000):
+    return repo.create(HaircutCreate(clientName="Ana", serviceName="Corte", price=price, date=day))
+
+
+def test_update_moving_a_haircut_refreshes_both_days(migrated_connection):
+    repo = HaircutRepository(migrated_connection)
+    haircut = _create(repo)
+    _create(repo, day="02/03/2024", price=3000)
+    assert repo.get_day_totals(MARCH_1).total == 7000
+    assert repo.get_day_totals(MARCH_2).total == 3000
+
+    updated = repo.update(haircut.model_copy(update={"date": MARCH_2, "price": 8000}))
+
+    assert updated.date == MARCH_2
+    assert repo.get_day_totals(MARCH_1).total == 0
+    assert repo.get_day_totals(MARCH_2).total == 11000
+
+
+def test_update_price_and_delete_refresh_the_day(migrated_connection):
+    repo = HaircutRepository(migrated_connection)
+    haircut = _create(repo)
+    assert repo.get_day_totals(MARCH_1).total == 7000
+
+    assert repo.update_price(haircut.id, 9000).price == 9000
+    assert repo.get_day_totals(MARCH_1).total == 9000
+
+    repo.delete(haircut.id)
+    assert repo.get_day_totals(MARCH_1).count == 0
+    assert repo.get_day_totals(MARCH_1).total == 0
+
+
+@pytest.mark.parametrize("write", [
+    lambda repo, missing: repo.update(
+        Haircut(id=missing, clientName="Ana", serviceName="Corte", price=1, date=MARCH_1)
+    ),
+    lambda repo, missing: repo.update_price(missing, 1),
+    lambda repo, missing: repo.delete(missing),
+])
+def test_writes_to_a_missing_haircut_raise_not_found(migrated_connection, write):
+    repo = HaircutRepository(migrated_connection)
+    _create(repo)
+    with pytest.raises(NotFoundResponse):
+        write(repo, uuid4())
+    assert len(repo.get_all()) == 1
@@ -0,0 +1,41 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from barbershop.repositories.legacy_import import iter_legacy_chunks, map_legacy_row
+
+REGISTER_FILE = Path(__file__).resolve().parents[2] / "register_haircuts.csv"
+
+
+def test_map_legacy_row():
+    row = ["ba623c88-4a8a-4e92-b7dd-50fed92d0ef8", "Pedro", "cresta", "6000.0", "2024-12-07 12:30:54", "Pelo"]
+    haircut_id, client, service, price, haircut_date, time, count, tip = map_legacy_row(row)
+    assert (client, service, price, haircut_date, time) == ("Pedro", "cresta", 6000.0, date(2024, 12, 7), "12:30")
+    assert (count, tip) == (0, 0)
+    assert map_legacy_row(row)[0] == haircut_id
+
+
+def test_map_legacy_row_falls_back_to_category():
+    row = ["x", "Misa", "", "5000", "2024-12-08 19:04:16", "Barba"]
+    assert map_legacy_row(row)[2] == "Barba"
+
+
+def test_map_legacy_row_rejects_bad_rows():
+    with pytest.raises(ValueError):
+        map_legacy_row(["x", "Misa", "mullet", "cinco mil", "2024-12-08 19:04:16", "Pelo"])
+
+
+def test_register_file_gets_unique_ids_despite_shared_legacy_id():
+    with REGISTER_FILE.open(newline="") as file:
+        chunks = list(iter_legacy_chunks(file, chunk_size=10))
+    rows = [row for chunk, _ in chunks for row in chunk]
+    assert [len(chunk) for chunk, _ in chunks] == [10, 10, 5]
+    assert sum(skipped for _, skipped in chunks) == 0
+    assert len({row[0] for row in rows}) == len(rows) == 25
+
+
+def test_header_row_is_ignored():
+    lines = ["id,client,style,price,timestamp,category\n", "x,Pedro,cresta,6000.0,2024-12-07 12:30:54,Pelo\n"]
+    [(rows, skipped)] = list(iter_legacy_chunks(lines))
+    assert len(rows) == 1 and skipped == 0
@@ -0,0 +1,77 @@
+from datetime import date
+from uuid import uuid4
+
+import pytest
+from pydantic import ValidationError
+
+from barbershop.models import Haircut
+from barbershop.repositories.mappers import (
+    haircut_from_row,
+    haircuts_from_rows,
+    parse_fields,
+    partial_haircuts_from_rows,
+)
+
+
+def _row(**overrides):
+    row = {
+        "id": uuid4(),
+        "client_name": "Juan",
+        "service_name": "Corte",
+        "price": 5000.0,
+        "date": date(2024, 3, 1),
+        "time": "10:30",
+        "count": 1,
+        "tip": 200.0,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_rows_match_per_row_models():
+    rows = [_row(), _row(count=None, tip=None, time=None)]
+    mapped = haircuts_from_rows(rows)
+    expected = [
+        Haircut(
+            id=row["id"],
+            clientName=row["client_name"],
+            serviceName=row["service_name"],
+            price=row["price"],
+            date=row["date"],
+            time=row["time"],
+            count=row["count"] or 0,
+            tip=row["tip"] or 0,
+        )
+        for row in rows
+    ]
+    assert mapped == expected
+    assert mapped[1].count == 0 and mapped[1].tip == 0
+
+
+def test_missing_date_defaults_to_today():
+    assert haircut_from_row(_row(date=None)).date == date.today()
+
+
+def test_bad_rows_are_rejected():
+    with pytest.raises(ValidationError):
+        haircut_from_row(_row(price="not a price"))
+    with pytest.raises(ValidationError):
+        haircut_from_row(_row(date="01/03/2024 and more"))
+
+
+def test_parse_fields_keeps_request_order_without_duplicates():
+    assert parse_fields("date, serviceName,price,date") == ("date", "serviceName", "price")
+    assert parse_fields("") is None
+    assert parse_fields(None) is None
+
+
+def test_parse_fields_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="client_name"):
+        parse_fields("date,client_name")
+
+
+def test_partial_rows_hold_only_requested_fields_with_defaults():
+    row = {"date": None, "service_name": "Corte", "tip": None}
+    assert partial_haircuts_from_rows([row], ("serviceName", "date", "tip")) == [
+        {"serviceName": "Corte", "date": date.today(), "tip": 0}
+    ]
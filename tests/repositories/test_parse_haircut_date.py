@@ -0,0 +1,23 @@
+from datetime import date
+
+import pytest
+
+from barbershop.repositories import parse_haircut_date
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("17/01/2026", date(2026, 1, 17)),
+        ("2026-01-17", date(2026, 1, 17)),
+        (date(2026, 1, 17), date(2026, 1, 17)),
+    ],
+)
+def test_parse_haircut_date(value, expected):
+    assert parse_haircut_date(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "17-01", "32/01/2026", "2026/01"])
+def test_parse_haircut_date_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_haircut_date(value)
@@ -0,0 +1,94 @@
+import pytest
+
+from barbershop.models import ServicePrice
+from barbershop.repositories import NotFoundResponse, PriceCatalogue
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query, params=None):
+        self.conn.queries += 1
+
+    def fetchall(self):
+        return [{"service_name": name, "base_price": price} for name, price in self.conn.prices.items()]
+
+
+class FakeConnection:
+    def __init__(self, prices):
+        self.prices = prices
+        self.queries = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+
+def test_catalogue_serves_cached_prices_until_invalidated():
+    conn = FakeConnection({"Corte": 7000})
+    catalogue = PriceCatalogue()
+    catalogue.load(conn)
+
+    assert catalogue.get("Corte") == ServicePrice(serviceName="Corte", basePrice=7000)
+    assert catalogue.get_all() == [ServicePrice(serviceName="Corte", basePrice=7000)]
+    assert conn.queries == 1
+
+    conn.prices["Corte"] = 7500
+    catalogue.invalidate()
+    catalogue.load(conn)
+    assert catalogue.get("Corte").basePrice == 7500
+
+
+def test_catalogue_raises_not_found_for_unknown_service():
+    catalogue = PriceCatalogue()
+    catalogue.load(FakeConnection({"Corte": 7000}))
+    with pytest.raises(NotFoundResponse):
+        catalogue.get("Permanente")
+
+
+def test_catalogue_version_follows_prices():
+    conn = FakeConnection({"Corte": 7000})
+    catalogue = PriceCatalogue()
+    catalogue.load(conn)
+    version = catalogue.version
+
+    catalogue.invalidate()
+    catalogue.load(conn)
+    assert catalogue.version == version
+
+    conn.prices["Corte"] = 7500
+    catalogue.invalidate()
+    catalogue.load(conn)
+    assert catalogue.version != version
+
+
+class RacingConnection(FakeConnection):
+    """Changes the prices and invalidates `catalogue` while a load is querying."""
+
+    def __init__(self, prices, catalogue):
+        super().__init__(prices)
+        self.catalogue = catalogue
+        self.race = False
+
+    def cursor(self):
+        if self.race:
+            self.race = False
+            self.prices["Corte"] = 7500
+            self.catalogue.invalidate()
+        return FakeCursor(self)
+
+
+def test_catalogue_has_no_version_when_an_invalidation_races_the_load(monkeypatch):
+    catalogue = PriceCatalogue()
+    conn = RacingConnection({"Corte": 7000}, catalogue)
+    catalogue.load(conn)
+    stale = catalogue.version
+
+    conn.race = True
+    catalogue.invalidate()
+    monkeypatch.setattr(catalogue, "load", lambda connection=None: PriceCatalogue.load(catalogue, conn))
+
+    assert catalogue.version is None
+    # The next access loads again, now without a race.
+    assert catalogue.version not in (None, stale)
+    assert catalogue.get("Corte").basePrice == 7500
@@ -19,3 +19,16 @@ def haircut(haircut_id: str) -> Haircut:
         name="Test Haircut",
         price=20.0,
     )
+
+
+@pytest.fixture
+def db_client(migrated_connection):
+    """TestClient whose routes use the migrated test database connection."""
+    from fastapi.testclient import TestClient
+
+    from barbershop.main import app
+    from barbershop.routes.haircuts import get_db
+
+    app.dependency_overrides[get_db] = lambda: migrated_connection
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
@@ -0,0 +1,37 @@
+def _item(**overrides):
+    item = {"clientName": "Ana", "serviceName": "Corte", "price": 7000, "date": "01/03/2024"}
+    item.update(overrides)
+    return item
+
+
+def _haircut_count(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT count(*) AS haircuts FROM haircuts")
+    count = cursor.fetchone()["haircuts"]
+    conn.rollback()
+    return count
+
+
+def test_bulk_create_reports_invalid_items_and_saves_the_rest(db_client, migrated_connection):
+    items = [_item(), _item(price="caro"), _item(date="marzo"), _item(clientName="José")]
+
+    response = db_client.post("/haircuts/bulk", json=items)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    assert body["results"][0]["id"] and body["results"][3]["id"]
+    assert body["results"][1]["error"].startswith("price:")
+    assert body["results"][2]["error"].startswith("Formato de fecha inválido")
+    assert _haircut_count(migrated_connection) == 2
+
+
+def test_bulk_create_rolls_back_every_row_when_one_insert_fails(db_client, migrated_connection):
+    migrated_connection.cursor().execute("ALTER TABLE haircuts ADD CONSTRAINT test_price_cap CHECK (price < 100000)")
+    migrated_connection.commit()
+
+    response = db_client.post("/haircuts/bulk", json=[_item(), _item(price=200000), _item()])
+
+    assert response.status_code == 500
+    assert _haircut_count(migrated_connection) == 0
@@ -0,0 +1,77 @@
+import pytest
+
+DAYS = ["01/03/2024", "02/03/2024", "04/03/2024", "05/03/2024", "07/03/2024"]
+
+
+@pytest.fixture
+def history_client(db_client):
+    for price, day in enumerate(DAYS, start=1):
+        for client_name in ("Ana", "Luis", "Ana"):
+            response = db_client.post(
+                "/haircuts/create",
+                json={"clientName": client_name, "serviceName": "Corte", "price": price * 1000, "date": day},
+            )
+            assert response.status_code == 200
+    return db_client
+
+
+def _dates(response) -> list[str]:
+    return [day["date"] for day in response.json()]
+
+
+def test_daily_history_returns_lean_totals_newest_first(history_client):
+    response = history_client.get("/haircuts/history/daily")
+
+    assert response.status_code == 200
+    assert _dates(response) == ["2024-03-07", "2024-03-05", "2024-03-04", "2024-03-02", "2024-03-01"]
+    assert set(response.json()[0]) == {"date", "total", "count", "tip"}
+    assert response.json()[0]["total"] == 15000
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_daily_history_window_bounds_are_inclusive(history_client):
+    response = history_client.get(
+        "/haircuts/history/daily", params={"date_from": "2024-03-02", "date_to": "2024-03-05"}
+    )
+    assert _dates(response) == ["2024-03-05", "2024-03-04", "2024-03-02"]
+
+    response = history_client.get("/haircuts/history/daily", params={"date_from": "2024-03-06"})
+    assert _dates(response) == ["2024-03-07"]
+
+    response = history_client.get("/haircuts/history/daily", params={"date_to": "2024-03-01"})
+    assert _dates(response) == ["2024-03-01"]
+
+
+def test_daily_history_pages_follow_the_cursor(history_client):
+    first = history_client.get("/haircuts/history/daily", params={"limit": 2})
+    assert _dates(first) == ["2024-03-07", "2024-03-05"]
+    assert first.headers["X-Next-Cursor"] == "2024-03-05"
+
+    second = history_client.get("/haircuts/history/daily", params={"limit": 2, "after": "2024-03-05"})
+    assert _dates(second) == ["2024-03-04", "2024-03-02"]
+    assert second.headers["X-Next-Cursor"] == "2024-03-02"
+
+    last = history_client.get("/haircuts/history/daily", params={"limit": 2, "after": "2024-03-02"})
+    assert _dates(last) == ["2024-03-01"]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_daily_history_pages_stay_inside_the_window(history_client):
+    params = {"limit": 1, "date_from": "2024-03-02", "date_to": "2024-03-04"}
+    first = history_client.get("/haircuts/history/daily", params=params)
+    assert _dates(first) == ["2024-03-04"]
+
+    last = history_client.get("/haircuts/history/daily", params={**params, "after": first.headers["X-Next-Cursor"]})
+    assert _dates(last) == ["2024-03-02"]
+    assert "X-Next-Cursor" not in last.headers
+
+
+def test_daily_history_adds_clients_only_when_asked(history_client):
+    response = history_client.get(
+        "/haircuts/history/daily",
+        params={"date_from": "2024-03-07", "include_clients": True, "distinct_clients": True},
+    )
+
+    [day] = response.json()
+    assert sorted(day["clients"]) == ["Ana", "Ana", "Luis"]
+    assert day["clientCount"] == 2
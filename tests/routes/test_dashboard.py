@@ -0,0 +1,41 @@
+import time
+from datetime import date
+
+from fastapi import Response
+
+from barbershop.models import DailyTotal
+from barbershop.routes.haircuts import _dashboard_sections, _render_dashboard, _run_dashboard_section
+
+
+class FakeRepository:
+    def get_global_stats(self):
+        return {"totalHaircuts": 3}
+
+    def get_day_totals(self, day):
+        return DailyTotal(date=day, total=100.0, count=2, tip=10.0)
+
+    def get_daily_history(self, limit=None):
+        return [{"date": date(2024, 3, 1), "total": 100.0}][:limit], None
+
+    def get_top_clients(self, limit):
+        return ["Ana"][:limit]
+
+    def get_clients_by_spent(self, limit):
+        return ["José"][:limit]
+
+
+def test_dashboard_combines_sections_and_timings(monkeypatch):
+    monkeypatch.setattr("barbershop.routes.haircuts.HaircutRepository", lambda conn: FakeRepository())
+    started = time.perf_counter()
+    results = {name: _run_dashboard_section(None, section) for name, section in _dashboard_sections(30, 10).items()}
+    response = Response()
+
+    body = _render_dashboard(response, results, started)
+
+    assert body["stats"] == {"totalHaircuts": 3}
+    assert body["today"]["count"] == 2
+    assert body["history"] == [{"date": date(2024, 3, 1), "total": 100.0}]
+    assert body["topClients"] == ["Ana"]
+    assert body["topClientsBySpent"] == ["José"]
+    timing = response.headers["Server-Timing"]
+    assert [entry.split(";")[0] for entry in timing.split(", ")] == [*body, "total"]
@@ -0,0 +1,63 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+
+from barbershop.database import pool as pool_module
+from barbershop.database.pool import ConnectionPool
+from barbershop.main import app
+
+
+@pytest.fixture
+def small_pool(migrated_connection, monkeypatch):
+    migrated_connection.commit()
+    pool = ConnectionPool(migrated_connection.dsn, min_size=1, max_size=2, timeout=2)
+    monkeypatch.setattr(pool_module, "_pool", pool)
+    yield pool
+    pool.closeall()
+
+
+def test_concurrent_dashboards_share_a_small_pool(small_pool):
+    def load_dashboard(_):
+        return TestClient(app).get("/haircuts/dashboard").status_code
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        statuses = list(executor.map(load_dashboard, range(6)))
+
+    assert statuses == [200] * 6
+    assert small_pool.stats()["timeouts"] == 0
+    assert small_pool.stats()["inUse"] == 0
+
+
+def test_concurrent_async_dashboards_share_a_small_pool(migrated_connection, monkeypatch):
+    psycopg_pool = pytest.importorskip("psycopg_pool")
+    from psycopg.rows import dict_row
+
+    from barbershop.database import async_pool as async_pool_module
+    from barbershop.routes.haircuts_async import get_dashboard
+
+    migrated_connection.commit()
+
+    async def load_dashboards():
+        pool = psycopg_pool.AsyncConnectionPool(
+            migrated_connection.dsn, min_size=1, max_size=2, timeout=2, kwargs={"row_factory": dict_row}, open=False
+        )
+        await pool.open(wait=True)
+        monkeypatch.setattr(async_pool_module, "_async_pool", pool)
+
+        async def load_dashboard():
+            async with pool.connection() as conn:
+                return await get_dashboard(Response(), conn, days=30, limit=10)
+
+        try:
+            return await asyncio.gather(*(load_dashboard() for _ in range(6)))
+        finally:
+            await pool.close()
+
+    dashboards = asyncio.run(load_dashboards())
+
+    assert [list(dashboard) for dashboard in dashboards] == [
+        ["stats", "today", "history", "topClients", "topClientsBySpent"]
+    ] * 6
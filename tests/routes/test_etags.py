@@ -0,0 +1,29 @@
+def test_versioned_reads_send_an_etag_and_honour_it(db_client):
+    first = db_client.get("/haircuts/history/daily")
+    etag = first.headers["ETag"]
+
+    assert db_client.get("/haircuts/history/daily", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_cached_day_totals_send_no_etag(db_client):
+    response = db_client.get("/haircuts/history/today")
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+
+
+def test_every_encoding_shares_one_weak_etag(db_client):
+    for index in range(30):
+        db_client.post(
+            "/haircuts/create",
+            json={"clientName": f"Cliente {index}", "serviceName": "Corte", "price": 5000, "date": "2024-03-01"},
+        )
+    plain = db_client.get("/haircuts/", headers={"Accept-Encoding": "identity"})
+    gzipped = db_client.get("/haircuts/", headers={"Accept-Encoding": "gzip"})
+
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert "Content-Encoding" not in plain.headers
+    assert plain.headers["ETag"] == gzipped.headers["ETag"]
+    assert plain.headers["ETag"].startswith('W/"')
+    for response in (plain, gzipped):
+        assert "accept-encoding" in response.headers["Vary"].lower()
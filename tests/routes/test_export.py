@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from barbershop.database import pool as pool_module
+from barbershop.database.pool import ConnectionPool
+from barbershop.main import app
+
+
+@pytest.fixture
+def single_pool(migrated_connection, monkeypatch):
+    cursor = migrated_connection.cursor()
+    cursor.execute(
+        """
+        INSERT INTO haircuts (id, client_name, service_name, price, date, time, count, tip)
+        VALUES (gen_random_uuid(), 'Ana', 'Corte', 7000, '2024-03-01', '10:00', 1, 0),
+               (gen_random_uuid(), 'Luis', 'Barba', 3000, '2024-03-02', '11:00', 1, 500)
+        """
+    )
+    migrated_connection.commit()
+    pool = ConnectionPool(migrated_connection.dsn, min_size=1, max_size=1, timeout=0.2)
+    monkeypatch.setattr(pool_module, "_pool", pool)
+    yield pool
+    pool.closeall()
+
+
+def test_export_returns_its_connection_after_streaming(single_pool):
+    response = TestClient(app).get("/haircuts/export", params={"format": "ndjson"})
+
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+    assert single_pool.stats()["inUse"] == 0
+
+
+def test_export_answers_503_when_the_pool_is_busy(single_pool):
+    with single_pool.connection():
+        response = TestClient(app).get("/haircuts/export")
+
+    assert response.status_code == 503
+    assert single_pool.stats()["timeouts"] == 1
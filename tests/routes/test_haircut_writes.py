@@ -0,0 +1,24 @@
+from uuid import uuid4
+
+
+def test_writes_to_a_missing_haircut_return_404(db_client):
+    missing = str(uuid4())
+    haircut = {"id": missing, "clientName": "Ana", "serviceName": "Corte", "price": 1, "date": "2024-03-01"}
+
+    assert db_client.put("/haircuts/update", json=haircut).status_code == 404
+    assert db_client.patch(f"/haircuts/{missing}/price", json={"price": 1}).status_code == 404
+    assert db_client.delete(f"/haircuts/{missing}").status_code == 404
+
+
+def test_update_moves_a_haircut_to_another_day(db_client):
+    created = db_client.post(
+        "/haircuts/create",
+        json={"clientName": "Ana", "serviceName": "Corte", "price": 7000, "date": "01/03/2024"},
+    ).json()
+    db_client.get("/haircuts/history/date/2024-03-01")
+
+    response = db_client.put("/haircuts/update", json={**created, "date": "2024-03-02"})
+
+    assert response.status_code == 200
+    assert db_client.get("/haircuts/history/date/2024-03-01").json() == []
+    assert [haircut["id"] for haircut in db_client.get("/haircuts/history/date/2024-03-02").json()] == [created["id"]]
@@ -0,0 +1,28 @@
+from fastapi import APIRouter
+
+import pytest
+
+from barbershop.routes import async_haircuts_router, haircuts_router
+from barbershop.routes.haircuts_async import replace_routes
+
+
+def _keys(router):
+    return [(route.path, frozenset(route.methods)) for route in router.routes]
+
+
+def test_async_router_keeps_sync_route_order():
+    assert _keys(async_haircuts_router) == _keys(haircuts_router)
+
+
+def test_async_router_swaps_db_endpoints_only():
+    modules = {route.path: route.endpoint.__module__ for route in async_haircuts_router.routes if "GET" in route.methods}
+    assert modules["/haircuts/"].endswith("haircuts_async")
+    assert modules["/haircuts/{haircut_id}"].endswith("haircuts_async")
+    assert modules["/haircuts/export"].endswith(".haircuts")
+
+
+def test_replace_routes_rejects_unknown_routes():
+    extra = APIRouter(prefix="/haircuts")
+    extra.get("/unknown")(lambda: None)
+    with pytest.raises(ValueError):
+        replace_routes(haircuts_router, extra)